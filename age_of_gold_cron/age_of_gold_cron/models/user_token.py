@@ -14,9 +14,9 @@ class UserToken(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
     __tablename__ = "UserToken"  # pyright: ignore[reportAssignmentType]
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="User.id")
-    access_token: str = Field(index=True)
+    access_token_hash: str = Field(max_length=64, index=True, unique=True)
     token_expiration: int
-    refresh_token: str
+    refresh_token_hash: str = Field(max_length=64, index=True, unique=True)
     refresh_token_expiration: int
 
     def refresh_is_expired(self) -> bool:
@@ -1,25 +1,48 @@
 from io import BytesIO
-from typing import Optional
+from typing import Any, Dict, Optional
 import logging
-from celery import Celery
+from celery import Celery, Task
+from celery.signals import before_task_publish, task_postrun, task_prerun
 from age_of_gold_worker.age_of_gold_worker.util import util
 from age_of_gold_worker.age_of_gold_worker.worker_settings import worker_settings
 from age_of_gold_worker.age_of_gold_worker.util.mail_util import (
     send_reset_email,
     send_delete_account,
 )
+from age_of_gold_worker.age_of_gold_worker.util.gold_logging import (
+    correlation_id,
+    setup_logging,
+)
 from .util import avatar
 from PIL import Image
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 celery_app = Celery("tasks", broker=worker_settings.REDIS_URI, backend="rpc://")
+# Keep the queue based logging pipeline instead of Celery's own handlers.
+celery_app.conf.worker_hijack_root_logger = False
+
+
+@before_task_publish.connect
+def add_correlation_id(headers: Dict[str, Any], **kwargs: Any) -> None:
+    """Hand the correlation id of the publishing request to the task."""
+    request_id = correlation_id.get()
+    if request_id is not None:
+        headers.setdefault("correlation_id", request_id)
+
+
+@task_prerun.connect
+def set_correlation_id(task_id: str, task: Task, **kwargs: Any) -> None:
+    """Log a task under the id of the request that started it, or its own id."""
+    correlation_id.set(task.request.get("correlation_id") or task_id)
+
+
+@task_postrun.connect
+def clear_correlation_id(**kwargs: Any) -> None:
+    """Do not leak the id of a finished task into the next one."""
+    correlation_id.set(None)
 
 
 @celery_app.task
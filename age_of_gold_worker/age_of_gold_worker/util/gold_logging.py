@@ -0,0 +1,125 @@
+"""Non-blocking JSON logging shared by the api and the worker."""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Mapping, Optional, TextIO
+
+correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+# Attributes every LogRecord has, anything else was passed through `extra`.
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "correlation_id", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "correlation_id", None)
+        if request_id is not None:
+            payload["correlation_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Stamp records with the correlation id of the current request or task."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in `rate` records below WARNING for the configured loggers.
+
+    Rates apply to a logger and its children, the most specific configured
+    name wins. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates: Mapping[str, int]) -> None:
+        super().__init__()
+        self.rates = dict(rates)
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def rate(self, name: str) -> int:
+        """Sampling rate of a logger name."""
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        if rate <= 1:
+            return True
+        with self.lock:
+            count = self.counts.get(record.name, 0)
+            self.counts[record.name] = count + 1
+        return count % rate == 0
+
+
+class StderrHandler(logging.StreamHandler):  # type: ignore[type-arg]
+    """Stream handler writing to whatever `sys.stderr` is at emit time."""
+
+    def __init__(self) -> None:
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self) -> TextIO:
+        return sys.stderr
+
+
+def setup_logging(
+    level: int = logging.INFO, sample_rates: Optional[Mapping[str, int]] = None
+) -> QueueListener:
+    """
+    Route the root logger through a queue to a JSON writer thread.
+
+    Logging calls only filter the record and put it on the queue, the
+    formatting and the write happen on the listener thread, so a slow log
+    sink never blocks the event loop or a task. Only the first call
+    configures logging, later calls return the running listener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates or {}))
+    queue_handler.addFilter(CorrelationIdFilter())
+    stream_handler = StderrHandler()
+    stream_handler.setFormatter(JsonFormatter())
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    _listener = listener
+    return listener
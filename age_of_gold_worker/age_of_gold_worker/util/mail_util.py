@@ -1,6 +1,7 @@
 """Email utilities for sending emails."""
 
 import datetime
+import logging
 from pathlib import Path
 import smtplib
 from email.mime.multipart import MIMEMultipart
@@ -8,6 +9,8 @@ from email.mime.text import MIMEText
 from typing import Any
 from age_of_gold_worker.age_of_gold_worker.worker_settings import worker_settings
 
+logger = logging.getLogger(__name__)
+
 
 def load_template(template_path: str, **kwargs: Any) -> str:
     """Load and render an email template with placeholders."""
@@ -51,9 +54,9 @@ def send_email(
             server.starttls()
             server.login(smtp_account, smtp_password)
             server.send_message(msg)
-        print("Email sent successfully!")
+        logger.info("Email sent successfully!")
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.error("Error sending email: %s", e)
 
 
 def send_reset_email(to_email: str, subject: str, access_token: str) -> None:
@@ -4,10 +4,14 @@ from io import BytesIO
 from unittest.mock import MagicMock, patch
 
 from age_of_gold_worker.age_of_gold_worker.tasks import (
+    add_correlation_id,
+    clear_correlation_id,
+    set_correlation_id,
     task_generate_avatar,
     task_send_email_delete_account,
     task_send_email_forgot_password,
 )
+from age_of_gold_worker.age_of_gold_worker.util.gold_logging import correlation_id
 from PIL import Image
 
 
@@ -94,3 +98,29 @@ def test_task_send_email_delete_account(mock_send_delete_account: MagicMock) ->
         "test@test.test", "test", "test_token"
     )
     assert result == {"success": True}
+
+
+def test_correlation_id_signals() -> None:
+    """Tasks are logged under the correlation id of the request that queued them."""
+    headers: dict[str, str] = {}
+    add_correlation_id(headers=headers)
+    assert headers == {}
+
+    token = correlation_id.set("request-1")
+    try:
+        add_correlation_id(headers=headers)
+    finally:
+        correlation_id.reset(token)
+    assert headers == {"correlation_id": "request-1"}
+
+    task = MagicMock()
+    task.request.get.return_value = "request-1"
+    set_correlation_id(task_id="task-1", task=task)
+    assert correlation_id.get() == "request-1"
+
+    task.request.get.return_value = None
+    set_correlation_id(task_id="task-2", task=task)
+    assert correlation_id.get() == "task-2"
+
+    clear_correlation_id()
+    assert correlation_id.get() is None
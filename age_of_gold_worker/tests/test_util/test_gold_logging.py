@@ -0,0 +1,90 @@
+"""Test for the shared logging pipeline."""
+
+import json
+import logging
+import sys
+import time
+
+import pytest
+
+from age_of_gold_worker.age_of_gold_worker.util.gold_logging import (
+    CorrelationIdFilter,
+    JsonFormatter,
+    SamplingFilter,
+    StderrHandler,
+    correlation_id,
+    setup_logging,
+)
+
+
+def make_record(name: str = "test", level: int = logging.INFO) -> logging.LogRecord:
+    """A record as a logger would create it."""
+    return logging.getLogger(name).makeRecord(
+        name, level, "file.py", 1, "hello %s", ("world",), None
+    )
+
+
+def test_json_formatter() -> None:
+    """Records become one JSON object with extras, correlation id and traceback."""
+    record = make_record()
+    record.user_id = 42
+    record.correlation_id = "abc"
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record.exc_info = sys.exc_info()
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "hello world"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "test"
+    assert payload["user_id"] == 42
+    assert payload["correlation_id"] == "abc"
+    assert "ValueError: boom" in payload["exc_info"]
+    assert "correlation_id" not in json.loads(JsonFormatter().format(make_record()))
+
+
+def test_correlation_id_filter() -> None:
+    """Records carry the correlation id of the context that logged them."""
+    token = correlation_id.set("request-1")
+    try:
+        record = make_record()
+        assert CorrelationIdFilter().filter(record) is True
+    finally:
+        correlation_id.reset(token)
+    assert getattr(record, "correlation_id") == "request-1"
+
+
+def test_sampling_filter() -> None:
+    """Only every n-th low level record of a sampled logger is kept."""
+    sampling = SamplingFilter({"sampled": 3, "sampled.all": 1})
+
+    kept = [sampling.filter(make_record("sampled.child")) for _ in range(6)]
+    assert kept == [True, False, False, True, False, False]
+    assert sampling.filter(make_record("sampled.child", logging.WARNING)) is True
+    assert sampling.filter(make_record("sampled.all")) is True
+    assert sampling.filter(make_record("other")) is True
+
+
+def test_pipeline_writes_json_to_stderr(capsys: pytest.CaptureFixture[str]) -> None:
+    """Records are written as JSON by the listener thread."""
+    listener = setup_logging()
+    assert setup_logging() is listener
+    assert isinstance(listener.handlers[0], StderrHandler)
+
+    logging.getLogger("pipeline.test").warning("queued %s", "record", extra={"n": 1})
+    lines: list[str] = []
+    for _ in range(100):
+        lines += [
+            line
+            for line in capsys.readouterr().err.splitlines()
+            if "pipeline.test" in line
+        ]
+        if lines:
+            break
+        time.sleep(0.01)
+
+    payload = json.loads(lines[0])
+    assert payload["message"] == "queued record"
+    assert payload["n"] == 1
@@ -148,15 +148,18 @@ def test_send_delete_account(
 
 @patch("smtplib.SMTP")
 def test_send_email_exception(mock_smtp: MagicMock) -> None:
-    """Test that send_email handles SMTP exceptions gracefully and prints an error message."""
+    """Test that send_email handles SMTP exceptions gracefully and logs an error message."""
     mock_smtp_instance: MagicMock = mock_smtp.return_value.__enter__.return_value
     mock_smtp_instance.starttls.side_effect = Exception("SMTP Error")
 
-    with patch("builtins.print") as mock_print:
+    with patch(
+        "age_of_gold_worker.age_of_gold_worker.util.mail_util.logger.error"
+    ) as mock_error:
         send_email(
             to_email="test@example.com",
             subject="Test Subject",
             html_content="<h1>HTML Content</h1>",
             text_content="Plain Text Content",
         )
-        mock_print.assert_called_with("Error sending email: SMTP Error")
+        mock_error.assert_called_once()
+        assert str(mock_error.call_args.args[1]) == "SMTP Error"
@@ -0,0 +1 @@
+"""Benchmarks for hot paths of the backend."""
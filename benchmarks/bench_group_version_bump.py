@@ -0,0 +1,141 @@
+"""
+Group edit fan-out cost, per member version bumps versus `bump_group_versions`.
+
+For each size a group gets that many members. The old path loads
+`chat.groups` and increments every row from Python, the new path issues one
+set-based UPDATE. Latency and statement counts are reported.
+`BENCH_DB_URL` selects the database, in-memory SQLite by default.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Awaitable, Callable, List
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+
+from src.models import Chat, Group, User
+from src.util.rest_util import bump_group_versions
+
+SIZES = [10, 1_000, 10_000]
+REPEATS = 5
+DB_URL = os.environ.get("BENCH_DB_URL", "sqlite+aiosqlite://")
+
+
+async def loop_bump(db: AsyncSession, chat_id: int) -> None:
+    """The bump as the group endpoints used to run it."""
+    result = await db.execute(
+        select(Chat).where(Chat.id == chat_id).options(selectinload(Chat.groups))  # type: ignore
+    )
+    chat = result.scalars().one()
+    for group in chat.groups:
+        group.group_version += 1
+        db.add(group)
+    await db.commit()
+
+
+async def set_bump(db: AsyncSession, chat_id: int) -> None:
+    """The single statement bump."""
+    result = await db.execute(select(Chat).where(Chat.id == chat_id))
+    chat = result.scalars().one()
+    assert chat.id is not None
+    await bump_group_versions(db, chat.id)
+    await db.commit()
+
+
+async def populate(sessions: async_sessionmaker[AsyncSession], size: int) -> int:
+    """Create a group chat with `size` members and return its id."""
+    async with sessions() as db:
+        user = User(
+            username=f"bench_user_{size}",
+            email_hash=f"bench_email_hash_{size}",
+            password_hash="bench_password_hash",
+            salt="salt",
+            origin=0,
+            colour="#ED64A6",
+        )
+        chat = Chat(
+            user_ids=[],
+            user_admin_ids=[],
+            private=False,
+            group_name="bench_group",
+            group_description="",
+            group_colour="#ED64A6",
+            current_message_id=1,
+        )
+        db.add_all([user, chat])
+        await db.commit()
+        await db.execute(
+            insert(Group),
+            [
+                {
+                    "user_id": user.id,
+                    "group_id": chat.id,
+                    "unread_messages": 0,
+                    "group_version": 1,
+                }
+                for _ in range(size)
+            ],
+        )
+        await db.commit()
+        assert chat.id is not None
+        return chat.id
+
+
+async def run(
+    name: str,
+    sessions: async_sessionmaker[AsyncSession],
+    chat_id: int,
+    size: int,
+    statements: List[int],
+    bump: Callable[[AsyncSession, int], Awaitable[None]],
+) -> None:
+    """Bump `REPEATS` times in fresh sessions and print the cost."""
+    timings: List[float] = []
+    counts: List[int] = []
+    for _ in range(REPEATS):
+        async with sessions() as db:
+            statements[0] = 0
+            start = time.perf_counter()
+            await bump(db, chat_id)
+            timings.append((time.perf_counter() - start) * 1000)
+            counts.append(statements[0])
+    print(
+        f"{size:>6} members {name:>4}: p50 {statistics.median(timings):9.2f}ms | "
+        f"statements {statistics.median(counts):.0f}"
+    )
+
+
+async def main() -> None:
+    """Compare both bumps for every size."""
+    engine_options: dict[str, Any] = {}
+    if DB_URL.startswith("sqlite"):
+        engine_options["poolclass"] = StaticPool
+    engine = create_async_engine(DB_URL, **engine_options)
+    statements = [0]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_: Any) -> None:
+        statements[0] += 1
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    for size in SIZES:
+        chat_id = await populate(sessions, size)
+        await run("loop", sessions, chat_id, size, statements, loop_bump)
+        await run("set", sessions, chat_id, size, statements, set_bump)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
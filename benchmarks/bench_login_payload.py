@@ -0,0 +1,94 @@
+"""
+Size and serialization time of every login payload encoding.
+
+Builds a login response with `FRIENDS` friends and `GROUPS` groups, as
+`get_successful_login_response` returns it, and encodes it the way each
+`LoginFormat` would be sent. Sizes are reported raw and gzipped.
+"""
+
+import gzip
+import json
+import random
+import statistics
+import time
+from typing import Any, Callable, List
+
+import msgpack
+
+from src.util.login_payload import LoginFormat, columnar_login_data
+from src.util.util import SuccessfulLoginResponse
+
+FRIENDS = 5_000
+GROUPS = 500
+REPEATS = 50
+
+
+def build_response() -> SuccessfulLoginResponse:
+    """A login response with random ids and small versions."""
+    friend_ids = random.sample(range(1, FRIENDS * 20), FRIENDS)
+    group_ids = random.sample(range(1, GROUPS * 20), GROUPS)
+    return {
+        "success": True,
+        "data": {
+            "access_token": "a" * 420,
+            "refresh_token": "r" * 420,
+            "profile_version": 3,
+            "avatar_version": 2,
+            "friends": [
+                {"friend_id": friend_id, "friend_version": random.randint(1, 50)}
+                for friend_id in friend_ids
+            ],
+            "groups": [
+                {"group_id": group_id, "group_version": random.randint(1, 50)}
+                for group_id in group_ids
+            ],
+        },
+    }
+
+
+def encoder(login_format: LoginFormat) -> Callable[[SuccessfulLoginResponse], bytes]:
+    """Return a function producing the response body for a format."""
+
+    def encode(response: SuccessfulLoginResponse) -> bytes:
+        payload: Any = response
+        if login_format.columnar:
+            payload = {
+                "success": response["success"],
+                "data": columnar_login_data(response["data"], login_format.delta),
+            }
+        if login_format.msgpack:
+            return msgpack.packb(payload)  # type: ignore[no-any-return]
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    return encode
+
+
+def main() -> None:
+    """Print size and encode time per format."""
+    response = build_response()
+    formats = {
+        "rows json": LoginFormat(),
+        "columnar json": LoginFormat(columnar=True),
+        "delta json": LoginFormat(columnar=True, delta=True),
+        "rows msgpack": LoginFormat(msgpack=True),
+        "columnar msgpack": LoginFormat(columnar=True, msgpack=True),
+        "delta msgpack": LoginFormat(columnar=True, delta=True, msgpack=True),
+    }
+    print(f"{FRIENDS} friends, {GROUPS} groups")
+    for name, login_format in formats.items():
+        encode = encoder(login_format)
+        timings: List[float] = []
+        body = b""
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            body = encode(response)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{name:>16}: {len(body) / 1024:8.1f}KiB "
+            f"gzip {len(gzip.compress(body)) / 1024:7.1f}KiB | "
+            f"encode p50 {statistics.median(timings):6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Login payload cost, relationship refresh versus the column-only snapshot query.
+
+For each size a user gets that many friends and groups. The old path refreshes
+`user.friends` and `user.groups` and serializes the ORM objects, the new path
+calls `get_login_snapshot`. Latency and the tracemalloc peak are reported.
+`BENCH_DB_URL` selects the database, in-memory SQLite by default.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from src.models import Chat, Friend, Group, User
+from src.util.util import get_login_snapshot
+
+SIZES = [10, 1_000, 10_000]
+REPEATS = 5
+DB_URL = os.environ.get("BENCH_DB_URL", "sqlite+aiosqlite://")
+
+Snapshot = Tuple[List[dict[str, Any]], List[dict[str, Any]]]
+
+
+async def refresh_relations(db: AsyncSession, user: User) -> Snapshot:
+    """The payload as `get_successful_login_response` used to build it."""
+    await db.refresh(user, ["friends", "groups"])
+    friends = [
+        {"friend_id": friend.friend_id, "friend_version": friend.friend_version}
+        for friend in user.friends
+    ]
+    groups = [
+        {"group_id": group.group_id, "group_version": group.group_version}
+        for group in user.groups
+    ]
+    return friends, groups
+
+
+async def snapshot_relations(db: AsyncSession, user: User) -> Snapshot:
+    """The payload from the snapshot query."""
+    assert user.id is not None
+    return await get_login_snapshot(db, user.id)
+
+
+async def populate(sessions: async_sessionmaker[AsyncSession], size: int) -> User:
+    """Create a user with `size` friends and `size` groups."""
+    async with sessions() as db:
+        user = User(
+            username=f"bench_user_{size}",
+            email_hash=f"bench_email_hash_{size}",
+            password_hash="bench_password_hash",
+            salt="salt",
+            origin=0,
+            colour="#ED64A6",
+        )
+        chat = Chat(
+            user_ids=[],
+            user_admin_ids=[],
+            private=False,
+            group_name="bench_group",
+            group_description="",
+            group_colour="#ED64A6",
+            current_message_id=1,
+        )
+        db.add_all([user, chat])
+        await db.commit()
+        await db.execute(
+            insert(Friend),
+            [
+                {"user_id": user.id, "friend_id": user.id, "friend_version": index}
+                for index in range(size)
+            ],
+        )
+        await db.execute(
+            insert(Group),
+            [
+                {
+                    "user_id": user.id,
+                    "group_id": chat.id,
+                    "unread_messages": 0,
+                    "group_version": index,
+                }
+                for index in range(size)
+            ],
+        )
+        await db.commit()
+        return user
+
+
+async def run(
+    name: str,
+    sessions: async_sessionmaker[AsyncSession],
+    user: User,
+    size: int,
+    load: Callable[[AsyncSession, User], Awaitable[Snapshot]],
+) -> None:
+    """Build the payload `REPEATS` times in fresh sessions and print the cost."""
+    timings: List[float] = []
+    peaks: List[int] = []
+    for _ in range(REPEATS):
+        async with sessions() as db:
+            session_user = await db.merge(user, load=False)
+            tracemalloc.start()
+            start = time.perf_counter()
+            friends, groups = await load(db, session_user)
+            timings.append((time.perf_counter() - start) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert len(friends) == size and len(groups) == size
+    print(
+        f"{size:>6} relations {name:>8}: p50 {statistics.median(timings):9.2f}ms | "
+        f"peak memory {statistics.median(peaks) / 1024:10.1f}KiB"
+    )
+
+
+async def main() -> None:
+    """Compare both payload builders for every size."""
+    engine_options: dict[str, Any] = {}
+    if DB_URL.startswith("sqlite"):
+        engine_options["poolclass"] = StaticPool
+    engine = create_async_engine(DB_URL, **engine_options)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    for size in SIZES:
+        user = await populate(sessions, size)
+        await run("refresh", sessions, user, size, refresh_relations)
+        await run("snapshot", sessions, user, size, snapshot_relations)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
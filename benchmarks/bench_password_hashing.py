@@ -0,0 +1,73 @@
+"""
+Event-loop lag under concurrent logins, inline argon2 versus the hashing pool.
+
+A ticker coroutine sleeps for 1ms in a loop and records how late it wakes up.
+While it runs, `CONCURRENT_LOGINS` password verifications are started either
+inline on the loop (the old behaviour) or through `password_hashing`.
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from argon2 import PasswordHasher, exceptions
+
+from src.util.password_hashing import password_hashing
+
+CONCURRENT_LOGINS = 32
+TICK_SECONDS = 0.001
+
+ph = PasswordHasher()
+
+
+async def measure_lag(stop: asyncio.Event, lags: List[float]) -> None:
+    """Record how far each tick overshoots its scheduled wake-up."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def verify_inline(hashed_password: str, password: str) -> bool:
+    """Verify directly on the event loop, as the endpoints used to."""
+    try:
+        return ph.verify(hashed_password, password)
+    except exceptions.VerificationError:
+        return False
+
+
+async def run(
+    name: str, verify: Callable[[str, str], Awaitable[bool]], hashed_password: str
+) -> None:
+    """Run the concurrent logins and print lag statistics."""
+    stop = asyncio.Event()
+    lags: List[float] = []
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(verify(hashed_password, "password") for _ in range(CONCURRENT_LOGINS))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lags.sort()
+    print(
+        f"{name:>8}: {CONCURRENT_LOGINS} logins in {elapsed * 1000:8.1f}ms | "
+        f"loop lag p50 {statistics.median(lags):7.2f}ms "
+        f"p99 {lags[int(len(lags) * 0.99) - 1]:7.2f}ms "
+        f"max {lags[-1]:7.2f}ms | ticks {len(lags)}"
+    )
+
+
+async def main() -> None:
+    """Compare the inline and pooled verification paths."""
+    hashed_password = ph.hash("password")
+    await run("inline", verify_inline, hashed_password)
+    await run("pool", password_hashing.verify, hashed_password)
+    print(f"pool metrics: {password_hashing.metrics}")
+    password_hashing.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
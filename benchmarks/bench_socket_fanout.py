@@ -0,0 +1,77 @@
+"""
+Socket fan-out cost, one emit per recipient room versus `emit_to_rooms`.
+
+Both paths go through the api's own `AsyncRedisManager`, so every emit is
+encoded and published the way it is in production. `BENCH_REDIS_URL` selects
+the Redis server, an in-process fakeredis is used by default. Latency, the
+number of publishes and the published bytes are reported.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, List
+
+from fakeredis import aioredis as fake_aioredis
+from redis import asyncio as aioredis
+
+from src.sockets.sockets import emit_to_rooms, mgr, sio
+from src.util.util import get_user_room
+
+RECIPIENTS = 1_000
+REPEATS = 20
+REDIS_URL = os.environ.get("BENCH_REDIS_URL")
+PAYLOAD = {
+    "group_id": 42,
+    "group_name": "bench_group",
+    "group_description": "a group of benchmark users",
+    "group_colour": "#ED64A6",
+}
+
+
+async def per_room(rooms: List[str]) -> None:
+    """The loop the group endpoints used to run."""
+    for room in rooms:
+        await sio.emit("group_created", PAYLOAD, room=room)
+
+
+async def batched(rooms: List[str]) -> None:
+    """A single manager message for all rooms."""
+    await emit_to_rooms("group_created", PAYLOAD, rooms)
+
+
+async def main() -> None:
+    """Compare both fan-outs for `RECIPIENTS` rooms."""
+    redis: Any = (
+        aioredis.from_url(REDIS_URL) if REDIS_URL else fake_aioredis.FakeRedis()
+    )
+    published = [0, 0]
+    publish = redis.publish
+
+    async def counting_publish(channel: str, message: Any) -> Any:
+        published[0] += 1
+        published[1] += len(message)
+        return await publish(channel, message)
+
+    redis.publish = counting_publish
+    mgr.redis = redis
+    mgr.connected = True
+
+    rooms = [get_user_room(user_id) for user_id in range(RECIPIENTS)]
+    for name, fan_out in (("per room", per_room), ("batched", batched)):
+        timings: List[float] = []
+        for _ in range(REPEATS):
+            published[0] = published[1] = 0
+            start = time.perf_counter()
+            await fan_out(rooms)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{RECIPIENTS} rooms {name:>8}: p50 {statistics.median(timings):8.2f}ms | "
+            f"{published[0]:>5} publishes, {published[1] / 1024:7.1f}KiB"
+        )
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
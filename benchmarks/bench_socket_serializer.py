@@ -0,0 +1,113 @@
+"""
+Socket payload encoding cost, JSON versus msgpack.
+
+Typical events of the api are encoded both as client manager messages, the
+payload published on Redis for every emit, and as socket.io packets, the
+frames sent to clients. Encode and decode time per message and the encoded
+size are reported for each format.
+"""
+
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from socketio.msgpack_packet import MsgPackPacket
+from socketio.packet import EVENT, Packet
+
+from src.sockets import msgpack_codec
+
+REPEATS = 10_000
+
+FRIEND = {
+    "friend_id": 4242,
+    "username": "benchmark_user",
+    "avatar_version": 3,
+    "profile_version": 7,
+    "colour": "#ED64A6",
+}
+USER_IDS = list(range(1000, 1050))
+GROUP: Dict[str, Any] = {
+    "group_id": 42,
+    "group_name": "bench_group",
+    "group_description": "a group of benchmark users",
+    "group_colour": "#ED64A6",
+    "user_ids": USER_IDS,
+    "admin_ids": [1000, 1001],
+    "private": True,
+    "current_message_id": 123456,
+}
+EVENTS: Dict[str, Any] = {
+    "friend update": ("avatar_updated", FRIEND, "room_4243"),
+    "group created": ("group_created", GROUP, "room_1000"),
+    "group fan-out": (
+        "group_created",
+        GROUP,
+        [f"room_{user_id}" for user_id in USER_IDS],
+    ),
+}
+
+
+def manager_message(event: str, data: Any, room: Any) -> Dict[str, Any]:
+    """The message an emit publishes on the manager channel."""
+    return {
+        "method": "emit",
+        "event": event,
+        "data": data,
+        "namespace": "/",
+        "room": room,
+        "skip_sid": None,
+        "callback": None,
+        "host_id": "0123456789abcdef0123456789abcdef",
+    }
+
+
+def per_call_us(call: Callable[[], Any]) -> float:
+    """Median time of `call` in microseconds."""
+    timings: List[float] = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            call()
+        timings.append((time.perf_counter() - start) * 1e6 / REPEATS)
+    return statistics.median(timings)
+
+
+def report(name: str, encode: Callable[[], Any], decode: Callable[[Any], Any]) -> None:
+    """Print the cost of one format for one payload."""
+    encoded = encode()
+    print(
+        f"{name:<36} encode {per_call_us(encode):7.2f}us | "
+        f"decode {per_call_us(lambda: decode(encoded)):7.2f}us | "
+        f"{len(encoded):>6} bytes"
+    )
+
+
+def main() -> None:
+    """Compare both encodings for every typical event."""
+    for label, (event, data, room) in EVENTS.items():
+        message = manager_message(event, data, room)
+        report(
+            f"{label} manager json",
+            lambda: json.dumps(message),
+            json.loads,
+        )
+        report(
+            f"{label} manager msgpack",
+            lambda: msgpack_codec.dumps(message),
+            msgpack_codec.loads,
+        )
+        report(
+            f"{label} packet default",
+            lambda: Packet(EVENT, data=[event, data], namespace="/").encode(),
+            lambda encoded: Packet(encoded_packet=encoded),
+        )
+        report(
+            f"{label} packet msgpack",
+            lambda: MsgPackPacket(EVENT, data=[event, data], namespace="/").encode(),
+            lambda encoded: MsgPackPacket(encoded_packet=encoded),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Token refresh cost, the old select/delete/insert flow versus `rotate_user_token`.
+
+Both flows run against the same database and count the statements they send.
+By default an in-memory SQLite database is used; point `BENCH_DB_URL` at a
+PostgreSQL database (e.g. postgresql+asyncpg://...) to measure real round
+trips, the tables are created and dropped by the script.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+
+from src.models import User, UserToken
+from src.models.user_token import hash_token
+from src.util.security import decode_token
+from src.util.util import get_user_tokens, rotate_user_token
+
+REFRESHES = 200
+DB_URL = os.environ.get("BENCH_DB_URL", "sqlite+aiosqlite://")
+
+
+async def legacy_refresh(
+    db: AsyncSession, access_token: str, refresh_token: str
+) -> Optional[UserToken]:
+    """The refresh flow as the endpoint used to run it."""
+    token_results = await db.execute(
+        select(UserToken)
+        .where(UserToken.access_token_hash == hash_token(access_token))
+        .where(UserToken.refresh_token_hash == hash_token(refresh_token))
+    )
+    user_token = token_results.scalars().first()
+    if user_token is None:
+        return None
+    user_results = await db.execute(select(User).where(User.id == user_token.user_id))
+    user = user_results.scalars().first()
+    await db.delete(user_token)
+    await db.commit()
+    if user is None or not decode_token(refresh_token, "refresh"):
+        return None
+    new_token = get_user_tokens(user)
+    db.add(new_token)
+    await db.commit()
+    return new_token
+
+
+async def rotate_refresh(
+    db: AsyncSession, access_token: str, refresh_token: str
+) -> Optional[UserToken]:
+    """The single transaction rotation."""
+    rotated = await rotate_user_token(db, access_token, refresh_token)
+    return rotated[1] if rotated is not None else None
+
+
+async def run(
+    name: str,
+    sessions: async_sessionmaker[AsyncSession],
+    user: User,
+    statements: List[int],
+    refresh: Callable[[AsyncSession, str, str], Awaitable[Optional[UserToken]]],
+) -> None:
+    """Refresh `REFRESHES` times and print latency and statement counts."""
+    async with sessions() as db:
+        user_token = get_user_tokens(user)
+        db.add(user_token)
+        await db.commit()
+    timings: List[float] = []
+    counts: List[int] = []
+    for _ in range(REFRESHES):
+        async with sessions() as db:
+            statements[0] = 0
+            start = time.perf_counter()
+            new_token = await refresh(
+                db, user_token.access_token, user_token.refresh_token
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+            counts.append(statements[0])
+        assert new_token is not None
+        user_token = new_token
+    timings.sort()
+    print(
+        f"{name:>7}: {REFRESHES} refreshes | "
+        f"p50 {statistics.median(timings):6.2f}ms "
+        f"p99 {timings[int(len(timings) * 0.99) - 1]:6.2f}ms | "
+        f"statements per refresh {statistics.mean(counts):.1f}"
+    )
+
+
+async def main() -> None:
+    """Compare both flows on a fresh schema."""
+    engine_options: dict[str, Any] = {}
+    if DB_URL.startswith("sqlite"):
+        engine_options["poolclass"] = StaticPool
+    engine = create_async_engine(DB_URL, **engine_options)
+    statements = [0]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_: Any) -> None:
+        statements[0] += 1
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        user = User(
+            username="bench_user",
+            email_hash="bench_email_hash",
+            password_hash="bench_password_hash",
+            salt="salt",
+            origin=0,
+            colour="#ED64A6",
+        )
+        db.add(user)
+        await db.commit()
+
+    await run("legacy", sessions, user, statements, legacy_refresh)
+    await run("rotate", sessions, user, statements, rotate_refresh)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
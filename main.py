@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -5,14 +6,33 @@ import boto3
 import uvicorn
 from botocore import client as boto_client
 from cryptography.fernet import Fernet
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_pagination import add_pagination
 
 from src.api import api_v1
 from src.config.config import settings
-from src.sockets.sockets import sio_app
-from src.util.gold_logging import logger
+from src.database import async_session, engine_async
+from src.sockets.sockets import coalescer, mgr, redis, sio_app
+from src.util.gold_logging import CorrelationIdMiddleware, logger
+from src.util.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    instrument_engine,
+    instrument_manager,
+    instrument_password_hashing,
+    instrument_redis,
+    instrument_s3,
+    metrics,
+)
+from src.util.password_hashing import password_hashing
+from src.util.presence import presence
+from src.util.room_cache import room_cache
+from src.util.security import require_admin_token
+from src.util.session_store import session_store
+from src.util.socket_outbox import socket_outbox
+from src.util.token_cache import token_cache
 
 
 @asynccontextmanager
@@ -27,11 +47,29 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # pragma: no co
         region_name="eu-central-1",
         config=boto_client.Config(signature_version="s3v4"),
     )
+    instrument_s3(app.state.s3)
     try:
         app.state.s3.head_bucket(Bucket=settings.S3_BUCKET_NAME)
     except Exception:
         app.state.s3.create_bucket(Bucket=settings.S3_BUCKET_NAME)
+    token_cache.redis = redis
+    session_store.redis = redis
+    room_cache.redis = redis
+    presence.redis = redis
+    token_cache_listener = asyncio.create_task(token_cache.listen())
+    presence_heartbeat = asyncio.create_task(presence.run())
+    outbox_dispatcher = (
+        asyncio.create_task(socket_outbox.run(async_session))
+        if socket_outbox.enabled
+        else None
+    )
     yield
+    token_cache_listener.cancel()
+    presence_heartbeat.cancel()
+    if outbox_dispatcher is not None:
+        outbox_dispatcher.cancel()
+    await coalescer.flush()
+    password_hashing.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -45,12 +83,35 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CorrelationIdMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+instrument_engine(engine_async.sync_engine)
+instrument_redis(redis)
+instrument_manager(mgr)
+instrument_password_hashing(password_hashing)
 
 api_router = APIRouter()
 api_router.include_router(api_v1.api_router_v1, tags=["api_v1"])
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(require_admin_token)],
+)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    Request metrics of this process in the Prometheus text format.
+
+    Guarded like the admin endpoints, the scraper sends the admin token in
+    the X-Admin-Token header.
+    """
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
 app.mount("/", sio_app)
 
 if __name__ == "__main__":  # pragma: no cover
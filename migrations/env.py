@@ -120,7 +120,13 @@ async def run_migrations_online() -> None:
     await connectable.dispose()
 
 
+# A caller can pass its own connection, e.g. a test running the migrations
+# inside a transaction it rolls back.
+external_connection: Optional[engine.Connection] = config.attributes.get("connection")
+
 if context.is_offline_mode():
     run_migrations_offline()
+elif external_connection is not None:
+    do_run_migrations(external_connection)
 else:
     asyncio.run(run_migrations_online())
@@ -0,0 +1,55 @@
+"""sync removals
+
+Revision ID: a8b9c0d1e2f3
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-17 21:14:05.402117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a8b9c0d1e2f3"
+down_revision: Union[str, Sequence[str], None] = "f7a8b9c0d1e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing users are stamped with the id of this transaction.
+    op.add_column(
+        "User",
+        sa.Column(
+            "change_seq",
+            sa.BigInteger(),
+            server_default=sa.text("pg_current_xact_id()::text::bigint"),
+            nullable=False,
+        ),
+    )
+    op.create_table(
+        "Tombstone",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),  # type: ignore[attr-defined]
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("change_seq", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_Tombstone")),
+    )
+    op.create_index(
+        "ix_Tombstone_user_id_change_seq",
+        "Tombstone",
+        ["user_id", "change_seq"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_Tombstone_user_id_change_seq", table_name="Tombstone")
+    op.drop_table("Tombstone")
+    op.drop_column("User", "change_seq")
@@ -0,0 +1,91 @@
+"""user token digests
+
+Revision ID: b3f1c2d4e5a6
+Revises: 4233dfbb7940
+Create Date: 2026-10-17 10:12:41.503127
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f1c2d4e5a6"
+down_revision: Union[str, Sequence[str], None] = "4233dfbb7940"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "UserToken",
+        sa.Column(
+            "access_token_hash",
+            sqlmodel.sql.sqltypes.AutoString(length=64),  # type: ignore[attr-defined]
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "UserToken",
+        sa.Column(
+            "refresh_token_hash",
+            sqlmodel.sql.sqltypes.AutoString(length=64),  # type: ignore[attr-defined]
+            nullable=True,
+        ),
+    )
+    # Existing sessions stay valid, their tokens are hashed the same way as in `hash_token`.
+    op.execute(
+        'UPDATE "UserToken" SET '
+        "access_token_hash = encode(sha256(convert_to(access_token, 'UTF8')), 'hex'), "
+        "refresh_token_hash = encode(sha256(convert_to(refresh_token, 'UTF8')), 'hex')"
+    )
+    op.alter_column("UserToken", "access_token_hash", nullable=False)
+    op.alter_column("UserToken", "refresh_token_hash", nullable=False)
+    op.drop_index(op.f("ix_UserToken_access_token"), table_name="UserToken")
+    op.drop_column("UserToken", "access_token")
+    op.drop_column("UserToken", "refresh_token")
+    op.create_index(
+        op.f("ix_UserToken_access_token_hash"),
+        "UserToken",
+        ["access_token_hash"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_UserToken_refresh_token_hash"),
+        "UserToken",
+        ["refresh_token_hash"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The raw tokens can't be recovered from their digests, so every session is dropped.
+    op.execute('DELETE FROM "UserToken"')
+    op.drop_index(op.f("ix_UserToken_refresh_token_hash"), table_name="UserToken")
+    op.drop_index(op.f("ix_UserToken_access_token_hash"), table_name="UserToken")
+    op.add_column(
+        "UserToken",
+        sa.Column(
+            "refresh_token",
+            sqlmodel.sql.sqltypes.AutoString(),  # type: ignore[attr-defined]
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "UserToken",
+        sa.Column(
+            "access_token",
+            sqlmodel.sql.sqltypes.AutoString(),  # type: ignore[attr-defined]
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        op.f("ix_UserToken_access_token"), "UserToken", ["access_token"], unique=False
+    )
+    op.drop_column("UserToken", "refresh_token_hash")
+    op.drop_column("UserToken", "access_token_hash")
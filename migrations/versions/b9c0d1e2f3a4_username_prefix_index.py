@@ -0,0 +1,34 @@
+"""username prefix index
+
+Revision ID: b9c0d1e2f3a4
+Revises: a8b9c0d1e2f3
+Create Date: 2026-10-17 21:52:36.804219
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b9c0d1e2f3a4"
+down_revision: Union[str, Sequence[str], None] = "a8b9c0d1e2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # In the C collation a btree serves LIKE 'prefix%' and the paging order.
+    op.create_index(
+        "ix_User_username_lower_c",
+        "User",
+        [sa.text('(lower(username) COLLATE "C")'), "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_User_username_lower_c", table_name="User")
@@ -0,0 +1,57 @@
+"""change sequence
+
+Revision ID: c4d2e3f5a6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-17 13:40:12.118406
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d2e3f5a6b7"
+down_revision: Union[str, Sequence[str], None] = "b3f1c2d4e5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_SEQ_TABLES = ("Friend", "Group", "Chat")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are stamped with the id of this transaction.
+    for table in CHANGE_SEQ_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "change_seq",
+                sa.BigInteger(),
+                server_default=sa.text("pg_current_xact_id()::text::bigint"),
+                nullable=False,
+            ),
+        )
+    op.create_index(
+        "ix_Friend_user_id_change_seq",
+        "Friend",
+        ["user_id", "change_seq"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_Group_user_id_change_seq",
+        "Group",
+        ["user_id", "change_seq"],
+        unique=False,
+    )
+    op.create_index(op.f("ix_Chat_change_seq"), "Chat", ["change_seq"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_Chat_change_seq"), table_name="Chat")
+    op.drop_index("ix_Group_user_id_change_seq", table_name="Group")
+    op.drop_index("ix_Friend_user_id_change_seq", table_name="Friend")
+    for table in CHANGE_SEQ_TABLES:
+        op.drop_column(table, "change_seq")
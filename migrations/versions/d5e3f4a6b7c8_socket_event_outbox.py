@@ -0,0 +1,37 @@
+"""socket event outbox
+
+Revision ID: d5e3f4a6b7c8
+Revises: c4d2e3f5a6b7
+Create Date: 2026-10-17 15:02:47.530914
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5e3f4a6b7c8"
+down_revision: Union[str, Sequence[str], None] = "c4d2e3f5a6b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "SocketEvent",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event", sqlmodel.sql.sqltypes.AutoString(), nullable=False),  # type: ignore[attr-defined]
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("rooms", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_SocketEvent")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("SocketEvent")
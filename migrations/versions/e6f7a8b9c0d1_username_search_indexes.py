@@ -0,0 +1,42 @@
+"""username search indexes
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e3f4a6b7c8
+Create Date: 2026-10-17 19:24:08.306517
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6f7a8b9c0d1"
+down_revision: Union[str, Sequence[str], None] = "d5e3f4a6b7c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_User_username_lower",
+        "User",
+        [sa.text("lower(username)")],
+        unique=False,
+    )
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_User_username_trgm",
+        "User",
+        [sa.text("lower(username) gin_trgm_ops")],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_User_username_trgm", table_name="User")
+    op.drop_index("ix_User_username_lower", table_name="User")
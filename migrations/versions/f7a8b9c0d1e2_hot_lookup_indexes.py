@@ -0,0 +1,78 @@
+"""hot lookup indexes
+
+Revision ID: f7a8b9c0d1e2
+Revises: e6f7a8b9c0d1
+Create Date: 2026-10-17 20:02:41.571093
+
+The upgrade deletes duplicate Friend rows (same user_id and friend_id) and
+duplicate Group rows (same user_id and group_id), keeping the oldest row of
+each pair, before it creates the unique indexes. The number of removed rows
+is logged. The downgrade does not bring them back.
+
+"""
+
+import logging
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = "f7a8b9c0d1e2"
+down_revision: Union[str, Sequence[str], None] = "e6f7a8b9c0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def delete_duplicates(table: str, column: str) -> None:
+    """Delete the rows repeating the (user_id, `column`) pair of an older row."""
+    statement = (
+        f'DELETE FROM "{table}" a USING "{table}" b WHERE a.user_id = b.user_id '
+        f"AND a.{column} = b.{column} AND a.id > b.id"
+    )
+    if context.is_offline_mode():
+        op.execute(statement)
+        return
+    removed = op.get_bind().execute(sa.text(statement)).rowcount
+    logger.warning("Removed %d duplicate %s rows", removed, table)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicate pairs would fail the unique indexes, the oldest row is kept.
+    # Group duplicates come from a creator listing themselves as a member.
+    delete_duplicates("Friend", "friend_id")
+    delete_duplicates("Group", "group_id")
+    op.create_index(
+        "ix_User_email_hash_origin",
+        "User",
+        ["email_hash", "origin"],
+        unique=False,
+    )
+    op.create_index(op.f("ix_Friend_friend_id"), "Friend", ["friend_id"], unique=False)
+    op.create_index(
+        "ix_Friend_user_id_friend_id",
+        "Friend",
+        ["user_id", "friend_id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_Group_user_id_group_id",
+        "Group",
+        ["user_id", "group_id"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_UserToken_user_id"), "UserToken", ["user_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_UserToken_user_id"), table_name="UserToken")
+    op.drop_index("ix_Group_user_id_group_id", table_name="Group")
+    op.drop_index("ix_Friend_user_id_friend_id", table_name="Friend")
+    op.drop_index(op.f("ix_Friend_friend_id"), table_name="Friend")
+    op.drop_index("ix_User_email_hash_origin", table_name="User")
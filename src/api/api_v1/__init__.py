@@ -1,9 +1,10 @@
 """Base file for the api router and endpoints."""
 
-from . import authorization, oauth, settings, friends, user, groups
+from . import admin, authorization, oauth, settings, friends, user, groups, sync
 from .router import api_router_v1
 
 __all__ = [
+    "admin",
     "authorization",
     "api_router_v1",
     "groups",
@@ -11,4 +12,5 @@ __all__ = [
     "settings",
     "user",
     "friends",
+    "sync",
 ]
@@ -0,0 +1,5 @@
+"""File for the admin endpoints."""
+
+from . import slow_queries
+
+__all__ = ["slow_queries"]
@@ -0,0 +1,25 @@
+"""Endpoint for dumping the slow query log."""
+
+from typing import Any, Dict
+
+from fastapi import Depends
+
+from src.api.api_v1.router import api_router_v1
+from src.util.query_log import slow_query_log
+from src.util.security import require_admin_token
+
+
+@api_router_v1.get(
+    "/admin/slow-queries",
+    status_code=200,
+    include_in_schema=False,
+    dependencies=[Depends(require_admin_token)],
+)
+async def slow_queries() -> Dict[str, Any]:
+    """
+    Return the statement stats and slow statements of this process.
+
+    Only available when an admin token is configured and sent in the
+    X-Admin-Token header, otherwise the endpoint does not exist.
+    """
+    return {"success": True, "data": slow_query_log.dump()}
@@ -1,10 +1,9 @@
 """endpoint for login"""
 
-from typing import Optional
+from typing import Annotated, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from pydantic import BaseModel
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
@@ -12,9 +11,11 @@ from sqlmodel import select
 from src.api.api_v1.router import api_router_v1
 from src.database import get_db
 from src.models import User
-from src.models.user import hash_email
+from src.models.user import hash_email, username_equals
 from src.util.decorators import handle_db_errors
 from src.util.gold_logging import logger
+from src.util.login_payload import LoginFormat, encode_login_response, get_login_format
+from src.util.password_hashing import password_hashing
 from src.util.util import (
     SuccessfulLoginResponse,
     get_successful_login_response,
@@ -40,7 +41,7 @@ async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User
     user: Optional[User] = (
         await db.execute(
             select(User)
-            .where(User.origin == 0, func.lower(User.username) == username.lower())
+            .where(User.origin == 0, username_equals(username))
             .options(selectinload(User.tokens))  # type: ignore
         )
     ).scalar_one_or_none()
@@ -55,12 +56,13 @@ class LoginRequest(BaseModel):
     password: str
 
 
-@api_router_v1.post("/login", status_code=200)
+@api_router_v1.post("/login", status_code=200, response_model=SuccessfulLoginResponse)
 @handle_db_errors("Login failed")
 async def login_user(
     login_request: LoginRequest,
     db: AsyncSession = Depends(get_db),
-) -> SuccessfulLoginResponse:
+    login_format: Annotated[LoginFormat, Depends(get_login_format)] = LoginFormat(),
+) -> SuccessfulLoginResponse | Response:
     """Handle user login request."""
     user: Optional[User] = None
     if login_request.email and login_request.password:
@@ -81,16 +83,22 @@ async def login_user(
         )
 
     password_with_salt = login_request.password + user.salt
-    if not user.verify_password(user.password_hash, password_with_salt):
+    if not await password_hashing.verify(user.password_hash, password_with_salt):
         logger.warning("Login failed for user: %s (invalid password)", user.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email/username or password",
         )
 
+    if password_hashing.check_needs_rehash(user.password_hash):
+        user.password_hash = await password_hashing.hash(password_with_salt)
+        db.add(user)
+
     user_token = get_user_tokens(user)
     db.add(user_token)
     await db.commit()
     logger.info("User logged in: %s", user.username)
 
-    return await get_successful_login_response(user_token, user, db)
+    return encode_login_response(
+        await get_successful_login_response(user_token, user, db), login_format
+    )
@@ -12,6 +12,8 @@ from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
 from src.util.gold_logging import logger
 from src.util.security import checked_auth_token
+from src.util.session_store import session_store
+from src.util.token_cache import token_cache
 
 
 @api_router_v1.post("/logout", status_code=200, response_model=dict)
@@ -26,5 +28,9 @@ async def logout_user(
     user, user_token = user_and_token
     await db.delete(user_token)
     await db.commit()
+    await token_cache.invalidate_token(user_token.access_token_hash)
+    await session_store.delete(
+        user_token.access_token_hash, user_token.refresh_token_hash
+    )
     logger.info("User %s logged out successfully", user.username)
     return {"success": True}
@@ -1,8 +1,9 @@
 """Endpoint for user registration."""
 
-from fastapi import Depends, HTTPException, status
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Response, status
 from pydantic import BaseModel
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
@@ -10,14 +11,15 @@ from age_of_gold_worker.age_of_gold_worker.tasks import task_generate_avatar
 from src.api.api_v1.router import api_router_v1
 from src.database import get_db
 from src.models import User
-from src.models.user import create_salt, hash_email
+from src.models.user import create_salt, hash_email, username_equals
 from src.util.decorators import handle_db_errors
+from src.util.login_payload import LoginFormat, encode_login_response, get_login_format
+from src.util.password_hashing import password_hashing
 from src.util.util import (
     SuccessfulLoginResponse,
     get_random_colour,
     get_successful_login_response,
     get_user_tokens,
-    hash_password,
 )
 
 
@@ -29,12 +31,15 @@ class RegisterRequest(BaseModel):
     password: str
 
 
-@api_router_v1.post("/register", status_code=201)
+@api_router_v1.post(
+    "/register", status_code=201, response_model=SuccessfulLoginResponse
+)
 @handle_db_errors("Registration failed")
 async def register_user(
     register_request: RegisterRequest,
     db: AsyncSession = Depends(get_db),
-) -> SuccessfulLoginResponse:
+    login_format: Annotated[LoginFormat, Depends(get_login_format)] = LoginFormat(),
+) -> SuccessfulLoginResponse | Response:
     """Handle user registration request."""
     if not all(
         [register_request.email, register_request.username, register_request.password]
@@ -44,9 +49,7 @@ async def register_user(
         )
 
     results = await db.execute(
-        select(User).where(
-            func.lower(User.username) == register_request.username.lower()
-        )
+        select(User).where(username_equals(register_request.username))
     )
     if results.first():
         raise HTTPException(
@@ -68,7 +71,7 @@ async def register_user(
         email_hash=email_hash,
         origin=0,
         salt=salt,
-        password_hash=hash_password(register_request.password + salt),
+        password_hash=await password_hashing.hash(register_request.password + salt),
         colour=get_random_colour(),
     )
     db.add(user)
@@ -85,4 +88,8 @@ async def register_user(
         user.id,
     )
 
-    return await get_successful_login_response(user_token, user, db)
+    return encode_login_response(
+        await get_successful_login_response(user_token, user, db),
+        login_format,
+        status_code=status.HTTP_201_CREATED,
+    )
@@ -1,8 +1,8 @@
 """Endpoint for token-based login."""
 
-from typing import Tuple
+from typing import Annotated, Tuple
 
-from fastapi import Depends, Security
+from fastapi import Depends, Response, Security
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.api_v1.router import api_router_v1
@@ -10,7 +10,10 @@ from src.database import get_db
 from src.models.user import User
 from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
+from src.util.login_payload import LoginFormat, encode_login_response, get_login_format
 from src.util.security import checked_auth_token
+from src.util.session_store import session_store
+from src.util.token_cache import token_cache
 from src.util.util import (
     SuccessfulLoginResponse,
     get_successful_login_response,
@@ -18,15 +21,20 @@ from src.util.util import (
 )
 
 
-@api_router_v1.post("/login/token", status_code=200)
+@api_router_v1.post(
+    "/login/token", status_code=200, response_model=SuccessfulLoginResponse
+)
 @handle_db_errors("Token login failed")
 async def login_token_user(
     user_and_token: Tuple[User, UserToken] = Security(checked_auth_token),
     db: AsyncSession = Depends(get_db),
-) -> SuccessfulLoginResponse:
+    login_format: Annotated[LoginFormat, Depends(get_login_format)] = LoginFormat(),
+) -> SuccessfulLoginResponse | Response:
     """Handle token-based login request."""
     user, old_token = user_and_token
     new_token = get_user_tokens(user)
+    previous_access_token_hash = old_token.access_token_hash
+    previous_refresh_token_hash = old_token.refresh_token_hash
 
     old_token.access_token = new_token.access_token
     old_token.refresh_token = new_token.refresh_token
@@ -34,5 +42,9 @@ async def login_token_user(
     old_token.refresh_token_expiration = new_token.refresh_token_expiration
     db.add(old_token)
     await db.commit()
+    await token_cache.invalidate_token(previous_access_token_hash)
+    await session_store.delete(previous_access_token_hash, previous_refresh_token_hash)
 
-    return await get_successful_login_response(old_token, user, db)
+    return encode_login_response(
+        await get_successful_login_response(old_token, user, db), login_format
+    )
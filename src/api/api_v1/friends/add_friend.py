@@ -17,7 +17,8 @@ from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
 from src.util.security import checked_auth_token
 from src.util.util import get_user_room
-from src.util.rest_util import emit_friend_response
+from src.util.rest_util import friend_response_data
+from src.util.socket_outbox import socket_outbox
 
 
 class AddFriendRequest(BaseModel):
@@ -66,10 +67,14 @@ async def add_friend(
     # TODO: Create private groups and chats?
     db.add(friend_me)
     db.add(friend_other)
-    await db.commit()
 
     recipient_room: str = get_user_room(friend_add.id)  # type: ignore[arg-type]
-    await emit_friend_response("friend_request_received", me, recipient_room)
+    socket_outbox.add(
+        db, "friend_request_received", friend_response_data(me), recipient_room
+    )
+
+    await db.commit()
+    await socket_outbox.flush(db)
 
     return {
         "success": True,
@@ -14,6 +14,7 @@ from src.models.friend import Friend
 from src.models.user import User
 from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
+from src.util.presence import presence
 from src.util.security import checked_auth_token
 
 
@@ -46,15 +47,24 @@ async def fetch_all_friends(
     friends_result = await db.execute(friends_statement)
     friends = friends_result.scalars().all()
 
+    # Presence is only shared between accepted friends
+    presences = await presence.lookup(
+        [friend.friend_id for friend in friends if friend.accepted]
+    )
+
     # Serialize friends data without user details (frontend will handle caching)
-    friends_data = [
-        {
-            "id": friend.id,
-            "friend_id": friend.friend_id,
-            "accepted": friend.accepted,
-            "friend_version": friend.friend_version,
-        }
-        for friend in friends
-    ]
+    friends_data = []
+    for friend in friends:
+        friend_presence = presences.get(friend.friend_id)
+        friends_data.append(
+            {
+                "id": friend.id,
+                "friend_id": friend.friend_id,
+                "accepted": friend.accepted,
+                "friend_version": friend.friend_version,
+                "online": friend_presence.online if friend_presence else False,
+                "last_seen": friend_presence.last_seen if friend_presence else None,
+            }
+        )
 
     return {"success": True, "data": friends_data}
@@ -10,11 +10,11 @@ from src.api.api_v1.router import api_router_v1
 from src.database import get_db
 from src.models.user import User
 from src.models.user_token import UserToken
-from src.sockets.sockets import sio
 from src.util.decorators import handle_db_errors
 from src.util.security import checked_auth_token
 from src.util.util import get_user_room
-from src.util.rest_util import get_friend_request_pair, emit_friend_response
+from src.util.rest_util import get_friend_request_pair, friend_response_data
+from src.util.socket_outbox import socket_outbox
 
 
 class RespondFriendRequest(BaseModel):
@@ -70,14 +70,17 @@ async def respond_friend_request(
 
         # Notify the sender that their request was accepted
         sender_room = get_user_room(friend_id)
-        await emit_friend_response(
+        socket_outbox.add(
+            db,
             "friend_request_accepted",
-            me,
+            friend_response_data(
+                me,
+                additional_data={
+                    "accepted": True,
+                    "friend_version": friend_request.friend_version,
+                },
+            ),
             sender_room,
-            additional_data={
-                "accepted": True,
-                "friend_version": friend_request.friend_version,
-            },
         )
     else:
         # Reject the friend request - remove both entries
@@ -86,15 +89,17 @@ async def respond_friend_request(
 
         # Notify the sender that their request was rejected
         sender_room = get_user_room(friend_id)
-        await sio.emit(
+        socket_outbox.add(
+            db,
             "friend_request_rejected",
             {
                 "friend_id": me.id,
             },
-            room=sender_room,
+            sender_room,
         )
 
     await db.commit()
+    await socket_outbox.flush(db)
 
     return {
         "success": True,
@@ -1,27 +1,119 @@
 """Endpoint for searching for friend."""
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from fastapi import Depends, Security
-from pydantic import BaseModel
-from sqlalchemy import func
+from pydantic import BaseModel, Field
+from sqlalchemy import ColumnElement, and_, func, literal, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.selectable import Select
 from sqlmodel import select
 
 from src.api.api_v1.router import api_router_v1
 from src.database import get_db
-from src.models.user import User
+from src.models.user import (
+    User,
+    username_equals,
+    username_lower,
+    username_sort_key,
+)
 from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
 from src.util.gold_logging import logger
 from src.util.security import checked_auth_token
 
 
+class SearchCursor(BaseModel):
+    """Position after the last match of a page, as returned in `next`."""
+
+    id: int
+    username: Optional[str] = None
+    score: Optional[float] = None
+
+
 class SearchFriendRequest(BaseModel):
     """Request model for searching friend."""
 
     username: str
+    mode: Literal["exact", "prefix", "fuzzy"] = "exact"
+    limit: int = Field(default=20, ge=1, le=50)
+    after: Optional[SearchCursor] = None
+
+
+def escape_like(value: str) -> str:
+    """Escape the LIKE wildcards in a search term."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def prefix_statement(
+    pattern: str, after: Optional[SearchCursor], sort_key: ColumnElement[str]
+) -> Select:
+    """Matches of a LIKE pattern ordered by `sort_key`, after the cursor."""
+    statement: Select = select(User).where(sort_key.like(pattern, escape="\\"))
+    if after is not None:
+        statement = statement.where(
+            tuple_(sort_key, User.id)  # type: ignore[arg-type]
+            > tuple_(literal(after.username or ""), literal(after.id))
+        )
+    return statement.order_by(sort_key, User.id)  # type: ignore[arg-type]
+
+
+def fuzzy_statement(term: str, after: Optional[SearchCursor]) -> Select:
+    """Trigram matches ordered by similarity, after the cursor."""
+    score = func.similarity(username_lower(), term)
+    statement: Select = select(User, score.label("score")).where(
+        username_lower().op("%")(term)
+    )
+    if after is not None and after.score is not None:
+        statement = statement.where(
+            or_(
+                score < after.score,
+                and_(score == after.score, User.id > after.id),  # type: ignore[arg-type, operator]
+            )
+        )
+    return statement.order_by(score.desc(), User.id)  # type: ignore[arg-type]
+
+
+async def search_users(
+    db: AsyncSession, search_request: SearchFriendRequest
+) -> Tuple[List[User], Optional[SearchCursor]]:
+    """
+    The top `limit` users matching a prefix or fuzzy search, and the cursor
+    of the next page if there is one.
+
+    Prefix search pages by username in byte order. On PostgreSQL that walks
+    `ix_User_username_lower_c` from the prefix and stops after `limit + 1`
+    rows, however many users match. Fuzzy search pages by trigram similarity
+    with the `pg_trgm` index, which finds the matches but not in similarity
+    order: every match of the term is scored and sorted before the limit, so
+    a short or common term costs in proportion to its matches. Without
+    `pg_trgm`, as on SQLite, fuzzy search falls back to matching the term
+    anywhere in the username, paged by username.
+    """
+    term = search_request.username.lower()
+    fuzzy = search_request.mode == "fuzzy"
+    dialect_name = db.get_bind().dialect.name
+    trigram = fuzzy and dialect_name == "postgresql"
+    if trigram:
+        statement = fuzzy_statement(term, search_request.after)
+    else:
+        pattern = escape_like(term) + "%"
+        if fuzzy:
+            pattern = "%" + pattern
+        statement = prefix_statement(
+            pattern, search_request.after, username_sort_key(dialect_name)
+        )
+    rows = (await db.execute(statement.limit(search_request.limit + 1))).all()
+    users: List[User] = [row.User for row in rows[: search_request.limit]]
+    if len(rows) <= search_request.limit:
+        return users, None
+    last = rows[search_request.limit - 1]
+    next_cursor = SearchCursor(
+        id=last.User.id,
+        username=None if trigram else last.User.username.lower(),
+        score=last.score if trigram else None,
+    )
+    return users, next_cursor
 
 
 @api_router_v1.post("/friend/search", status_code=200, response_model=dict)
@@ -32,11 +124,25 @@ async def search_friend(
         checked_auth_token, scopes=["user"]
     ),
     db: AsyncSession = Depends(get_db),
-) -> Dict[str, bool | Dict[str, Any]]:
-    """Handle search friend request."""
+) -> Dict[str, Any]:
+    """
+    Handle search friend request.
+
+    The default exact mode returns the one user with the username, ignoring
+    case. The prefix and fuzzy modes return a page of users and the cursor to
+    pass as `after` for the next page, None on the last page.
+    """
     user, _ = user_and_token
+    if search_friend_request.mode != "exact":
+        users, next_cursor = await search_users(db, search_friend_request)
+        return {
+            "success": True,
+            "data": [found_user.serialize for found_user in users],
+            "next": next_cursor.model_dump() if next_cursor else None,
+        }
+
     user_statement: Select = select(User).where(
-        func.lower(User.username) == search_friend_request.username.lower()
+        username_equals(search_friend_request.username)
     )
     results_user = await db.execute(user_statement)
     result_user = results_user.first()
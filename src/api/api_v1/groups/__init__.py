@@ -2,6 +2,7 @@
 
 from . import (
     add_group_member,
+    add_group_members,
     change_group_avatar,
     create_group,
     fetch_groups,
@@ -15,6 +16,7 @@ from . import (
 
 __all__ = [
     "add_group_member",
+    "add_group_members",
     "change_group_avatar",
     "create_group",
     "fetch_groups",
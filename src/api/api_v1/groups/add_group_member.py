@@ -12,6 +12,7 @@ from src.models.group import Group
 from src.models.user import User
 from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
+from src.util.room_cache import room_cache
 from src.util.security import checked_auth_token
 from src.util.util import (
     get_user_room,
@@ -75,6 +76,7 @@ async def add_group_member(
     db.add(group_entry)
 
     await db.commit()
+    await room_cache.invalidate(new_user_id)
 
     # Notify other group members about the new member
     await update_group_versions_and_notify(
@@ -0,0 +1,105 @@
+"""Endpoint for adding many members to a group at once."""
+
+from typing import Dict, List, Tuple
+
+from fastapi import Depends, HTTPException, Security, status
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.api_v1.router import api_router_v1
+from src.database import get_db
+from src.models.user import User
+from src.models.user_token import UserToken
+from src.util.decorators import handle_db_errors
+from src.util.rest_util import (
+    bump_group_versions,
+    group_response_data,
+    insert_group_members,
+)
+from src.util.room_cache import room_cache
+from src.util.security import checked_auth_token
+from src.util.socket_outbox import socket_outbox
+from src.util.util import get_chat_and_verify_admin, get_group_room, get_user_room
+
+# Most users one request may add.
+MAX_MEMBERS_ADDED = 500
+
+
+class AddGroupMembersRequest(BaseModel):
+    """Request model for adding many members to a group."""
+
+    group_id: int
+    user_add_ids: List[int] = Field(min_length=1, max_length=MAX_MEMBERS_ADDED)
+
+
+@api_router_v1.post("/group/member/add/batch", status_code=200)
+@handle_db_errors("Adding group members failed")
+async def add_group_members(
+    add_group_members_request: AddGroupMembersRequest,
+    user_and_token: Tuple[User, UserToken] = Security(
+        checked_auth_token, scopes=["user"]
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, bool]:
+    """
+    Handle add group members request.
+
+    All users are added in one transaction, or none are. The group members
+    get one `group_members_added` event with all new ids, and the new members
+    one `group_created` event.
+    """
+    me, _ = user_and_token
+
+    group_id = add_group_members_request.group_id
+    new_user_ids = sorted(set(add_group_members_request.user_add_ids))
+
+    # Check if the current user is an admin of the group
+    chat = await get_chat_and_verify_admin(
+        db,
+        group_id,
+        me.id,  # type: ignore[arg-type]
+        permission_error_detail="Only group admins can add members",
+    )
+
+    # Check if any of the users to add is already in the group
+    existing_ids = set(chat.user_ids).intersection(new_user_ids)
+    if existing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"User {min(existing_ids)} is already in the group",
+        )
+
+    # Existing members get a new group version, the new ones start at 1
+    await bump_group_versions(db, group_id)
+    chat.user_ids = sorted(chat.user_ids + new_user_ids)
+    db.add(chat)
+    await insert_group_members(db, group_id, new_user_ids)
+
+    socket_outbox.add(
+        db,
+        "group_members_added",
+        {"group_id": group_id, "user_ids": new_user_ids},
+        get_group_room(group_id),
+    )
+    socket_outbox.add(
+        db,
+        "group_created",
+        group_response_data(
+            chat,
+            {
+                "user_ids": chat.user_ids,
+                "admin_ids": chat.user_admin_ids,
+                "private": chat.private,
+                "current_message_id": chat.current_message_id,
+            },
+        ),
+        [get_user_room(user_id) for user_id in new_user_ids],
+    )
+
+    await db.commit()
+    await room_cache.invalidate(*new_user_ids)
+    await socket_outbox.flush(db)
+
+    return {
+        "success": True,
+    }
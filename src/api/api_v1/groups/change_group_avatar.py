@@ -10,6 +10,7 @@ from src.database import get_db
 from src.models import User, UserToken
 from src.sockets.sockets import sio
 from src.util.decorators import handle_db_errors
+from src.util.rest_util import bump_group_versions
 from src.util.security import checked_auth_token
 from src.util.util import get_group_room, get_chat_and_verify_admin
 
@@ -46,10 +47,8 @@ async def change_group_avatar(
         chat.remove_group_avatar(s3_client)
         chat.default_avatar = True
         chat.avatar_version += 1
-        for group in chat.groups:
-            group.group_version += 1
-            db.add(group)
         db.add(chat)
+        await bump_group_versions(db, group_id)
         await db.commit()
 
         group_room = get_group_room(group_id)
@@ -72,13 +71,10 @@ async def change_group_avatar(
     chat.create_group_avatar(s3_client, cipher, avatar_bytes)
     chat.avatar_version += 1
 
-    for group in chat.groups:
-        group.group_version += 1
-        db.add(group)
-
     if chat.default_avatar:
         chat.default_avatar = False
     db.add(chat)
+    await bump_group_versions(db, group_id)
 
     await db.commit()
 
@@ -13,13 +13,15 @@ from src.api.api_v1.router import api_router_v1
 from src.database import get_db
 from src.models.chat import Chat
 from src.models.friend import Friend
-from src.models.group import Group
 from src.models.user import User
 from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
+from src.util.gold_logging import logger
 from src.util.security import checked_auth_token
 from src.util.util import get_user_room
-from src.util.rest_util import emit_group_response
+from src.util.rest_util import group_response_data, insert_group_members
+from src.util.room_cache import room_cache
+from src.util.socket_outbox import socket_outbox
 
 
 class CreateGroupRequest(BaseModel):
@@ -42,38 +44,31 @@ async def create_group(
 ) -> Dict[str, bool | int]:
     """Handle create group request."""
     me, _ = user_and_token
-    print(f"User: {me}")
 
     if me.id is None:
         raise HTTPException(status_code=400, detail="Can't find user")
 
-    # Validate that all friend_ids are actual friends
     user_id = me.id
-    friend_ids = [user_id] + create_group_request.friend_ids
-    friend_ids.sort()
+    # A member listed twice, or the creator listed as a friend, joins once.
+    friend_ids = sorted({user_id, *create_group_request.friend_ids})
 
-    # Check if all friend_ids are valid friends
-    # TODO: Do in a single query? Is it even necessary?
-    for friend_id in create_group_request.friend_ids:
-        if friend_id == user_id:
-            continue  # Skip self
-
-        # Check if this is a valid friend relationship
-        friend_statement: Select = select(Friend).where(
+    # Validate that all friend_ids are accepted friends, in one query
+    invited_ids = [friend_id for friend_id in friend_ids if friend_id != user_id]
+    if invited_ids:
+        friend_statement: Select = select(Friend.friend_id).where(
             Friend.user_id == user_id,
-            Friend.friend_id == friend_id,
+            Friend.friend_id.in_(invited_ids),  # type: ignore[attr-defined]
             Friend.accepted,
         )
         friend_result = await db.execute(friend_statement)
-        friend_exists = friend_result.first()
-
-        if not friend_exists:
+        not_friend_ids = set(invited_ids) - set(friend_result.scalars().all())
+        if not_friend_ids:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"User {friend_id} is not your friend",
+                detail=f"User {min(not_friend_ids)} is not your friend",
             )
 
-    # Create the chat object
+    # Create the chat and its members in one transaction
     new_chat = Chat(
         user_ids=friend_ids,
         user_admin_ids=[user_id],
@@ -87,42 +82,36 @@ async def create_group(
     )
 
     db.add(new_chat)
-    await db.commit()
-    await db.refresh(new_chat)
-
-    # Create group entries for each user
-    for friend_id in friend_ids:
-        group_entry = Group(
-            user_id=friend_id,
-            group_id=new_chat.id,
-            unread_messages=0,
-            mute=False,
-            last_message_read_id=0,
-        )
-        db.add(group_entry)
+    await db.flush()
+    await insert_group_members(db, new_chat.id, friend_ids)
+
+    # Notify all group members about the new group, except yourself
+    recipient_rooms: List[str] = [
+        get_user_room(friend_id) for friend_id in friend_ids if friend_id != user_id
+    ]
+    socket_outbox.add(
+        db,
+        "group_created",
+        group_response_data(
+            new_chat,
+            {
+                "user_ids": new_chat.user_ids,
+                "admin_ids": new_chat.user_admin_ids,
+                "private": new_chat.private,
+                "current_message_id": new_chat.current_message_id,
+            },
+        ),
+        recipient_rooms,
+    )
 
     s3_key = new_chat.group_avatar_s3_key(new_chat.group_avatar_filename_default())
     await db.commit()
+    await room_cache.invalidate(*friend_ids)
+    await socket_outbox.flush(db)
     _ = task_generate_avatar.delay(
         new_chat.group_avatar_filename(),
         s3_key,
         new_chat.id,
     )
-    # Notify all group members about the new group
-    for friend_id in friend_ids:
-        if friend_id != user_id:  # Don't notify self
-            recipient_room: str = get_user_room(friend_id)
-            print(f"Recipient Room: {recipient_room}")
-            await emit_group_response(
-                "group_created",
-                new_chat,
-                recipient_room,
-                {
-                    "user_ids": new_chat.user_ids,
-                    "admin_ids": new_chat.user_admin_ids,
-                    "private": new_chat.private,
-                    "current_message_id": new_chat.current_message_id,
-                },
-            )
-    print(f"sending data: {new_chat.id}")
+    logger.info("User %s created group %s", me.username, new_chat.id)
     return {"success": True, "data": new_chat.id}
@@ -1,6 +1,6 @@
 """Endpoint for leaving a group."""
 
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 from fastapi import Depends, HTTPException, Security
 from pydantic import BaseModel
@@ -14,9 +14,10 @@ from src.models.chat import Chat
 from src.models.group import Group
 from src.models.user import User
 from src.models.user_token import UserToken
-from src.sockets.sockets import sio
 from src.util.decorators import handle_db_errors
 from src.util.security import checked_auth_token
+from src.util.room_cache import room_cache
+from src.util.socket_outbox import socket_outbox
 from src.util.util import get_user_room
 
 
@@ -72,19 +73,21 @@ async def leave_group(
     if len(chat.user_ids) == 0:
         await db.delete(chat)
 
-    await db.commit()
-
     # Notify other group members that someone left
-    for user_id in chat.user_ids:
-        recipient_room: str = get_user_room(user_id)
-        await sio.emit(
-            "group_member_left",
-            {
-                "group_id": group_id,
-                "user_id": me.id,
-            },
-            room=recipient_room,
-        )
+    recipient_rooms: List[str] = [get_user_room(user_id) for user_id in chat.user_ids]
+    socket_outbox.add(
+        db,
+        "group_member_left",
+        {
+            "group_id": group_id,
+            "user_id": me.id,
+        },
+        recipient_rooms,
+    )
+
+    await db.commit()
+    await room_cache.invalidate(me.id)  # type: ignore[arg-type]
+    await socket_outbox.flush(db)
 
     return {
         "success": True,
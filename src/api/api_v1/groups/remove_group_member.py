@@ -14,9 +14,10 @@ from src.models.chat import Chat
 from src.models.group import Group
 from src.models.user import User
 from src.models.user_token import UserToken
-from src.sockets.sockets import sio
 from src.util.decorators import handle_db_errors
 from src.util.security import checked_auth_token
+from src.util.room_cache import room_cache
+from src.util.socket_outbox import socket_outbox
 from src.util.util import get_group_room
 
 
@@ -91,18 +92,21 @@ async def remove_group_member(
     if group_entry:
         await db.delete(group_entry.Group)
 
-    await db.commit()
-
     group_room = get_group_room(group_id)
-    await sio.emit(
+    socket_outbox.add(
+        db,
         "group_member_removed",
         {
             "group_id": group_id,
             "user_id": user_to_remove_id,
         },
-        room=group_room,
+        group_room,
     )
 
+    await db.commit()
+    await room_cache.invalidate(user_to_remove_id)
+    await socket_outbox.flush(db)
+
     return {
         "success": True,
     }
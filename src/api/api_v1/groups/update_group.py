@@ -13,7 +13,7 @@ from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
 from src.util.security import checked_auth_token
 from src.util.util import get_group_room, get_chat_and_verify_admin
-from src.util.rest_util import emit_group_response
+from src.util.rest_util import bump_group_versions, emit_group_response
 
 
 class UpdateGroupRequest(BaseModel):
@@ -55,11 +55,7 @@ async def update_group(
     if update_group_request.group_colour is not None:
         chat.group_colour = update_group_request.group_colour
     db.add(chat)
-
-    for group in chat.groups:
-        group.group_version += 1
-        db.add(group)
-
+    await bump_group_versions(db, group_id)
     await db.commit()
 
     # TODO: Only send what is changed?
@@ -8,7 +8,7 @@ from urllib.parse import urlencode
 import httpx
 import jwt as pyjwt
 from fastapi import Depends, Form, HTTPException, status
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -22,6 +22,7 @@ from src.config.config import settings
 from src.database import get_db
 from src.models.user import User
 from src.sockets.sockets import redis
+from src.util.login_payload import LoginFormat, encode_login_response, get_login_format
 from src.util.util import (
     SuccessfulLoginResponse,
     get_successful_login_response,
@@ -44,17 +45,22 @@ class AppleTokenRequest(BaseModel):
     access_token: str
 
 
-@api_router_v1.post("/auth/apple/token", status_code=200)
+@api_router_v1.post(
+    "/auth/apple/token", status_code=200, response_model=SuccessfulLoginResponse
+)
 async def login_apple_token(
     apple_token_request: AppleTokenRequest,
     db: AsyncSession = Depends(get_db),
-) -> SuccessfulLoginResponse:
+    login_format: Annotated[LoginFormat, Depends(get_login_format)] = LoginFormat(),
+) -> SuccessfulLoginResponse | Response:
     """Validates an Apple token and logs in the user."""
     user = await validate_apple_user(apple_token_request.access_token, db)
     user_token = get_user_tokens(user)
     db.add(user_token)
     await db.commit()
-    return await get_successful_login_response(user_token, user, db)
+    return encode_login_response(
+        await get_successful_login_response(user_token, user, db), login_format
+    )
 
 
 @api_router_v1.get("/auth/apple")
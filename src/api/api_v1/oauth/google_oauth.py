@@ -1,11 +1,12 @@
 """Handler for the Google oauth2 flow"""
 
 import secrets
+from typing import Annotated
 from urllib.parse import urlencode
 
 import httpx
 from fastapi import Depends, HTTPException, status
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,6 +20,7 @@ from src.config.config import settings
 from src.database import get_db
 from src.models.user import User
 from src.sockets.sockets import redis
+from src.util.login_payload import LoginFormat, encode_login_response, get_login_format
 from src.util.util import (
     SuccessfulLoginResponse,
     get_successful_login_response,
@@ -54,18 +56,23 @@ class GoogleTokenRequest(BaseModel):
     access_token: str
 
 
-@api_router_v1.post("/auth/google/token", status_code=200)
+@api_router_v1.post(
+    "/auth/google/token", status_code=200, response_model=SuccessfulLoginResponse
+)
 async def login_google_token(
     google_token_request: GoogleTokenRequest,
     db: AsyncSession = Depends(get_db),
-) -> SuccessfulLoginResponse:
+    login_format: Annotated[LoginFormat, Depends(get_login_format)] = LoginFormat(),
+) -> SuccessfulLoginResponse | Response:
     """Logs in a user using their Google token."""
     user = await validate_google_user(google_token_request.access_token, db)
     user_token = get_user_tokens(user)
     db.add(user_token)
     await db.commit()
 
-    return await get_successful_login_response(user_token, user, db)
+    return encode_login_response(
+        await get_successful_login_response(user_token, user, db), login_format
+    )
 
 
 @api_router_v1.get("/auth/google")
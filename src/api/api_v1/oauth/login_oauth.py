@@ -1,20 +1,27 @@
 """Login user with oauth2"""
 
 import re
+from typing import List, Set
 
 from fastapi import HTTPException, status
 from fastapi.responses import RedirectResponse
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.selectable import Select
 from sqlmodel import select
 
 from age_of_gold_worker.age_of_gold_worker.tasks import task_generate_avatar
 from src.config.config import settings
-from src.models.user import User, hash_email
+from src.models.user import User, hash_email, username_lower
 from src.sockets.sockets import redis
+from src.util.gold_logging import logger
 from src.util.util import get_random_colour
 
+# Numbered variants of a taken username go up to, but not including, this.
+MAX_USERNAME_INDEX = 100
+# Free names tried when concurrent sign ups keep taking them first.
+USERNAME_INSERT_ATTEMPTS = 3
+
 
 async def validate_oauth_state(
     state: str,
@@ -40,44 +47,55 @@ def _sanitize_username(username: str) -> str:
     return username
 
 
-async def _find_available_username(db: AsyncSession, username: str) -> str:
-    """Find an available username by appending a number if necessary."""
-    new_user_name = username
-    index = 2
-    while index < 100:
-        statement_name_new: Select = select(User).where(
-            func.lower(User.username) == new_user_name.lower()
-        )
-        results_name_new = await db.execute(statement_name_new)
-        result_username_new = results_name_new.first()
-        if not result_username_new:
-            break
-        new_user_name = f"{username}_{index}"
-        index += 1
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Couldn't create the user",
-        )
-    return new_user_name
+async def _taken_usernames(db: AsyncSession, candidates: List[str]) -> Set[str]:
+    """The lower cased candidates that are taken, found in one indexed query."""
+    statement: Select = select(username_lower()).where(
+        username_lower().in_([candidate.lower() for candidate in candidates])
+    )
+    results = await db.execute(statement)
+    return set(results.scalars().all())
+
+
+async def _available_usernames(db: AsyncSession, username: str) -> List[str]:
+    """The free usernames of `username`, `username_2` up to `username_99`, in order."""
+    candidates = [username] + [
+        f"{username}_{index}" for index in range(2, MAX_USERNAME_INDEX)
+    ]
+    taken = await _taken_usernames(db, candidates)
+    return [candidate for candidate in candidates if candidate.lower() not in taken]
 
 
 async def _create_user(
     db: AsyncSession, username: str, hashed_email: str, origin: int
 ) -> tuple[User, bool]:
-    """Create a new user if the username is available, otherwise find an available username."""
-    new_user_name = await _find_available_username(db, username)
-    user = User(
-        username=new_user_name,
-        email_hash=hashed_email,
-        password_hash="",
-        salt="",
-        origin=origin,
-        colour=get_random_colour(),
+    """
+    Create a new user with the first available variant of the username.
+
+    A concurrent sign up can take the name between the lookup and the insert,
+    then the unique constraint fails the commit and the next free name is tried.
+    """
+    available = await _available_usernames(db, username)
+    for new_user_name in available[:USERNAME_INSERT_ATTEMPTS]:
+        user = User(
+            username=new_user_name,
+            email_hash=hashed_email,
+            password_hash="",
+            salt="",
+            origin=origin,
+            colour=get_random_colour(),
+        )
+        db.add(user)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            logger.info("Username %s was taken during sign up", new_user_name)
+            continue
+        return user, True
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Couldn't create the user",
     )
-    db.add(user)
-    await db.commit()
-    return user, True
 
 
 async def login_user_oauth(
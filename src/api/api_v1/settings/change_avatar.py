@@ -12,7 +12,8 @@ from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
 from src.util.gold_logging import logger
 from src.util.security import checked_auth_token
-from src.util.rest_util import update_friend_versions_and_notify
+from src.util.token_cache import token_cache
+from src.util.rest_util import notify_friends
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
 MAX_AVATAR_SIZE = 4 * 1024 * 1024  # 4MB
@@ -40,8 +41,8 @@ async def change_avatar(
         me.avatar_version += 1
         db.add(me)
 
-        # Update friend versions and notify about avatar change
-        await update_friend_versions_and_notify(
+        # Notify friends about the avatar change
+        await notify_friends(
             db,
             me.id,  # type: ignore[arg-type]
             "avatar_updated",
@@ -49,6 +50,7 @@ async def change_avatar(
         )
 
         await db.commit()
+        await token_cache.invalidate_user(me.id)  # type: ignore[arg-type]
         return {"success": True}
 
     if not avatar.size or not avatar.filename:
@@ -67,7 +69,7 @@ async def change_avatar(
         me.default_avatar = False
     db.add(me)
 
-    await update_friend_versions_and_notify(
+    await notify_friends(
         db,
         me.id,  # type: ignore[arg-type]
         "avatar_updated",
@@ -75,6 +77,7 @@ async def change_avatar(
     )
 
     await db.commit()
+    await token_cache.invalidate_user(me.id)  # type: ignore[arg-type]
 
     logger.info("User %s changed their avatar", me.username)
     return {
@@ -18,6 +18,8 @@ from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
 from src.util.gold_logging import logger
 from src.util.security import checked_auth_token
+from src.util.session_store import session_store
+from src.util.token_cache import token_cache
 from src.util.util import get_user_tokens
 
 
@@ -39,6 +41,8 @@ async def delete_account(
     me.remove_avatar_default(s3_client)
     await db.delete(me)
     await db.commit()
+    await token_cache.invalidate_user(me.id)  # type: ignore[arg-type]
+    await session_store.delete_user(me.id)  # type: ignore[arg-type]
     return {"success": True}
 
 
@@ -90,23 +94,35 @@ async def delete_account_all(
     """Delete all accounts associated with the user's email."""
     me, _ = user_and_token
 
+    # The members of every relationship are loaded in one statement each, so
+    # deleting the users does not load them per user.
     origins_statement: Select = (
         select(User)
         .where(User.email_hash == me.email_hash)
-        .options(selectinload(User.tokens))  # type: ignore
+        .options(
+            selectinload(User.tokens),  # type: ignore
+            selectinload(User.friends),  # type: ignore
+            selectinload(User.groups),  # type: ignore
+        )
     )
     origins_results = await db.execute(origins_statement)
     origins_result = origins_results.all()
 
     s3_client = request.app.state.s3
 
+    deleted_user_ids = [origin_result.User.id for origin_result in origins_result]
+    await db.execute(
+        delete(UserToken).where(UserToken.user_id.in_(deleted_user_ids))  # type: ignore
+    )
     for origin_result in origins_result:
         user_delete: User = origin_result.User
-        await db.execute(delete(UserToken).where(UserToken.user_id == user_delete.id))  # type: ignore
         user_delete.remove_avatar(s3_client)
         user_delete.remove_avatar_default(s3_client)
         await db.delete(user_delete)
     await db.commit()
+    for deleted_user_id in deleted_user_ids:
+        await token_cache.invalidate_user(deleted_user_id)
+        await session_store.delete_user(deleted_user_id)
 
     return {
         "success": True,
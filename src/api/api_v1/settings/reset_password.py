@@ -12,8 +12,9 @@ from src.models.user import User
 from src.models.user_token import UserToken
 from src.util.decorators import handle_db_errors
 from src.util.gold_logging import logger
+from src.util.password_hashing import password_hashing
 from src.util.security import checked_auth_token
-from src.util.util import hash_password
+from src.util.token_cache import token_cache
 
 
 class ResetPasswordRequest(BaseModel):
@@ -33,9 +34,12 @@ async def reset_password(
 ) -> Dict[str, bool]:
     """Handle reset password request."""
     user, _ = user_and_token
-    user.password_hash = hash_password(reset_password_request.new_password + user.salt)
+    user.password_hash = await password_hashing.hash(
+        reset_password_request.new_password + user.salt
+    )
     db.add(user)
     await db.commit()
+    await token_cache.invalidate_user(user.id)  # type: ignore[arg-type]
     logger.info("User %s changed their password", user.username)
     return {
         "success": True,
@@ -0,0 +1,5 @@
+"""File for the sync endpoints."""
+
+from . import sync_changes
+
+__all__ = ["sync_changes"]
@@ -0,0 +1,136 @@
+"""Endpoint for fetching the friends and groups changed since a cursor."""
+
+from typing import Any, Dict, List, Tuple
+
+from fastapi import Depends, Security
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.sql.selectable import Select
+from sqlmodel import or_, select
+
+from src.api.api_v1.router import api_router_v1
+from src.database import get_db
+from src.models import Chat, Friend, Group, Tombstone, User, UserToken
+from src.models.model_util.change_sequence import change_seq_horizon
+from src.util.decorators import handle_db_errors
+from src.util.security import checked_auth_token
+
+
+class SyncRequest(BaseModel):
+    """Request model for syncing changes, 0 fetches everything."""
+
+    cursor: int = 0
+
+
+async def removed_ids(
+    db: AsyncSession, user_id: int, kind: str, cursor: int
+) -> List[int]:
+    """
+    Targets of the tombstones of `kind` stamped at or after the cursor.
+
+    A friend or group that was removed and added again is left out, the row
+    that exists now is part of the regular response.
+    """
+    target = Friend if kind == "friend" else Group
+    target_id = Friend.friend_id if kind == "friend" else Group.group_id
+    statement: Select = (
+        select(Tombstone.target_id)
+        .where(
+            Tombstone.user_id == user_id,
+            Tombstone.kind == kind,
+            Tombstone.change_seq >= cursor,  # type: ignore[operator]
+            ~select(target.id)
+            .where(target.user_id == user_id, target_id == Tombstone.target_id)
+            .exists(),
+        )
+        .distinct()
+    )
+    results = await db.execute(statement)
+    return sorted(results.scalars().all())
+
+
+@api_router_v1.post("/sync", status_code=200)
+@handle_db_errors("Sync failed")
+async def sync_changes(
+    sync_request: SyncRequest,
+    user_and_token: Tuple[User, UserToken] = Security(
+        checked_auth_token, scopes=["user"]
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Return the friends and groups of the user written at or after the cursor.
+
+    The returned cursor is read before the rows, so a write that lands while
+    the rows are read is returned again on the next sync instead of skipped.
+    A friend is also returned when their profile or avatar changed, with the
+    current versions. Friends and groups removed since the cursor are listed
+    by id, a full sync (cursor 0) has nothing to remove and skips them.
+    """
+    user, _ = user_and_token
+    cursor = (await db.execute(select(change_seq_horizon()))).scalar_one()
+
+    friends_statement: Select = (
+        select(Friend, User.profile_version, User.avatar_version)
+        .join(User, User.id == Friend.friend_id)  # type: ignore[arg-type]
+        .where(
+            Friend.user_id == user.id,
+            or_(
+                Friend.change_seq >= sync_request.cursor,  # type: ignore[operator]
+                User.change_seq >= sync_request.cursor,  # type: ignore[operator]
+            ),
+        )
+    )
+    friends = (await db.execute(friends_statement)).all()
+
+    groups_statement: Select = (
+        select(Group)
+        .join(Chat, Chat.id == Group.group_id)  # type: ignore[arg-type]
+        .where(
+            Group.user_id == user.id,
+            or_(
+                Group.change_seq >= sync_request.cursor,  # type: ignore[operator]
+                Chat.change_seq >= sync_request.cursor,  # type: ignore[operator]
+            ),
+        )
+        .options(contains_eager(Group.chat))  # type: ignore[arg-type]
+    )
+    groups = (await db.execute(groups_statement)).scalars().all()
+
+    removed_friend_ids: List[int] = []
+    removed_group_ids: List[int] = []
+    if sync_request.cursor > 0:
+        removed_friend_ids = await removed_ids(
+            db,
+            user.id,  # type: ignore[arg-type]
+            "friend",
+            sync_request.cursor,
+        )
+        removed_group_ids = await removed_ids(
+            db,
+            user.id,  # type: ignore[arg-type]
+            "group",
+            sync_request.cursor,
+        )
+
+    return {
+        "success": True,
+        "data": {
+            "cursor": cursor,
+            "friends": [
+                {
+                    "id": friend.id,
+                    "friend_id": friend.friend_id,
+                    "accepted": friend.accepted,
+                    "friend_version": friend.friend_version,
+                    "profile_version": profile_version,
+                    "avatar_version": avatar_version,
+                }
+                for friend, profile_version, avatar_version in friends
+            ],
+            "groups": [group.serialize for group in groups],
+            "removed_friend_ids": removed_friend_ids,
+            "removed_group_ids": removed_group_ids,
+        },
+    }
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -94,8 +94,51 @@ class Settings(BaseSettings):
     POOL_RECYCLE: int = 3600
     POOL_PRE_PING: bool = True
 
+    SLOW_QUERY_THRESHOLD: float = 0.2
+    SLOW_QUERY_WINDOW: int = 1000
+    SLOW_QUERY_LOG_SIZE: int = 100
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 1000
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAIN_COOLDOWN: float = 300.0
+    # EXPLAIN ANALYZE runs a slow statement again, only switch it on to debug.
+    SLOW_QUERY_EXPLAIN_ANALYZE: bool = False
+
+    # Token for the admin endpoints, they are disabled while it is empty.
+    ADMIN_TOKEN: str = ""
+
     DEBUG: bool = False
 
+    # Logger name -> keep one in this many records below WARNING.
+    LOG_SAMPLE_RATES: Dict[str, int] = {"src.sockets.sockets": 10}
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    TOKEN_CACHE_ENABLED: bool = False
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+
+    SESSION_STORE_ENABLED: bool = False
+
+    FRIEND_VERSION_BUMP: bool = False
+
+    SOCKET_OUTBOX_ENABLED: bool = False
+    SOCKET_OUTBOX_BATCH_SIZE: int = 500
+    SOCKET_OUTBOX_POLL_INTERVAL: float = 1.0
+
+    SOCKET_PUBSUB_SHARDS: int = 0
+    SOCKET_SERIALIZER: Literal["default", "msgpack"] = "default"
+    SOCKET_MANAGER_MSGPACK: bool = False
+
+    SOCKET_ROOM_CACHE_TTL: int = 3600
+
+    SOCKET_COALESCE_ENABLED: bool = False
+    SOCKET_COALESCE_WINDOW: float = 0.05
+    SOCKET_COALESCE_MAX_EVENTS: int = 50
+
+    PRESENCE_TTL: int = 90
+    PRESENCE_HEARTBEAT_INTERVAL: float = 30.0
+
     FRONTEND_URL: str
     ALLOWED_ORIGINS: str
 
@@ -14,6 +14,7 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config.config import settings
+from src.util.query_log import slow_query_log
 
 engine_async = create_async_engine(
     settings.ASYNC_DB_URL,
@@ -24,6 +25,7 @@ engine_async = create_async_engine(
     pool_recycle=settings.POOL_RECYCLE,
     echo=settings.DEBUG,
 )
+slow_query_log.instrument(engine_async)
 
 async_session = async_scoped_session(
     async_sessionmaker(
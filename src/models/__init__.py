@@ -5,5 +5,7 @@ from .user_token import UserToken
 from .friend import Friend
 from .group import Group
 from .chat import Chat
+from .socket_event import SocketEvent
+from .tombstone import Tombstone
 
-__all__ = ["Chat", "Group", "User", "UserToken", "Friend"]
+__all__ = ["Chat", "Group", "User", "UserToken", "Friend", "SocketEvent", "Tombstone"]
@@ -1,13 +1,14 @@
 """Chat model."""
 
 from hashlib import md5
-from typing import TYPE_CHECKING, Any, List
+from typing import TYPE_CHECKING, Any, List, Optional
 
 from botocore.exceptions import ClientError
 from cryptography.fernet import Fernet
 from sqlmodel import Column, Field, Relationship, SQLModel
 
 from src.config.config import settings
+from src.models.model_util.change_sequence import change_seq_column
 from src.models.model_util.zwaar_array import ZwaarArray
 from src.util.gold_logging import logger
 from src.util.storage_util import upload_image
@@ -22,6 +23,7 @@ class Chat(SQLModel, table=True):
     """
 
     __tablename__ = "Chat"  # pyright: ignore[reportAssignmentType]
+    __mapper_args__ = {"eager_defaults": True}
     id: int = Field(default=None, primary_key=True)
     user_ids: List[int] = Field(default=[], sa_column=Column(ZwaarArray()))
     user_admin_ids: List[int] = Field(default=[], sa_column=Column(ZwaarArray()))
@@ -34,6 +36,9 @@ class Chat(SQLModel, table=True):
     last_message_read_id_chat: int = Field(default=1)
     message_version: int = Field(default=1)  # TODO: Move to group?
     avatar_version: int = Field(default=1)
+    change_seq: Optional[int] = Field(
+        default=None, sa_column=change_seq_column(index=True)
+    )
 
     groups: List["Group"] = Relationship(
         back_populates="chat",
@@ -2,8 +2,11 @@
 
 from typing import TYPE_CHECKING, Any, Dict, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.models.model_util.change_sequence import change_seq_column
+
 
 if TYPE_CHECKING:
     from src.models import User
@@ -15,11 +18,17 @@ class Friend(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
     """
 
     __tablename__ = "Friend"  # pyright: ignore[reportAssignmentType]
+    __table_args__ = (
+        Index("ix_Friend_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_Friend_user_id_friend_id", "user_id", "friend_id", unique=True),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="User.id")
-    friend_id: int = Field(foreign_key="User.id")
+    friend_id: int = Field(foreign_key="User.id", index=True)
     accepted: Optional[bool] = Field(default=None)
     friend_version: int = Field(default=1)
+    change_seq: Optional[int] = Field(default=None, sa_column=change_seq_column())
 
     friend: "User" = Relationship(
         back_populates="friends",
@@ -3,8 +3,11 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Dict, Any
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 
+from src.models.model_util.change_sequence import change_seq_column
+
 if TYPE_CHECKING:
     from src.models import Chat
     from src.models import User
@@ -16,6 +19,11 @@ class Group(SQLModel, table=True):
     """
 
     __tablename__ = "Group"  # pyright: ignore[reportAssignmentType]
+    __table_args__ = (
+        Index("ix_Group_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_Group_user_id_group_id", "user_id", "group_id", unique=True),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     id: int = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="User.id")
     group_id: int = Field(foreign_key="Chat.id")  # TODO: rename to chat_id?
@@ -24,6 +32,7 @@ class Group(SQLModel, table=True):
     mute_timestamp: Optional[datetime] = Field(default=None)
     last_message_read_id: int = Field(default=0)
     group_version: int = Field(default=1)
+    change_seq: Optional[int] = Field(default=None, sa_column=change_seq_column())
 
     chat: "Chat" = Relationship(
         back_populates="groups",
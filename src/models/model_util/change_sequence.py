@@ -0,0 +1,73 @@
+"""
+Global change sequence stamped on every Friend, Group, Chat, User and Tombstone write.
+
+On PostgreSQL a row is stamped with the id of the transaction that wrote it
+and the sync horizon is the oldest transaction that is still running, so a
+sync never skips a row whose transaction commits later. Other dialects
+(e.g. SQLite) serialize writers, there a write takes the current maximum plus
+one and the horizon is that same value.
+
+Clients keep the horizon they were given and ask for rows stamped at or after
+it; rows can be delivered twice, never missed.
+"""
+
+from typing import Any
+
+from sqlalchemy import BigInteger, Column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
+
+CHANGE_SEQ_TABLES = ("Friend", "Group", "Chat", "User", "Tombstone")
+
+
+class next_change_seq(FunctionElement[int]):  # pylint: disable=C0103
+    """Change sequence value for a row written by the current transaction."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+class change_seq_horizon(FunctionElement[int]):  # pylint: disable=C0103
+    """Lowest change sequence value a write that is not yet visible can carry."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_change_seq, "postgresql")
+def _next_change_seq_postgresql(
+    element: next_change_seq, compiler: SQLCompiler, **kw: Any
+) -> str:
+    return "pg_current_xact_id()::text::bigint"
+
+
+@compiles(change_seq_horizon, "postgresql")
+def _change_seq_horizon_postgresql(
+    element: change_seq_horizon, compiler: SQLCompiler, **kw: Any
+) -> str:
+    return "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
+
+@compiles(next_change_seq)
+@compiles(change_seq_horizon)
+def _max_change_seq(
+    element: FunctionElement[int], compiler: SQLCompiler, **kw: Any
+) -> str:
+    maxima = ", ".join(
+        f'coalesce((SELECT max(change_seq) FROM "{table}"), 0)'
+        for table in CHANGE_SEQ_TABLES
+    )
+    return f"(max({maxima}) + 1)"
+
+
+def change_seq_column(index: bool = False) -> Column[int]:
+    """Column that is stamped with `next_change_seq` on every insert and update."""
+    return Column(
+        "change_seq",
+        BigInteger(),
+        default=next_change_seq(),
+        onupdate=next_change_seq(),
+        nullable=False,
+        index=index,
+    )
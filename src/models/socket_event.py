@@ -0,0 +1,23 @@
+"""Socket event outbox model"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import JSON
+from sqlmodel import Column, Field, SQLModel
+
+
+class SocketEvent(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
+    """
+    Socket event waiting to be emitted.
+
+    Rows are written in the same transaction as the change they announce and
+    removed by the outbox dispatcher once they have been emitted.
+    """
+
+    __tablename__ = "SocketEvent"  # pyright: ignore[reportAssignmentType]
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event: str
+    data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON, nullable=False))
+    rooms: List[str] = Field(default=[], sa_column=Column(JSON, nullable=False))
+    created_at: int = Field(default_factory=lambda: int(time.time()))
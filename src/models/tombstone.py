@@ -0,0 +1,52 @@
+"""Tombstone model"""
+
+from typing import Any, Optional
+
+from sqlalchemy import Connection, Index, event, insert
+from sqlalchemy.orm import Mapper
+from sqlmodel import Field, SQLModel
+
+from src.models.friend import Friend
+from src.models.group import Group
+from src.models.model_util.change_sequence import change_seq_column
+
+
+class Tombstone(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
+    """
+    Removal of a friend or group from the view of one user.
+
+    Rows are written in the flush that deletes the Friend or Group row, so
+    `/sync` can tell a client about removals made after its cursor. They are
+    written just before the delete, while the removed row still counts for
+    the change sequence of dialects that stamp the current maximum plus one.
+    """
+
+    __tablename__ = "Tombstone"  # pyright: ignore[reportAssignmentType]
+    __table_args__ = (
+        Index("ix_Tombstone_user_id_change_seq", "user_id", "change_seq"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int
+    kind: str = Field(max_length=16)
+    target_id: int
+    change_seq: Optional[int] = Field(default=None, sa_column=change_seq_column())
+
+
+@event.listens_for(Friend, "before_delete")
+def _friend_deleted(
+    mapper: Mapper[Any], connection: Connection, target: Friend
+) -> None:
+    connection.execute(
+        insert(Tombstone).values(
+            user_id=target.user_id, kind="friend", target_id=target.friend_id
+        )
+    )
+
+
+@event.listens_for(Group, "before_delete")
+def _group_deleted(mapper: Mapper[Any], connection: Connection, target: Group) -> None:
+    connection.execute(
+        insert(Tombstone).values(
+            user_id=target.user_id, kind="group", target_id=target.group_id
+        )
+    )
@@ -10,10 +10,12 @@ import jwt as pyjwt
 from argon2 import PasswordHasher, exceptions
 from botocore.exceptions import ClientError
 from cryptography.fernet import Fernet
+from sqlalchemy import ColumnElement, Index, func
 from sqlmodel import Field, Relationship, SQLModel
 
 from src.config.config import settings
 from src.config.jwt_key import jwt_private_key
+from src.models.model_util.change_sequence import change_seq_column
 from src.util.storage_util import upload_image
 from src.util.gold_logging import logger
 
@@ -41,6 +43,7 @@ class User(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
     """
 
     __tablename__ = "User"  # pyright: ignore[reportAssignmentType]
+    __table_args__ = (Index("ix_User_email_hash_origin", "email_hash", "origin"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(index=True, unique=True)
     colour: str
@@ -51,6 +54,8 @@ class User(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
     default_avatar: bool = Field(default=True)
     profile_version: int = Field(default=1)
     avatar_version: int = Field(default=1)
+    # Stamped on profile and avatar changes, `/sync` reports them to friends.
+    change_seq: Optional[int] = Field(default=None, sa_column=change_seq_column())
 
     tokens: List["UserToken"] = Relationship(back_populates="user")
     friends: List["Friend"] = Relationship(
@@ -158,3 +163,42 @@ class User(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
             "avatar_version": self.avatar_version,
             "colour": self.colour,
         }
+
+
+def username_lower() -> ColumnElement[str]:
+    """The lower cased username, the expression the username indexes are on."""
+    return func.lower(User.__table__.c.username)  # type: ignore[attr-defined]
+
+
+def username_equals(username: str) -> ColumnElement[bool]:
+    """Case-insensitive username match, served by `ix_User_username_lower`."""
+    return username_lower() == username.lower()
+
+
+def username_sort_key(dialect_name: str) -> ColumnElement[str]:
+    """
+    The lower cased username in byte order, for LIKE prefixes and paging.
+
+    A btree in the database collation can't serve `LIKE 'prefix%'` unless that
+    collation is C, so PostgreSQL compares in the C collation, which
+    `ix_User_username_lower_c` is built in. SQLite compares bytes already.
+    """
+    if dialect_name == "postgresql":
+        return username_lower().collate("C")
+    return username_lower()
+
+
+Index("ix_User_username_lower", username_lower())
+# Prefix search in username order, PostgreSQL only, see `username_sort_key`.
+Index(
+    "ix_User_username_lower_c",
+    username_sort_key("postgresql"),
+    User.__table__.c.id,  # type: ignore[attr-defined]
+).ddl_if(dialect="postgresql")
+# Trigram index serving prefix and fuzzy username search, PostgreSQL only.
+Index(
+    "ix_User_username_trgm",
+    username_lower().label("username_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"username_lower": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
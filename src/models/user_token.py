@@ -1,7 +1,8 @@
 """User token model"""
 
 import time
-from typing import TYPE_CHECKING, Optional
+from hashlib import sha256
+from typing import TYPE_CHECKING, Any, Optional
 
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -9,21 +10,65 @@ if TYPE_CHECKING:
     from src.models import User
 
 
+def hash_token(token: str) -> str:
+    """Hash a token to the fixed-width digest that is stored and looked up."""
+    return sha256(token.encode("utf-8")).hexdigest()
+
+
 class UserToken(SQLModel, table=True):  # type: ignore[call-arg, unused-ignore]
     """
     UserToken model representing a user's authentication tokens.
+
+    Only digests of the tokens are stored. The raw tokens can be passed to the
+    constructor or assigned to `access_token`/`refresh_token`; they are kept on
+    the instance so they can be handed to the client that requested them.
     """
 
     __tablename__ = "UserToken"  # pyright: ignore[reportAssignmentType]
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="User.id")
-    access_token: str = Field(index=True)
+    user_id: int = Field(foreign_key="User.id", index=True)
+    access_token_hash: str = Field(max_length=64, index=True, unique=True)
     token_expiration: int
-    refresh_token: str
+    refresh_token_hash: str = Field(max_length=64, index=True, unique=True)
     refresh_token_expiration: int
 
     user: "User" = Relationship(back_populates="tokens")
 
+    def __init__(self, **data: Any) -> None:
+        access_token: Optional[str] = data.pop("access_token", None)
+        refresh_token: Optional[str] = data.pop("refresh_token", None)
+        super().__init__(**data)
+        if access_token is not None:
+            self.access_token = access_token
+        if refresh_token is not None:
+            self.refresh_token = refresh_token
+
+    def _raw_token(self, name: str) -> str:
+        token: Optional[str] = self.__dict__.get(name)
+        if token is None:
+            raise ValueError("Raw token is only available where it was issued")
+        return token
+
+    @property
+    def access_token(self) -> str:
+        """The raw access token, only known on the instance that issued it."""
+        return self._raw_token("_access_token")
+
+    @access_token.setter
+    def access_token(self, access_token: str) -> None:
+        self.__dict__["_access_token"] = access_token
+        self.access_token_hash = hash_token(access_token)
+
+    @property
+    def refresh_token(self) -> str:
+        """The raw refresh token, only known on the instance that issued it."""
+        return self._raw_token("_refresh_token")
+
+    @refresh_token.setter
+    def refresh_token(self, refresh_token: str) -> None:
+        self.__dict__["_refresh_token"] = refresh_token
+        self.refresh_token_hash = hash_token(refresh_token)
+
     def refresh_is_expired(self) -> bool:
         """Check if the refresh token is expired."""
         return self.refresh_token_expiration < int(time.time())
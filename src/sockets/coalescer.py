@@ -0,0 +1,140 @@
+"""Time windowed coalescing of socket events per room."""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.util.gold_logging import logger
+
+BATCH_EVENT = "batch"
+
+# Events whose payload is the full current state of the object it describes,
+# so a later one about the same object supersedes the earlier one. Any other
+# event, such as a batch of added members, carries a delta and is kept.
+SNAPSHOT_EVENTS = frozenset(
+    {
+        "avatar_updated",
+        "friend_presence",
+        "group_avatar_updated",
+        "group_updated",
+        "username_updated",
+    }
+)
+
+# Payload fields that name the object an event describes.
+SUBJECT_FIELDS = ("friend_id", "group_id", "user_id")
+
+Send = Callable[[str, Any, List[str]], Awaitable[None]]
+
+
+def supersede_key(event: str, data: Any) -> Optional[Hashable]:
+    """Key shared by events that replace each other, None if nothing may."""
+    if event not in SNAPSHOT_EVENTS or not isinstance(data, dict):
+        return None
+    subject = tuple(data.get(name) for name in SUBJECT_FIELDS)
+    if all(value is None for value in subject):
+        return None
+    return (event, *subject)
+
+
+@dataclass
+class PendingEvent:
+    """An event waiting in one or more room buffers."""
+
+    event: str
+    data: Any
+    key: Optional[Hashable]
+
+
+@dataclass
+class CoalescerStats:
+    """Counters of a coalescer since it was created."""
+
+    events: int = 0
+    superseded: int = 0
+    emits: int = 0
+    batches: int = 0
+    window_flushes: int = 0
+    size_flushes: int = 0
+    failed_emits: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """The counters by name."""
+        return dict(self.__dict__)
+
+
+class EventCoalescer:
+    """
+    Buffer socket events per room and send each room one message per window.
+
+    Events wait at most `window` seconds, or until a room holds `max_events`
+    events. A snapshot event supersedes a buffered event of the same name about
+    the same friend, group or user, so only the latest state is sent, every
+    other event is sent as is. On a flush
+    rooms that buffered the very same events share one emit. A room with a
+    single event gets it as is, otherwise the events are wrapped in one
+    `batch` event holding `{"events": [{"event", "data"}, ...]}` in order.
+    """
+
+    def __init__(
+        self, send: Send, window: float, max_events: int, enabled: bool
+    ) -> None:
+        self.send = send
+        self.window = window
+        self.max_events = max_events
+        self.enabled = enabled
+        self.stats = CoalescerStats()
+        # Room -> its buffered events in emit order.
+        self.pending: Dict[str, List[PendingEvent]] = {}
+        self.timer: Optional[asyncio.Task[None]] = None
+
+    async def add(self, event: str, data: Any, rooms: List[str]) -> None:
+        """Buffer one event for every room in `rooms`."""
+        pending_event = PendingEvent(event, data, supersede_key(event, data))
+        self.stats.events += 1
+        full = False
+        for room in rooms:
+            buffered = self.pending.setdefault(room, [])
+            if pending_event.key is not None:
+                kept = [e for e in buffered if e.key != pending_event.key]
+                self.stats.superseded += len(buffered) - len(kept)
+                buffered[:] = kept
+            buffered.append(pending_event)
+            full = full or len(buffered) >= self.max_events
+        if full:
+            self.stats.size_flushes += 1
+            await self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self.timer = None
+        self.stats.window_flushes += 1
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send everything that is buffered."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, {}
+        groups: Dict[Tuple[int, ...], Tuple[List[PendingEvent], List[str]]] = {}
+        for room, events in pending.items():
+            signature = tuple(id(pending_event) for pending_event in events)
+            groups.setdefault(signature, (events, []))[1].append(room)
+        for events, rooms in groups.values():
+            if len(events) == 1:
+                event, data = events[0].event, events[0].data
+            else:
+                event = BATCH_EVENT
+                data = {"events": [{"event": e.event, "data": e.data} for e in events]}
+            try:
+                await self.send(event, data, rooms)
+            except Exception as e:
+                self.stats.failed_emits += 1
+                logger.error("Sending coalesced socket events failed: %s", e)
+                continue
+            self.stats.emits += 1
+            if event == BATCH_EVENT:
+                self.stats.batches += 1
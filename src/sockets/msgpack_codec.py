@@ -0,0 +1,29 @@
+"""
+Msgpack encoding of client manager messages.
+
+Passed to the Redis client manager as its `json` module. Messages from nodes
+that still publish JSON are decoded as JSON, so the codec can be switched
+on one replica at a time.
+"""
+
+import json
+from typing import Any, Union
+
+import msgpack
+
+
+def dumps(data: Any) -> bytes:
+    """Encode a manager message."""
+    encoded: bytes = msgpack.packb(data, use_bin_type=True)
+    return encoded
+
+
+def loads(message: Union[bytes, str]) -> Any:
+    """Decode a manager message published as msgpack or as JSON."""
+    if isinstance(message, str):
+        return json.loads(message)
+    try:
+        return msgpack.unpackb(message, raw=False, strict_map_key=False)
+    except ValueError:
+        # A JSON object is a positive fixint followed by extra data in msgpack.
+        return json.loads(message)
@@ -0,0 +1,226 @@
+"""Socket.io client manager that only receives the traffic of locally hosted rooms."""
+
+import asyncio
+import zlib
+from typing import Any, AsyncGenerator, Dict, Hashable, List, Optional, Set, Tuple
+
+import socketio
+from bidict import ValueDuplicationError
+from redis.asyncio.client import PubSub
+
+from src.util.gold_logging import logger
+
+# Sids are `<node id>~<engine.io id>`, so any node can tell where a sid lives.
+SID_SEPARATOR = "~"
+NODE_ID_LENGTH = 12
+
+
+def room_shard(room: Hashable, shards: int) -> int:
+    """Shard whose channel carries the emits for a room."""
+    return zlib.crc32(str(room).encode("utf-8")) % shards
+
+
+def sid_node(room: Hashable) -> Optional[str]:
+    """Node hosting a sid room, None for any other room."""
+    if not isinstance(room, str):
+        return None
+    node, separator, _ = room.partition(SID_SEPARATOR)
+    if not separator or len(node) != NODE_ID_LENGTH:
+        return None
+    return node
+
+
+class ShardedRedisManager(socketio.AsyncRedisManager):  # type: ignore[misc]
+    """
+    Redis client manager that publishes room emits on per shard channels.
+
+    Rooms are hashed onto `shards` channels named `<channel>:<shard>`. An emit
+    is split by shard and published on the channel of every shard it touches,
+    and a node only subscribes to the shards of the rooms its own clients are
+    in, following `enter_room` and `leave_room`. The work of a node then grows
+    with its own connections instead of with the traffic of the cluster.
+
+    Every client is also in the room of its own sid. Those rooms are not
+    sharded, they would put nearly every shard on every node: a sid starts
+    with the id of the node hosting it and emits to it go to the channel of
+    that node, `<channel>:node:<node id>`. Broadcasts, remote disconnects and
+    room changes, and callbacks stay on the shared channel every node
+    listens on.
+
+    This builds on private hooks of `socketio.AsyncRedisManager` (`_publish`,
+    `_listen`, `_redis_connect`, `connected`, the sid generation of
+    `connect`), which is why python-socketio is pinned to tested versions.
+    """
+
+    name = "shardedredis"
+
+    def __init__(self, url: str, shards: int, **kwargs: Any) -> None:
+        super().__init__(url, **kwargs)
+        self.shards = shards
+        self.node_id: str = self.host_id[:NODE_ID_LENGTH]
+        # Shard -> the (namespace, room) pairs hosted here that hash onto it.
+        self.local_rooms: Dict[int, Set[Tuple[str, Hashable]]] = {}
+        self.subscribed_shards: Set[int] = set()
+        self.listener: Optional[PubSub] = None
+        self.subscription_lock = asyncio.Lock()
+        self.subscription_tasks: Set[asyncio.Task[None]] = set()
+
+    def shard_channel(self, shard: int) -> str:
+        """Channel name of a shard."""
+        return f"{self.channel}:{shard}"
+
+    def node_channel(self, node: str) -> str:
+        """Channel name of a node, carrying the emits to the sids it hosts."""
+        return f"{self.channel}:node:{node}"
+
+    def basic_enter_room(
+        self, sid: str, namespace: str, room: Hashable, eio_sid: Optional[str] = None
+    ) -> None:
+        super().basic_enter_room(sid, namespace, room, eio_sid=eio_sid)
+        if room is None or room == sid:
+            return
+        shard = room_shard(room, self.shards)
+        if shard not in self.local_rooms:
+            self.local_rooms[shard] = set()
+            self._schedule_sync()
+        self.local_rooms[shard].add((namespace, room))
+
+    def basic_leave_room(self, sid: str, namespace: str, room: Hashable) -> None:
+        super().basic_leave_room(sid, namespace, room)
+        if room is None or room == sid or room in self.rooms.get(namespace, {}):
+            return
+        shard = room_shard(room, self.shards)
+        shard_rooms = self.local_rooms.get(shard)
+        if shard_rooms is None:
+            return
+        shard_rooms.discard((namespace, room))
+        if not shard_rooms:
+            del self.local_rooms[shard]
+            self._schedule_sync()
+
+    async def connect(self, eio_sid: str, namespace: str) -> Optional[str]:
+        # BaseManager.connect, with the node id in front of the sid.
+        sid = f"{self.node_id}{SID_SEPARATOR}{self.server.eio.generate_id()}"
+        try:
+            self.basic_enter_room(sid, namespace, None, eio_sid=eio_sid)
+        except ValueDuplicationError:
+            # already connected
+            return None
+        self.basic_enter_room(sid, namespace, sid, eio_sid=eio_sid)
+        return sid
+
+    async def enter_room(
+        self, sid: str, namespace: str, room: Hashable, eio_sid: Optional[str] = None
+    ) -> None:
+        await super().enter_room(sid, namespace, room, eio_sid=eio_sid)
+        # Subscribed before returning, so emits right after a join arrive.
+        await self.sync_subscriptions()
+
+    def _schedule_sync(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.sync_subscriptions())
+        self.subscription_tasks.add(task)
+        task.add_done_callback(self.subscription_tasks.discard)
+
+    async def sync_subscriptions(self) -> None:
+        """Subscribe to the shards of hosted rooms and drop the others."""
+        async with self.subscription_lock:
+            if self.listener is None:
+                return
+            wanted = set(self.local_rooms)
+            subscribe = wanted - self.subscribed_shards
+            unsubscribe = self.subscribed_shards - wanted
+            try:
+                if subscribe:
+                    await self.listener.subscribe(
+                        *(self.shard_channel(shard) for shard in sorted(subscribe))
+                    )
+                if unsubscribe:
+                    await self.listener.unsubscribe(
+                        *(self.shard_channel(shard) for shard in sorted(unsubscribe))
+                    )
+            except Exception as e:
+                # The listener reconnects and subscribes from scratch.
+                logger.error("Updating socket shard subscriptions failed: %s", e)
+                return
+            self.subscribed_shards = wanted
+
+    async def _publish_on(self, channel: str, data: Any) -> Any:
+        for retries_left in range(1, -1, -1):
+            try:
+                if not self.connected:  # type: ignore[has-type]
+                    self._redis_connect()
+                return await self.redis.publish(channel, self.json.dumps(data))
+            except Exception as e:
+                logger.error("Cannot publish to redis channel %s: %s", channel, e)
+                if retries_left > 0:
+                    self.connected = False
+        return None
+
+    async def _publish(self, data: Any) -> Any:
+        room = data.get("room") if data.get("method") == "emit" else None
+        if room is None:
+            return await self._publish_on(self.channel, data)
+        rooms = room if isinstance(room, list) else [room]
+        by_channel: Dict[str, List[Hashable]] = {}
+        for target_room in rooms:
+            node = sid_node(target_room)
+            if node == self.node_id:
+                # Sids hosted here were served by `emit` before publishing.
+                continue
+            channel = (
+                self.node_channel(node)
+                if node is not None
+                else self.shard_channel(room_shard(target_room, self.shards))
+            )
+            by_channel.setdefault(channel, []).append(target_room)
+        for channel, channel_rooms in by_channel.items():
+            channel_data = {
+                **data,
+                "room": channel_rooms if isinstance(room, list) else channel_rooms[0],
+            }
+            await self._publish_on(channel, channel_data)
+        return None
+
+    async def _redis_listen_with_retries(self) -> AsyncGenerator[Any, None]:
+        retry_sleep = 1
+        while True:
+            try:
+                if self.listener is None:
+                    self._redis_connect()
+                    listener: PubSub = self.pubsub
+                    await listener.subscribe(
+                        self.channel, self.node_channel(self.node_id)
+                    )
+                    self.subscribed_shards = set()
+                    self.listener = listener
+                    await self.sync_subscriptions()
+                    retry_sleep = 1
+                async for message in self.listener.listen():
+                    yield message
+            except Exception as e:
+                logger.error(
+                    "Cannot receive from redis, retrying in %s secs: %s",
+                    retry_sleep,
+                    e,
+                )
+                self.listener = None
+                await asyncio.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+
+    async def _listen(self) -> AsyncGenerator[Any, None]:
+        channel = self.channel.encode("utf-8")
+        shard_prefix = channel + b":"
+        async for message in self._redis_listen_with_retries():
+            if (
+                message["type"] == "message"
+                and "data" in message
+                and (
+                    message["channel"] == channel
+                    or message["channel"].startswith(shard_prefix)
+                )
+            ):
+                yield message["data"]
@@ -1,45 +1,202 @@
-from typing import Any, Dict, Optional, Union, cast
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Union, cast
 
 import socketio
 from redis import asyncio as aioredis
 from redis.asyncio import Redis
+from socketio.exceptions import ConnectionRefusedError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
 
 from src.config.config import settings
 from src.database import async_session
-from src.models.user import User
+from src.models.friend import Friend
+from src.models.group import Group
+from src.sockets import msgpack_codec
+from src.sockets.coalescer import EventCoalescer
+from src.sockets.sharded_manager import ShardedRedisManager
+from src.util.presence import presence
+from src.util.room_cache import room_cache
+from src.util.security import check_token
 from src.util.util import get_group_room, get_user_room
 
-mgr = socketio.AsyncRedisManager(settings.REDIS_URI)
+manager_codec = msgpack_codec if settings.SOCKET_MANAGER_MSGPACK else None
+mgr: socketio.AsyncRedisManager = (
+    ShardedRedisManager(
+        settings.REDIS_URI, shards=settings.SOCKET_PUBSUB_SHARDS, json=manager_codec
+    )
+    if settings.SOCKET_PUBSUB_SHARDS > 0
+    else socketio.AsyncRedisManager(settings.REDIS_URI, json=manager_codec)
+)
 sio = socketio.AsyncServer(
     async_mode="asgi",
     client_manager=mgr,
+    serializer=settings.SOCKET_SERIALIZER,
     cors_allowed_origins=settings.ALLOWED_ORIGINS_LIST,
 )
 sio_app = socketio.ASGIApp(socketio_server=sio, socketio_path="/socket.io")
 
+# A logger of its own, so the per event records can be sampled.
+logger = logging.getLogger(__name__)
+
 redis: Redis = aioredis.from_url(settings.REDIS_URI)  # type: ignore[no-untyped-call]
 
 
+async def send_to_rooms(event: str, data: Any, rooms: List[str]) -> None:
+    """Publish one event for a list of rooms."""
+    await sio.emit(event, data, room=rooms)
+
+
+coalescer = EventCoalescer(
+    send_to_rooms,
+    window=settings.SOCKET_COALESCE_WINDOW,
+    max_events=settings.SOCKET_COALESCE_MAX_EVENTS,
+    enabled=settings.SOCKET_COALESCE_ENABLED,
+)
+
+
+async def emit_to_rooms(event: str, data: Any, rooms: Iterable[str]) -> None:
+    """
+    Emit one event to many rooms as a single client manager message.
+
+    The payload is encoded and published once, every node expands the room
+    list against its own connections and a client that is in several of the
+    rooms receives the event once. With coalescing enabled the event is
+    buffered and sent with the other events of its rooms.
+    """
+    room_list = list(dict.fromkeys(rooms))
+    if not room_list:
+        return
+    if coalescer.enabled:
+        await coalescer.add(event, data, room_list)
+    else:
+        await send_to_rooms(event, data, room_list)
+
+
+def get_socket_token(
+    environ: Dict[str, Any], auth: Optional[Dict[str, Any]]
+) -> Optional[str]:
+    """The access token of a handshake, from its auth payload or its headers."""
+    if isinstance(auth, dict) and isinstance(auth.get("token"), str):
+        return cast(str, auth["token"])
+    authorization: str = environ.get("HTTP_AUTHORIZATION", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        return token.strip()
+    return None
+
+
+async def get_user_rooms(db: AsyncSession, user_id: int) -> List[str]:
+    """The room of a user and the rooms of all its groups."""
+    rooms = await room_cache.get(user_id)
+    if rooms is None:
+        group_ids = await db.execute(
+            select(Group.group_id).where(Group.user_id == user_id)
+        )
+        rooms = [get_user_room(user_id)] + [
+            get_group_room(group_id) for group_id in group_ids.scalars()
+        ]
+        await room_cache.store(user_id, rooms)
+    return rooms
+
+
+async def enter_rooms(sid: str, rooms: Iterable[str], namespace: str = "/") -> None:
+    """
+    Put a connection of this node in many rooms at once.
+
+    The rooms are entered locally and a sharded manager subscribes to all
+    new shards in one round trip instead of once per room.
+    """
+    for room in rooms:
+        mgr.basic_enter_room(sid, namespace, room)
+    if isinstance(mgr, ShardedRedisManager):
+        await mgr.sync_subscriptions()
+
+
+async def get_friend_ids(db: AsyncSession, user_id: int) -> List[int]:
+    """The users that have accepted a user as friend."""
+    friend_ids = await db.execute(
+        select(Friend.user_id).where(
+            Friend.friend_id == user_id,
+            Friend.accepted.is_(True),  # type: ignore[union-attr]
+        )
+    )
+    return list(friend_ids.scalars())
+
+
+async def emit_presence(
+    user_id: int, online: bool, friend_ids: Optional[List[int]] = None
+) -> None:
+    """
+    Tell the accepted friends of a user that it came online or went offline.
+
+    The friends are looked up in a session of their own unless the caller
+    already read them.
+    """
+    if friend_ids is None:
+        async with async_session() as db:
+            friend_ids = await get_friend_ids(db, user_id)
+    await emit_to_rooms(
+        "friend_presence",
+        {"user_id": user_id, "online": online, "last_seen": int(time.time())},
+        [get_user_room(friend_id) for friend_id in friend_ids],
+    )
+
+
+async def get_session_user_id(sid: str) -> Optional[int]:
+    """The user a connection authenticated as."""
+    session: Dict[str, Any] = await sio.get_session(sid)
+    return session.get("user_id")
+
+
 @sio.on("connect")
-async def handle_connect(sid: str, *args: Any, **kwargs: Any) -> None:
-    print(f"Received connect: {sid}")
+async def handle_connect(
+    sid: str, environ: Dict[str, Any], auth: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Authenticate a connection and put it in the rooms of its user.
+
+    The access token is checked once, the user room and every group room are
+    joined server side, so clients no longer send a join per room and cannot
+    join rooms that are not theirs. The friends told about the user coming
+    online are read in the same session as the rooms.
+    """
+    token = get_socket_token(environ, auth)
+    if token is None:
+        raise ConnectionRefusedError("Authentication failed")
+    async with async_session() as db:
+        user, _ = await check_token(db, token, "access")
+        if user is None or user.id is None:
+            raise ConnectionRefusedError("Authentication failed")
+        user_id: int = user.id
+        rooms = await get_user_rooms(db, user_id)
+        friend_ids = await get_friend_ids(db, user_id)
+    await sio.save_session(sid, {"user_id": user_id})
+    await enter_rooms(sid, rooms)
+    if await presence.connect(sid, user_id):
+        await emit_presence(user_id, True, friend_ids)
 
 
 @sio.on("disconnect")
 async def handle_disconnect(sid: str, *args: Any, **kwargs: Any) -> None:
-    print(f"Received disconnect: {sid}")
+    logger.info("Received disconnect: %s", sid)
+    user_id = await presence.disconnect(sid)
+    if user_id is not None:
+        await emit_presence(user_id, False)
 
 
 @sio.on("message_event")
 async def handle_message_event(sid: str, *args: Any, **kwargs: Any) -> None:
-    print(f"Received message_event: {sid}")
+    logger.debug("Received message_event: %s", sid)
 
 
 @sio.on("join")
 async def handle_join(sid: str, *args: Any, **kwargs: Any) -> None:
-    print("join regular")
-    data: Dict[str, Union[int, str]] = args[0]
-    user_id: int = cast(int, data["user_id"])
+    """Join the room of the connected user, which the handshake already did."""
+    user_id = await get_session_user_id(sid)
+    if user_id is None:
+        return
     room: str = get_user_room(user_id)
     await sio.enter_room(sid, room)
     await sio.emit(
@@ -48,22 +205,24 @@ async def handle_join(sid: str, *args: Any, **kwargs: Any) -> None:
         room=room,
     )
 
-    # Example of database calls with sockets
-    async with async_session() as session:
-        async with session.begin():
-            user: Optional[User] = await session.get(User, user_id)
-            if user:
-                pass
-            pass
-
 
 @sio.on("join_group")
 async def handle_join_group(sid: str, *args: Any, **kwargs: Any) -> None:
-    print("Received join_group")
+    """Join the room of a group the connected user is a member of."""
+    user_id = await get_session_user_id(sid)
+    if user_id is None:
+        return
     data: Dict[str, Union[int, str]] = args[0]
     group_id: int = cast(int, data["group_id"])
+    async with async_session() as db:
+        membership = await db.execute(
+            select(Group.group_id).where(
+                Group.user_id == user_id, Group.group_id == group_id
+            )
+        )
+        if membership.first() is None:
+            return
     group_room: str = get_group_room(group_id)
-    print(f"room: {group_room}")
     await sio.enter_room(sid, group_room)
     await sio.emit(
         "message_event",
@@ -74,10 +233,11 @@ async def handle_join_group(sid: str, *args: Any, **kwargs: Any) -> None:
 
 @sio.on("leave")
 async def handle_leave(sid: str, *args: Any, **kwargs: Any) -> None:
-    print("leave regular")
-    data: Dict[str, Union[int, str]] = args[0]
-    user_id: int = cast(int, data["user_id"])
+    user_id = await get_session_user_id(sid)
+    if user_id is None:
+        return
     room: str = get_user_room(user_id)
+    logger.debug("Leaving room %s: %s", room, sid)
     await sio.leave_room(sid, room)
     await sio.emit(
         "message_event",
@@ -88,11 +248,10 @@ async def handle_leave(sid: str, *args: Any, **kwargs: Any) -> None:
 
 @sio.on("leave_group")
 async def handle_leave_group(sid: str, *args: Any, **kwargs: Any) -> None:
-    print("leave group")
     data: Dict[str, Union[int, str]] = args[0]
     group_id: int = cast(int, data["group_id"])
     group_room: str = get_group_room(group_id)
-    print(f"room: {group_room}")
+    logger.debug("Leaving group room %s: %s", group_room, sid)
     await sio.leave_room(sid, group_room)
     await sio.emit(
         "message_event",
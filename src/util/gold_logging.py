@@ -1,9 +1,62 @@
+"""Logging of the api, through the queue based pipeline it shares with the worker."""
+
 import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, MutableMapping
+
+from age_of_gold_worker.age_of_gold_worker.util.gold_logging import (
+    correlation_id,
+    setup_logging,
+)
+from src.config.config import settings
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
+setup_logging(
+    level=logging.DEBUG if settings.DEBUG else logging.INFO,
+    sample_rates=settings.LOG_SAMPLE_RATES,
 )
 
 logger = logging.getLogger(__name__)
+
+CORRELATION_HEADER = b"x-request-id"
+MAX_CORRELATION_ID_LENGTH = 128
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class CorrelationIdMiddleware:
+    """
+    ASGI middleware that gives every request a correlation id.
+
+    The id comes from the `X-Request-ID` header or is generated, it is set
+    for everything logged while handling the request, handed to Celery tasks
+    started by it and returned in the response headers.
+    """
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        headers: Dict[bytes, bytes] = dict(scope.get("headers", []))
+        request_id = headers.get(CORRELATION_HEADER, b"").decode("latin-1")
+        if not request_id or len(request_id) > MAX_CORRELATION_ID_LENGTH:
+            request_id = uuid.uuid4().hex
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (CORRELATION_HEADER, request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        token = correlation_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            correlation_id.reset(token)
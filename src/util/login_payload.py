@@ -0,0 +1,142 @@
+"""Opt-in compact encodings of the login payload."""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple, TypedDict
+
+import msgpack
+from fastapi import Header
+from fastapi.responses import JSONResponse, Response
+
+from src.util.util import LoginData, SuccessfulLoginResponse
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class ColumnarLoginData(TypedDict):
+    access_token: str
+    refresh_token: str
+    profile_version: int
+    avatar_version: int
+    delta: bool
+    friend_ids: List[int]
+    friend_versions: List[int]
+    group_ids: List[int]
+    group_versions: List[int]
+
+
+class ColumnarLoginResponse(TypedDict):
+    success: bool
+    data: ColumnarLoginData
+
+
+@dataclass(frozen=True)
+class LoginFormat:
+    """
+    How the client wants its login payload.
+
+    `columnar` replaces the friends and groups lists of dicts with parallel
+    id and version arrays, `delta` additionally sorts the ids and sends the
+    difference to the previous id, `msgpack` encodes the body as msgpack
+    instead of JSON.
+    """
+
+    columnar: bool = False
+    delta: bool = False
+    msgpack: bool = False
+
+
+def get_login_format(
+    x_login_format: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
+) -> LoginFormat:
+    """
+    Read the login format from the `X-Login-Format` and `Accept` headers.
+
+    `X-Login-Format` is `columnar` or `columnar-delta`, anything else keeps
+    the default payload. An `Accept` of `application/msgpack` selects msgpack.
+    """
+    login_format = (x_login_format or "").strip().lower()
+    wants_msgpack = accept is not None and any(
+        media_type in accept.lower() for media_type in MSGPACK_MEDIA_TYPES
+    )
+    return LoginFormat(
+        columnar=login_format in ("columnar", "columnar-delta"),
+        delta=login_format == "columnar-delta",
+        msgpack=wants_msgpack,
+    )
+
+
+def delta_encode(values: Iterable[int]) -> List[int]:
+    """Replace every value but the first by its difference to the previous one."""
+    encoded: List[int] = []
+    previous = 0
+    for value in values:
+        encoded.append(value - previous)
+        previous = value
+    return encoded
+
+
+def delta_decode(values: Iterable[int]) -> List[int]:
+    """Inverse of `delta_encode`."""
+    decoded: List[int] = []
+    current = 0
+    for value in values:
+        current += value
+        decoded.append(current)
+    return decoded
+
+
+def _columns(
+    items: List[dict[str, Any]], id_key: str, version_key: str, delta: bool
+) -> Tuple[List[int], List[int]]:
+    if delta:
+        items = sorted(items, key=lambda item: item[id_key])
+    ids = [item[id_key] for item in items]
+    versions = [item[version_key] for item in items]
+    if delta:
+        ids = delta_encode(ids)
+    return ids, versions
+
+
+def columnar_login_data(data: LoginData, delta: bool = False) -> ColumnarLoginData:
+    """Convert the default login data to parallel id and version arrays."""
+    friend_ids, friend_versions = _columns(
+        data["friends"], "friend_id", "friend_version", delta
+    )
+    group_ids, group_versions = _columns(
+        data["groups"], "group_id", "group_version", delta
+    )
+    return {
+        "access_token": data["access_token"],
+        "refresh_token": data["refresh_token"],
+        "profile_version": data["profile_version"],
+        "avatar_version": data["avatar_version"],
+        "delta": delta,
+        "friend_ids": friend_ids,
+        "friend_versions": friend_versions,
+        "group_ids": group_ids,
+        "group_versions": group_versions,
+    }
+
+
+def encode_login_response(
+    response: SuccessfulLoginResponse,
+    login_format: LoginFormat,
+    status_code: int = 200,
+) -> SuccessfulLoginResponse | Response:
+    """Return the login response in the requested format, unchanged by default."""
+    payload: SuccessfulLoginResponse | ColumnarLoginResponse = response
+    if login_format.columnar:
+        payload = {
+            "success": response["success"],
+            "data": columnar_login_data(response["data"], login_format.delta),
+        }
+    if login_format.msgpack:
+        return Response(
+            content=msgpack.packb(payload),
+            status_code=status_code,
+            media_type=MSGPACK_MEDIA_TYPES[0],
+        )
+    if login_format.columnar:
+        return JSONResponse(content=payload, status_code=status_code)
+    return response
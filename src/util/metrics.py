@@ -0,0 +1,300 @@
+"""Per route request metrics, exposed in the Prometheus text format."""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, MutableMapping, Optional, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+@dataclass
+class RequestMetrics:
+    """What one request spent its time on."""
+
+    status: int = 500
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_seconds: float = 0.0
+    s3_seconds: float = 0.0
+    socket_emits: int = 0
+
+
+@dataclass
+class RouteMetrics:
+    """Totals of the requests of one route, method and status."""
+
+    buckets: List[int]
+    count: int = 0
+    seconds: float = 0.0
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_seconds: float = 0.0
+    s3_seconds: float = 0.0
+    socket_emits: int = 0
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "current_request", default=None
+)
+
+# Counter families rendered from RouteMetrics fields, with their help text.
+COUNTERS = (
+    ("db_queries", "http_request_db_queries_total", "Database queries run."),
+    ("db_seconds", "http_request_db_seconds_total", "Time spent in database queries."),
+    ("redis_seconds", "http_request_redis_seconds_total", "Time spent in Redis calls."),
+    ("s3_seconds", "http_request_s3_seconds_total", "Time spent in S3 calls."),
+    ("socket_emits", "http_request_socket_emits_total", "Socket events emitted."),
+)
+
+
+# Process wide figures of the password hashing pool: metrics key, name, type
+# and help text.
+PASSWORD_HASH_METRICS = (
+    ("queue_depth", "password_hash_queue_depth", "gauge", "Hashing jobs queued."),
+    ("waiting", "password_hash_waiting", "gauge", "Hashing jobs waiting for a slot."),
+    ("running", "password_hash_running", "gauge", "Hashing jobs on the pool."),
+    ("completed", "password_hash_jobs_total", "counter", "Hashing jobs finished."),
+    (
+        "average_latency_ms",
+        "password_hash_average_latency_ms",
+        "gauge",
+        "Average hashing job latency, queueing included.",
+    ),
+    (
+        "max_latency_ms",
+        "password_hash_max_latency_ms",
+        "gauge",
+        "Slowest hashing job, queueing included.",
+    ),
+)
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Request totals per route, kept in process and rendered on scrape."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.routes: Dict[Tuple[str, str, int], RouteMetrics] = {}
+        # Unlabelled metrics read on every scrape: name -> type, help, reader.
+        self.collected: Dict[str, Tuple[str, str, Callable[[], float]]] = {}
+
+    def collect(
+        self, name: str, kind: str, help_text: str, read: Callable[[], float]
+    ) -> None:
+        """Render the value `read` returns as metric `name` on every scrape."""
+        self.collected[name] = (kind, help_text, read)
+
+    def observe(
+        self, route: str, method: str, seconds: float, request: RequestMetrics
+    ) -> None:
+        """Add one finished request to the totals of its route."""
+        key = (route, method, request.status)
+        totals = self.routes.get(key)
+        if totals is None:
+            totals = RouteMetrics(buckets=[0] * (len(self.buckets) + 1))
+            self.routes[key] = totals
+        totals.buckets[bisect_left(self.buckets, seconds)] += 1
+        totals.count += 1
+        totals.seconds += seconds
+        totals.db_queries += request.db_queries
+        totals.db_seconds += request.db_seconds
+        totals.redis_seconds += request.redis_seconds
+        totals.s3_seconds += request.s3_seconds
+        totals.socket_emits += request.socket_emits
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        name = "http_request_duration_seconds"
+        lines = [
+            f"# HELP {name} Request latency per route.",
+            f"# TYPE {name} histogram",
+        ]
+        labelled = [
+            (
+                f'route="{escape_label(route)}",method="{method}",status="{status}"',
+                totals,
+            )
+            for (route, method, status), totals in sorted(self.routes.items())
+        ]
+        for labels, totals in labelled:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), totals.buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {totals.seconds}")
+            lines.append(f"{name}_count{{{labels}}} {totals.count}")
+        for attribute, counter, help_text in COUNTERS:
+            lines.append(f"# HELP {counter} {help_text}")
+            lines.append(f"# TYPE {counter} counter")
+            for labels, totals in labelled:
+                lines.append(f"{counter}{{{labels}}} {getattr(totals, attribute)}")
+        for collected, (kind, help_text, read) in self.collected.items():
+            lines.append(f"# HELP {collected} {help_text}")
+            lines.append(f"# TYPE {collected} {kind}")
+            lines.append(f"{collected} {read()}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and resource use of every request."""
+
+    def __init__(
+        self,
+        app: Callable[[Scope, Receive, Send], Awaitable[None]],
+        registry: MetricsRegistry = metrics,
+    ) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = RequestMetrics()
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                request.status = message["status"]
+            await send(message)
+
+        token = current_request.set(request)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            # Routing stores the matched route in the scope, its path is the template.
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.registry.observe(route, scope["method"], elapsed, request)
+
+
+def add_seconds(kind: str, seconds: float) -> None:
+    """Charge time spent on `kind` to the current request."""
+    request = current_request.get()
+    if request is not None:
+        setattr(request, kind, getattr(request, kind) + seconds)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time the queries of an engine per request."""
+
+    # The start is kept on the execution context, so a statement that fails
+    # before after_cursor_execute leaves nothing behind on the connection.
+    def before_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if context is not None and current_request.get() is not None:
+            context.metrics_query_start = time.perf_counter()
+
+    def after_cursor_execute(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        request = current_request.get()
+        start = getattr(context, "metrics_query_start", None)
+        if request is not None and start is not None:
+            request.db_queries += 1
+            request.db_seconds += time.perf_counter() - start
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def instrument_redis(client: Redis) -> None:
+    """Time the commands and pipelines of a Redis client per request."""
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def timed_execute_command(*args: Any, **options: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await execute_command(*args, **options)  # type: ignore[no-untyped-call]
+        finally:
+            add_seconds("redis_seconds", time.perf_counter() - start)
+
+    def timed_pipeline(*args: Any, **kwargs: Any) -> Any:
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def timed_execute(*execute_args: Any, **execute_kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return await execute(*execute_args, **execute_kwargs)
+            finally:
+                add_seconds("redis_seconds", time.perf_counter() - start)
+
+        pipe.execute = timed_execute  # type: ignore[method-assign]
+        return pipe
+
+    client.execute_command = timed_execute_command  # type: ignore[method-assign]
+    client.pipeline = timed_pipeline  # type: ignore[method-assign]
+
+
+def instrument_s3(client: Any) -> None:
+    """Time the calls of a boto3 client per request through its event hooks."""
+
+    # The context dict is private to one call, also when calls run in threads.
+    def before_call(context: Dict[str, Any], **kwargs: Any) -> None:
+        context["metrics_start"] = time.perf_counter()
+
+    def after_call(context: Dict[str, Any], **kwargs: Any) -> None:
+        start = context.get("metrics_start")
+        if start is not None:
+            add_seconds("s3_seconds", time.perf_counter() - start)
+
+    client.meta.events.register("before-call.*.*", before_call)
+    client.meta.events.register("after-call.*.*", after_call)
+
+
+def instrument_manager(manager: Any) -> None:
+    """Count the socket emits a request hands to the client manager."""
+    emit = manager.emit
+
+    async def counted_emit(*args: Any, **kwargs: Any) -> Any:
+        request = current_request.get()
+        if request is not None:
+            request.socket_emits += 1
+        return await emit(*args, **kwargs)
+
+    manager.emit = counted_emit
+
+
+def instrument_password_hashing(service: Any) -> None:
+    """Expose the queue depth and latency of a password hashing pool."""
+
+    def reader(key: str) -> Callable[[], float]:
+        return lambda: float(service.metrics[key])
+
+    for key, name, kind, help_text in PASSWORD_HASH_METRICS:
+        metrics.collect(name, kind, help_text, reader(key))
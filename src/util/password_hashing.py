@@ -0,0 +1,105 @@
+"""Argon2 password hashing that runs off the event loop."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from argon2 import PasswordHasher, exceptions
+
+from src.config.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHashingService:
+    """
+    Run argon2 hash and verify calls on a bounded thread pool.
+
+    argon2-cffi releases the GIL while hashing, so a small thread pool keeps
+    the event loop responsive during login bursts. The number of jobs that
+    can be queued at once is bounded by `max_pending`, callers beyond that
+    wait on a semaphore instead of growing the executor queue.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._hasher = PasswordHasher()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="argon2"
+        )
+        self._semaphore: asyncio.Semaphore | None = None
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._total_latency_ms = 0.0
+        self._max_latency_ms = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        return self._semaphore
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        start = time.perf_counter()
+        semaphore = self._get_semaphore()
+        self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._running -= 1
+            semaphore.release()
+            latency_ms = (time.perf_counter() - start) * 1000
+            self._completed += 1
+            self._total_latency_ms += latency_ms
+            self._max_latency_ms = max(self._max_latency_ms, latency_ms)
+
+    def _verify(self, hashed_password: str, provided_password: str) -> bool:
+        try:
+            return self._hasher.verify(hashed_password, provided_password)
+        except exceptions.VerificationError:
+            return False
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool."""
+        return await self._run(self._hasher.hash, password)
+
+    async def verify(self, hashed_password: str, provided_password: str) -> bool:
+        """Verify a password against a stored hash on the worker pool."""
+        return await self._run(self._verify, hashed_password, provided_password)
+
+    def check_needs_rehash(self, hashed_password: str) -> bool:
+        """Check whether a stored hash uses outdated parameters, parsing it inline."""
+        return self._hasher.check_needs_rehash(hashed_password)
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        """Queue depth and latency figures for the hashing pool."""
+        average_latency_ms = (
+            self._total_latency_ms / self._completed if self._completed else 0.0
+        )
+        return {
+            "queue_depth": self._waiting + self._running,
+            "waiting": self._waiting,
+            "running": self._running,
+            "completed": self._completed,
+            "average_latency_ms": average_latency_ms,
+            "max_latency_ms": self._max_latency_ms,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for queued jobs to finish."""
+        self._executor.shutdown(wait=True)
+
+
+password_hashing = PasswordHashingService(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
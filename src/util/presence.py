@@ -0,0 +1,141 @@
+"""Redis backed presence of users with connected sockets."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config.config import settings
+from src.util.gold_logging import logger
+
+
+def sids_key(user_id: int) -> str:
+    """Redis key of the sorted set with the connected sids of a user."""
+    return f"presence:sids:{user_id}"
+
+
+def last_seen_key(user_id: int) -> str:
+    """Redis key of the last time a user was seen connected."""
+    return f"presence:last_seen:{user_id}"
+
+
+@dataclass
+class UserPresence:
+    """Whether a user has a connected socket and when it last had one."""
+
+    online: bool
+    last_seen: Optional[int]
+
+
+class Presence:
+    """
+    Connected socket ids per user, shared by every replica through Redis.
+
+    Each sid is a member of the sorted set of its user, scored with the time
+    its lease runs out. The node hosting the sid extends the lease every
+    `heartbeat_interval` seconds, so the sids of a node that dies lapse after
+    `ttl` seconds without anyone cleaning up. A user is online while one of
+    its leases is current. Lookups for many users are one pipelined round
+    trip.
+    """
+
+    def __init__(self, ttl: int, heartbeat_interval: float) -> None:
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.redis: Optional[Redis] = None
+        # Sids hosted by this node -> their user.
+        self.local_sids: Dict[str, int] = {}
+
+    async def connect(self, sid: str, user_id: int) -> bool:
+        """Register a connection, return whether the user just came online."""
+        self.local_sids[sid] = user_id
+        if self.redis is None:
+            return False
+        now = int(time.time())
+        key = sids_key(user_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.zadd(key, {sid: now + self.ttl})
+                pipe.expire(key, self.ttl)
+                pipe.set(last_seen_key(user_id), now)
+                pipe.zcard(key)
+                results: List[int] = await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.error("Failed to register presence: %s", e)
+            return False
+        return results[-1] == 1
+
+    async def disconnect(self, sid: str) -> Optional[int]:
+        """Drop a connection, return its user if that user just went offline."""
+        user_id = self.local_sids.pop(sid, None)
+        if user_id is None or self.redis is None:
+            return None
+        now = int(time.time())
+        key = sids_key(user_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(key, sid)
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.set(last_seen_key(user_id), now)
+                pipe.zcard(key)
+                results: List[int] = await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.error("Failed to drop presence: %s", e)
+            return None
+        return user_id if results[-1] == 0 else None
+
+    async def heartbeat(self) -> None:
+        """Extend the leases of every sid hosted by this node."""
+        if self.redis is None or not self.local_sids:
+            return
+        now = int(time.time())
+        sids_by_user: Dict[int, Dict[str, int]] = {}
+        for sid, user_id in self.local_sids.items():
+            sids_by_user.setdefault(user_id, {})[sid] = now + self.ttl
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id, leases in sids_by_user.items():
+                    pipe.zadd(sids_key(user_id), leases)
+                    pipe.expire(sids_key(user_id), self.ttl)
+                    pipe.set(last_seen_key(user_id), now)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.error("Failed to extend presence: %s", e)
+
+    async def run(self) -> None:
+        """Send heartbeats until cancelled."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await self.heartbeat()
+
+    async def lookup(self, user_ids: Sequence[int]) -> Dict[int, UserPresence]:
+        """Presence of many users in one round trip, empty if Redis is unavailable."""
+        if self.redis is None or not user_ids:
+            return {}
+        now = int(time.time())
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.zcount(sids_key(user_id), f"({now}", "+inf")
+                    pipe.get(last_seen_key(user_id))
+                results = await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.error("Failed to look up presence: %s", e)
+            return {}
+        return {
+            user_id: UserPresence(
+                online=count > 0,
+                last_seen=int(last_seen) if last_seen is not None else None,
+            )
+            for user_id, count, last_seen in zip(user_ids, results[0::2], results[1::2])
+        }
+
+
+presence = Presence(
+    ttl=settings.PRESENCE_TTL,
+    heartbeat_interval=settings.PRESENCE_HEARTBEAT_INTERVAL,
+)
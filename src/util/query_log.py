@@ -0,0 +1,258 @@
+"""Slow query log with statement fingerprints, rolling percentiles and captured plans."""
+
+import asyncio
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config.config import settings
+from src.util.gold_logging import logger
+
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\$\d+|%s|\b\d+(?:\.\d+)?\b")
+IN_LIST_PATTERN = re.compile(r"\(\?(?:,\s*\?)+\)")
+VALUES_PATTERN = re.compile(r"(\(\?\.\.\.\))(?:, \(\?\.\.\.\))+")
+# Row locking clauses, e.g. the `FOR UPDATE SKIP LOCKED` of the socket outbox.
+LOCKING_PATTERN = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE
+)
+
+# Plan statement per dialect, dialects without one are not explained.
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+# ANALYZE runs the statement, so it is only used when switched on.
+EXPLAIN_ANALYZE_PREFIXES = {
+    **EXPLAIN_PREFIXES,
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS) ",
+}
+
+# Set while a plan is captured, so the EXPLAIN itself is not logged.
+explaining: ContextVar[bool] = ContextVar("explaining", default=False)
+
+
+def statement_fingerprint(statement: str) -> str:
+    """A statement with its literals, placeholders and IN lists normalised."""
+    statement = LITERAL_PATTERN.sub("?", statement)
+    statement = " ".join(statement.split())
+    statement = IN_LIST_PATTERN.sub("(?...)", statement)
+    return VALUES_PATTERN.sub(r"\1...", statement)
+
+
+@dataclass
+class SlowQuery:
+    """A statement that ran longer than the threshold."""
+
+    fingerprint: str
+    statement: str
+    seconds: float
+    time: float
+    plan: Optional[List[str]] = None
+    explain_error: Optional[str] = None
+
+
+class QueryStats:
+    """Latencies of the latest `window` runs of one fingerprint."""
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        """Record one run."""
+        self.count += 1
+        self.latencies.append(seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Run count and nearest rank percentiles of the window."""
+        ordered = sorted(self.latencies)
+
+        def percentile(q: float) -> float:
+            return ordered[max(0, int(q * len(ordered) + 0.5) - 1)]
+
+        return {
+            "count": self.count,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": ordered[-1],
+        }
+
+
+class SlowQueryLog:
+    """
+    Time every statement of an engine and keep the slow ones with their plan.
+
+    Statements are grouped by fingerprint, for which the latencies of the
+    latest `window` runs are kept, for at most `max_fingerprints` fingerprints.
+    A statement running `threshold` seconds or longer goes into a ring buffer
+    of the latest `size` slow statements. Slow SELECTs are also explained in a
+    background task, at most once per fingerprint per `explain_cooldown`
+    seconds, in a transaction that is rolled back. Parameters are only used to
+    run the EXPLAIN and are never stored.
+
+    The plan is estimated only, unless `explain_analyze` is set: EXPLAIN
+    ANALYZE runs the statement a second time. SELECTs that lock rows are
+    never explained, their plan could take the locks again.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        window: int,
+        size: int,
+        max_fingerprints: int,
+        explain: bool,
+        explain_cooldown: float,
+        explain_analyze: bool = False,
+    ) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self.explain = explain
+        self.explain_cooldown = explain_cooldown
+        self.explain_analyze = explain_analyze
+        self.stats: Dict[str, QueryStats] = {}
+        self.slow: Deque[SlowQuery] = deque(maxlen=size)
+        # Fingerprint -> when its plan was last captured, within the cooldown.
+        self.explained: Dict[str, float] = {}
+        self.explain_tasks: Set[asyncio.Task[None]] = set()
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Listen to the statements of an engine."""
+
+        # The start is kept on the execution context, which is private to one
+        # statement even when executions share a connection.
+        def before_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            if context is not None and not explaining.get():
+                context.slow_query_start = time.perf_counter()
+
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            start = getattr(context, "slow_query_start", None)
+            if start is None:
+                return
+            slow_query = self.record(statement, time.perf_counter() - start)
+            if slow_query is not None and not executemany:
+                self.schedule_explain(engine, slow_query, parameters)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def record(self, statement: str, seconds: float) -> Optional[SlowQuery]:
+        """Add one run to the stats of its fingerprint, return it if slow."""
+        fingerprint = statement_fingerprint(statement)
+        stats = self.stats.get(fingerprint)
+        if stats is None:
+            if len(self.stats) >= self.max_fingerprints:
+                del self.stats[next(iter(self.stats))]
+            stats = QueryStats(self.window)
+            self.stats[fingerprint] = stats
+        stats.add(seconds)
+        if seconds < self.threshold:
+            return None
+        slow_query = SlowQuery(fingerprint, statement, seconds, time.time())
+        self.slow.append(slow_query)
+        logger.warning(
+            "Slow query took %.3fs: %s",
+            seconds,
+            fingerprint,
+            extra={"query_seconds": seconds},
+        )
+        return slow_query
+
+    def schedule_explain(
+        self, engine: AsyncEngine, slow_query: SlowQuery, parameters: Any
+    ) -> None:
+        """Capture the plan of a slow SELECT that takes no row locks in the background."""
+        prefixes = (
+            EXPLAIN_ANALYZE_PREFIXES if self.explain_analyze else EXPLAIN_PREFIXES
+        )
+        prefix = prefixes.get(engine.dialect.name)
+        if (
+            not self.explain
+            or prefix is None
+            or not slow_query.statement.lstrip().upper().startswith("SELECT")
+            or LOCKING_PATTERN.search(slow_query.statement)
+        ):
+            return
+        now = time.monotonic()
+        # Entries are kept in capture order, so the expired ones come first.
+        while self.explained:
+            oldest, captured = next(iter(self.explained.items()))
+            if now - captured < self.explain_cooldown:
+                break
+            del self.explained[oldest]
+        if slow_query.fingerprint in self.explained:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.explained[slow_query.fingerprint] = now
+        task = loop.create_task(
+            self.capture_plan(engine, prefix, slow_query, parameters)
+        )
+        self.explain_tasks.add(task)
+        task.add_done_callback(self.explain_tasks.discard)
+
+    async def capture_plan(
+        self, engine: AsyncEngine, prefix: str, slow_query: SlowQuery, parameters: Any
+    ) -> None:
+        """Run EXPLAIN for a slow statement and store the plan on its entry."""
+        explaining.set(True)
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    prefix + slow_query.statement, parameters
+                )
+                slow_query.plan = [
+                    " ".join(str(column) for column in row) for row in result.all()
+                ]
+                await conn.rollback()
+        except Exception as e:
+            slow_query.explain_error = str(e)
+            logger.error("Explaining a slow query failed: %s", e)
+
+    def dump(self) -> Dict[str, Any]:
+        """Fingerprint stats, slowest p95 first, and the slow statements, latest first."""
+        stats: List[Dict[str, Any]] = [
+            {"fingerprint": fingerprint, **query_stats.as_dict()}
+            for fingerprint, query_stats in self.stats.items()
+        ]
+        stats.sort(key=lambda entry: entry["p95"], reverse=True)
+        return {
+            "threshold": self.threshold,
+            "stats": stats,
+            "slow_queries": [asdict(slow_query) for slow_query in reversed(self.slow)],
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.SLOW_QUERY_THRESHOLD,
+    window=settings.SLOW_QUERY_WINDOW,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    max_fingerprints=settings.SLOW_QUERY_MAX_FINGERPRINTS,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+    explain_cooldown=settings.SLOW_QUERY_EXPLAIN_COOLDOWN,
+    explain_analyze=settings.SLOW_QUERY_EXPLAIN_ANALYZE,
+)
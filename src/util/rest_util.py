@@ -1,11 +1,14 @@
-from typing import Any, Tuple
+from typing import Any, Iterable, Tuple
 
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.selectable import Select
 from sqlmodel import or_, select
 
-from src.models import Friend, User, Chat
-from src.sockets.sockets import sio
+from src.config.config import settings
+from src.models import Friend, Group, User, Chat
+from src.sockets.sockets import emit_to_rooms, sio
+from src.util.token_cache import token_cache
 from src.util.util import get_group_room, get_user_room
 
 
@@ -49,24 +52,68 @@ async def get_user_from_db(db: AsyncSession, user_id: int) -> User | None:
     return await db.get(User, user_id)
 
 
-async def update_friend_versions_and_notify(
+async def notify_friends(
     db: AsyncSession, user_id: int, event_name: str, event_data: dict[str, Any]
 ) -> None:
-    """Update friend versions and notify friends about changes.
+    """Notify everyone who has the user as a friend about a profile change.
 
-    This function finds all friends of a user, increments their friend_version,
-    and sends a socket notification to each friend.
+    Clients detect profile and avatar changes through the user's own
+    profile_version and avatar_version, so the Friend rows are left alone and
+    the rooms of all friends are handed to a single emit. With
+    `FRIEND_VERSION_BUMP` enabled the friend_version of those rows is still
+    incremented, in the same statement that finds them, for older clients.
     """
+    if settings.FRIEND_VERSION_BUMP:
+        friends_result = await db.execute(
+            update(Friend)
+            .where(Friend.friend_id == user_id)  # type: ignore[arg-type]
+            .values(friend_version=Friend.friend_version + 1)
+            .returning(Friend.user_id)  # type: ignore[call-overload]
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        friends_result = await db.execute(
+            select(Friend.user_id).where(Friend.friend_id == user_id)
+        )
+    await emit_to_rooms(
+        event_name,
+        event_data,
+        (get_user_room(friend_user_id) for friend_user_id in friends_result.scalars()),
+    )
 
-    friends_statement: Select = select(Friend).where(Friend.friend_id == user_id)
-    friends_result = await db.execute(friends_statement)
-    friends = friends_result.scalars().all()
 
-    for friend in friends:
-        friend.friend_version += 1
-        db.add(friend)
-        friend_room = get_user_room(friend.user_id)
-        await sio.emit(event_name, event_data, room=friend_room)
+async def bump_group_versions(db: AsyncSession, group_id: int) -> None:
+    """Increment the group_version of every member of a group in one statement.
+
+    The member rows are not loaded, Group objects already in the session keep
+    their old version.
+    """
+    await db.execute(
+        update(Group)
+        .where(Group.group_id == group_id)  # type: ignore[arg-type]
+        .values(group_version=Group.group_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def insert_group_members(
+    db: AsyncSession, group_id: int, user_ids: Iterable[int]
+) -> None:
+    """Add the Group rows of new members of a group in one bulk insert.
+
+    The rows are not loaded into the session, and nothing is committed.
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "group_id": group_id,
+            "unread_messages": 0,
+            "mute": False,
+            "last_message_read_id": 0,
+        }
+        for user_id in user_ids
+    ]
+    await db.execute(insert(Group), rows)
 
 
 async def update_group_versions_and_notify(
@@ -77,21 +124,55 @@ async def update_group_versions_and_notify(
 ) -> None:
     """Update group versions and notify members about changes.
 
+    The versions of all members are bumped in one UPDATE, without loading
+    the member rows, and committed. The event is then emitted once to the
+    group room, which every member, the sender included, is in.
+
     Args:
-        chat: The chat object containing groups
+        chat: The chat of the group that changed
         db: Database session
-        me: Current user who triggered the change
         event_name: Socket.io event name
         event_data: Data to send with the event
-        exclude_sender: Whether to exclude the sender from notifications
     """
-    # Update group versions
-    for group in chat.groups:
-        group.group_version += 1
-        db.add(group)
+    await bump_group_versions(db, chat.id)
     await db.commit()
 
-    await sio.emit(event_name, event_data, room=get_group_room(chat.id))
+    await emit_to_rooms(event_name, event_data, [get_group_room(chat.id)])
+
+
+def friend_response_data(
+    user: User, additional_data: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Socket payload describing a user to one of their friends."""
+    response_data = {
+        "friend_id": user.id,
+        "username": user.username,
+        "avatar_version": user.avatar_version,
+        "profile_version": user.profile_version,
+        "colour": user.colour,
+    }
+
+    if additional_data:
+        response_data.update(additional_data)
+
+    return response_data
+
+
+def group_response_data(
+    chat: Chat, additional_data: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Socket payload describing a group chat to its members."""
+    response_data: dict[str, Any] = {
+        "group_id": chat.id,
+        "group_name": chat.group_name,
+        "group_description": chat.group_description,
+        "group_colour": chat.group_colour,
+    }
+
+    if additional_data:
+        response_data.update(additional_data)
+
+    return response_data
 
 
 async def emit_friend_response(
@@ -108,20 +189,9 @@ async def emit_friend_response(
         recipient_room: Room ID of the recipient
         additional_data: Additional data to include in the response dictionary
     """
-    response_data = {
-        "friend_id": user.id,
-        "username": user.username,
-        "avatar_version": user.avatar_version,
-        "profile_version": user.profile_version,
-        "colour": user.colour,
-    }
-
-    if additional_data:
-        response_data.update(additional_data)
-
     await sio.emit(
         event_name,
-        response_data,
+        friend_response_data(user, additional_data),
         room=recipient_room,
     )
 
@@ -132,19 +202,9 @@ async def emit_group_response(
     recipient_room: str,
     additional_data: dict[str, Any] | None = None,
 ) -> None:
-    response_data: dict[str, Any] = {
-        "group_id": chat.id,
-        "group_name": chat.group_name,
-        "group_description": chat.group_description,
-        "group_colour": chat.group_colour,
-    }
-
-    if additional_data:
-        response_data.update(additional_data)
-
     await sio.emit(
         event_name,
-        response_data,
+        group_response_data(chat, additional_data),
         room=recipient_room,
     )
 
@@ -160,7 +220,7 @@ async def update_user_field(
     me.profile_version += 1
     db.add(me)
 
-    await update_friend_versions_and_notify(
+    await notify_friends(
         db,
         me.id,  # type: ignore
         event_type,
@@ -172,3 +232,4 @@ async def update_user_field(
     )
 
     await db.commit()
+    await token_cache.invalidate_user(me.id)  # type: ignore[arg-type]
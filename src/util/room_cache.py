@@ -0,0 +1,67 @@
+"""Redis cache of the socket rooms of a user."""
+
+from typing import List, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config.config import settings
+from src.util.gold_logging import logger
+
+
+def rooms_key(user_id: int) -> str:
+    """Redis key of the set with the socket rooms of a user."""
+    return f"socket_rooms:{user_id}"
+
+
+class RoomCache:
+    """
+    Optional Redis cache of the rooms a socket of a user is put in on connect.
+
+    The set is filled on a connect that missed it and dropped whenever the
+    group memberships of the user change, `ttl` bounds how long a missed
+    invalidation can linger. Failed reads fall back to the database.
+    """
+
+    def __init__(self, ttl: int) -> None:
+        self.ttl = ttl
+        self.redis: Optional[Redis] = None
+
+    async def get(self, user_id: int) -> Optional[List[str]]:
+        """Return the cached rooms of a user."""
+        if self.redis is None:
+            return None
+        try:
+            rooms = await self.redis.smembers(rooms_key(user_id))  # type: ignore[misc]
+        except (RedisError, OSError) as e:
+            logger.error("Failed to read socket rooms: %s", e)
+            return None
+        if not rooms:
+            return None
+        return sorted(room.decode("utf-8") for room in rooms)
+
+    async def store(self, user_id: int, rooms: List[str]) -> None:
+        """Cache the rooms of a user."""
+        if self.redis is None or not rooms:
+            return
+        key = rooms_key(user_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.sadd(key, *rooms)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.error("Failed to store socket rooms: %s", e)
+
+    async def invalidate(self, *user_ids: int) -> None:
+        """Drop the cached rooms of users whose memberships changed."""
+        if self.redis is None or not user_ids:
+            return
+        try:
+            await self.redis.delete(*(rooms_key(user_id) for user_id in user_ids))
+        except (RedisError, OSError) as e:
+            logger.error("Failed to invalidate socket rooms: %s", e)
+
+
+room_cache = RoomCache(ttl=settings.SOCKET_ROOM_CACHE_TTL)
@@ -1,8 +1,9 @@
+import hmac
 import time
 from typing import Any, Optional, Tuple
 
 import jwt as pyjwt
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import Depends, Header, HTTPException, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
@@ -13,7 +14,9 @@ from src.config.config import settings
 from src.config.jwt_key import jwt_public_key
 from src.database import get_db
 from src.models.user import User
-from src.models.user_token import UserToken
+from src.models.user_token import UserToken, hash_token
+from src.util.session_store import session_store
+from src.util.token_cache import load_cached_token, token_cache
 
 security = HTTPBearer()
 
@@ -31,8 +34,23 @@ async def get_valid_auth_token(
     return auth_token
 
 
-def decode_token(token: str, token_type: str) -> bool:
-    """Decodes and verifies the JWT token"""
+async def require_admin_token(
+    x_admin_token: Optional[str] = Header(default=None),
+) -> None:
+    """
+    Guard of the admin endpoints, the admin token has to be in X-Admin-Token.
+
+    Without a configured token, or with a wrong one, the endpoint answers as
+    if it does not exist.
+    """
+    if not settings.ADMIN_TOKEN or not hmac.compare_digest(
+        (x_admin_token or "").encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+def decode_token(token: str, token_type: str, verify_exp: bool = True) -> bool:
+    """Decodes and verifies the JWT token, its expiry unless `verify_exp` is off"""
     try:
         payload: dict[str, Any] = pyjwt.decode(
             token,
@@ -40,6 +58,7 @@ def decode_token(token: str, token_type: str) -> bool:
             algorithms=[settings.header["alg"]],
             audience=settings.JWT_AUD,
             issuer=settings.JWT_ISS,
+            options={"verify_exp": verify_exp},
         )
         if payload.get("typ") != token_type:
             return False
@@ -48,34 +67,58 @@ def decode_token(token: str, token_type: str) -> bool:
         return False
 
 
-async def check_token(
+async def load_user_token(
     db: AsyncSession, token: str, token_type: str
 ) -> Tuple[Optional[User], Optional[UserToken]]:
-    """Checks the validity of the token and retrieves the associated user and token"""
-    if not decode_token(token, token_type):
-        return None, None
+    """Finds the token row and its user, from the session store or the database"""
+    session = await session_store.get(token)
+    if session is not None:
+        return await session_store.load(db, session)
+
     token_statement: Select
     if token_type == "access":
         token_statement = (
             select(UserToken)
             .options(joinedload(UserToken.user))  # type: ignore
-            .filter_by(access_token=token)
+            .filter_by(access_token_hash=hash_token(token))
         )
     else:
         token_statement = (
             select(UserToken)
             .options(joinedload(UserToken.user))  # type: ignore
-            .filter_by(refresh_token=token)
+            .filter_by(refresh_token_hash=hash_token(token))
         )
     results_token = await db.execute(token_statement)
     result_token = results_token.first()
     if result_token is None:
         return None, None
     user_token: UserToken = result_token.UserToken
+    user: User = user_token.user
+    await session_store.store(user_token)
+    return user, user_token
+
+
+async def check_token(
+    db: AsyncSession, token: str, token_type: str
+) -> Tuple[Optional[User], Optional[UserToken]]:
+    """Checks the validity of the token and retrieves the associated user and token"""
+    if token_type == "access":
+        cached_token = token_cache.get(token)
+        if cached_token is not None:
+            cached_user, cached_user_token = await load_cached_token(db, cached_token)
+            if cached_user is None:
+                return None, None
+            return cached_user, cached_user_token
+    if not decode_token(token, token_type):
+        return None, None
+    user, user_token = await load_user_token(db, token, token_type)
+    if user is None or user_token is None:
+        return None, None
     if user_token.token_expiration < int(time.time()):
         return None, None
 
-    user: User = user_token.user
+    if token_type == "access":
+        token_cache.put(user_token)
     return user, user_token
 
 
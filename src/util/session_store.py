@@ -0,0 +1,125 @@
+"""Redis mirror of active UserToken rows."""
+
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.config.config import settings
+from src.models.user import User
+from src.models.user_token import UserToken, hash_token
+from src.util.gold_logging import logger
+
+
+def session_key(digest: str) -> str:
+    """Redis key of the session hash for an access or refresh token digest."""
+    return f"session:{digest}"
+
+
+def user_sessions_key(user_id: int) -> str:
+    """Redis key of the set with all session keys of a user."""
+    return f"session:user:{user_id}"
+
+
+class SessionStore:
+    """
+    Optional Redis fast path for UserToken lookups.
+
+    Every active token row is stored twice, under the digest of its access
+    token and under the digest of its refresh token, as a hash holding the
+    row and the id of its user. Both keys expire natively with the matching
+    token, so expired sessions never need purging from Redis. Lookups that
+    miss or fail fall back to the database.
+
+    The user itself is never stored: it is loaded from the database on every
+    hit, so a request never writes back stale columns and no credential
+    hashes end up in Redis.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.redis: Optional[Redis] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether lookups and writes go to Redis."""
+        return self.enabled and self.redis is not None
+
+    async def store(self, user_token: UserToken) -> None:
+        """Write a token row through to Redis."""
+        if not self.active or self.redis is None:
+            return
+        mapping = {
+            "user_token": json.dumps(user_token.model_dump()),
+            "user_id": str(user_token.user_id),
+        }
+        access_key = session_key(user_token.access_token_hash)
+        refresh_key = session_key(user_token.refresh_token_hash)
+        sessions_key = user_sessions_key(user_token.user_id)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # Replaces a whole hash, sessions of older versions held the user.
+                pipe.delete(access_key, refresh_key)
+                pipe.hset(access_key, mapping=mapping)
+                pipe.expireat(access_key, user_token.token_expiration)
+                pipe.hset(refresh_key, mapping=mapping)
+                pipe.expireat(refresh_key, user_token.refresh_token_expiration)
+                pipe.sadd(sessions_key, access_key, refresh_key)
+                pipe.expireat(sessions_key, user_token.refresh_token_expiration)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.error("Failed to store session: %s", e)
+
+    async def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the stored session for an access or refresh token."""
+        if not self.active or self.redis is None:
+            return None
+        try:
+            session: Dict[bytes, bytes] = await self.redis.hgetall(  # type: ignore[misc]
+                session_key(hash_token(token))
+            )
+        except (RedisError, OSError) as e:
+            logger.error("Failed to read session: %s", e)
+            return None
+        if not session or b"user_token" not in session or b"user_id" not in session:
+            return None
+        return {
+            "user_token": json.loads(session[b"user_token"]),
+            "user_id": int(session[b"user_id"]),
+        }
+
+    async def load(
+        self, db: AsyncSession, session: Dict[str, Any]
+    ) -> Tuple[Optional[User], UserToken]:
+        """Attach a stored token row to the db session and load its user."""
+        user_token = UserToken(**session["user_token"])
+        make_transient_to_detached(user_token)
+        user_token = await db.merge(user_token, load=False)
+        user = await db.get(User, session["user_id"])
+        return user, user_token
+
+    async def delete(self, *digests: str) -> None:
+        """Remove the sessions of the given access and refresh token digests."""
+        if not self.active or self.redis is None or not digests:
+            return
+        try:
+            await self.redis.delete(*(session_key(digest) for digest in digests))
+        except (RedisError, OSError) as e:
+            logger.error("Failed to delete session: %s", e)
+
+    async def delete_user(self, user_id: int) -> None:
+        """Remove every session of a user."""
+        if not self.active or self.redis is None:
+            return
+        sessions_key = user_sessions_key(user_id)
+        try:
+            keys = await self.redis.smembers(sessions_key)  # type: ignore[misc]
+            await self.redis.delete(sessions_key, *keys)
+        except (RedisError, OSError) as e:
+            logger.error("Failed to delete user sessions: %s", e)
+
+
+session_store = SessionStore(enabled=settings.SESSION_STORE_ENABLED)
@@ -0,0 +1,109 @@
+"""Transactional outbox for socket events emitted by the api."""
+
+import asyncio
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.config.config import settings
+from src.models.socket_event import SocketEvent
+from src.sockets.sockets import emit_to_rooms
+from src.util.gold_logging import logger
+
+PENDING_EVENTS_KEY = "socket_outbox_pending"
+
+Room = Union[str, List[str]]
+
+
+class SocketOutbox:
+    """
+    Socket events that are sent only once the change they announce is committed.
+
+    Endpoints `add` their events before committing and call `flush` after the
+    commit. When enabled, `add` stores the event as a `SocketEvent` row in the
+    same transaction and a dispatcher task emits committed rows in batches,
+    deleting them only after they were emitted, so delivery is at least once
+    and the request no longer waits on the fan-out. When disabled the events
+    are kept on the session and `flush` emits them inline.
+    """
+
+    def __init__(self, enabled: bool, batch_size: int, poll_interval: float) -> None:
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.wakeup = asyncio.Event()
+
+    def add(
+        self, db: AsyncSession, event: str, data: dict[str, Any], room: Room
+    ) -> None:
+        """Queue an event in the transaction of `db`, an empty room list is a no-op."""
+        rooms = [room] if isinstance(room, str) else list(room)
+        if not rooms:
+            return
+        if self.enabled:
+            db.add(SocketEvent(event=event, data=data, rooms=rooms))
+            return
+        pending: List[Tuple[str, dict[str, Any], List[str]]] = db.info.setdefault(
+            PENDING_EVENTS_KEY, []
+        )
+        pending.append((event, data, rooms))
+
+    async def flush(self, db: AsyncSession) -> None:
+        """Send the events of a committed transaction on their way."""
+        pending: List[Tuple[str, dict[str, Any], List[str]]] = db.info.pop(
+            PENDING_EVENTS_KEY, []
+        )
+        for event, data, rooms in pending:
+            await emit_to_rooms(event, data, rooms)
+        if self.enabled:
+            self.wakeup.set()
+
+    async def dispatch(self, db: AsyncSession) -> int:
+        """Emit and delete one batch of committed events, return its size."""
+        statement = (
+            select(SocketEvent)
+            .order_by(SocketEvent.id)  # type: ignore[arg-type]
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = (await db.execute(statement)).scalars().all()
+        if not events:
+            await db.rollback()
+            return 0
+        for socket_event in events:
+            await emit_to_rooms(
+                socket_event.event, socket_event.data, socket_event.rooms
+            )
+        await db.execute(
+            delete(SocketEvent).where(
+                SocketEvent.id.in_([socket_event.id for socket_event in events])  # type: ignore[union-attr]
+            )
+        )
+        await db.commit()
+        return len(events)
+
+    async def run(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Drain the outbox until cancelled, waking up early after a `flush`."""
+        while True:
+            self.wakeup.clear()
+            dispatched: Optional[int] = None
+            try:
+                async with session_factory() as db:
+                    dispatched = await self.dispatch(db)
+            except Exception as e:
+                logger.error("Socket outbox dispatch failed: %s", e)
+            if dispatched == self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+socket_outbox = SocketOutbox(
+    enabled=settings.SOCKET_OUTBOX_ENABLED,
+    batch_size=settings.SOCKET_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.SOCKET_OUTBOX_POLL_INTERVAL,
+)
@@ -0,0 +1,179 @@
+"""In-process cache of verified access tokens."""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.config.config import settings
+from src.models.user import User
+from src.models.user_token import UserToken, hash_token
+from src.util.gold_logging import logger
+
+INVALIDATION_CHANNEL = "token_cache:invalidate"
+
+
+@dataclass
+class CachedToken:
+    """Column snapshot of a verified token, the user is never cached."""
+
+    user_id: int
+    user_token: Dict[str, Any]
+    expires_at: float
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of access tokens that passed signature and database checks.
+
+    Entries hold the token row only, which carries digests and expirations
+    but no secrets. The user is loaded from the database on every request, so
+    writes to it never start from a stale copy. Entries live until the token
+    expires or `ttl` seconds pass, whichever comes first. Invalidations are
+    applied locally and published on a Redis channel so every replica drops
+    the same entries.
+    """
+
+    def __init__(self, max_size: int, ttl: int, enabled: bool = True) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.node_id = uuid.uuid4().hex
+        self.redis: Optional[Redis] = None
+        self._entries: OrderedDict[str, CachedToken] = OrderedDict()
+        self._user_digests: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[CachedToken]:
+        """Return the cached snapshot for a token, if still valid."""
+        if not self.enabled:
+            return None
+        digest = hash_token(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(digest)
+            return None
+        self._entries.move_to_end(digest)
+        return entry
+
+    def put(self, user_token: UserToken) -> None:
+        """Store a snapshot of a verified token."""
+        if not self.enabled:
+            return
+        digest = user_token.access_token_hash
+        self._remove(digest)
+        self._entries[digest] = CachedToken(
+            user_id=user_token.user_id,
+            user_token=user_token.model_dump(),
+            expires_at=min(user_token.token_expiration, time.time() + self.ttl),
+        )
+        self._user_digests.setdefault(user_token.user_id, set()).add(digest)
+        while len(self._entries) > self.max_size:
+            oldest_digest = next(iter(self._entries))
+            self._remove(oldest_digest)
+
+    def _remove(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        digests = self._user_digests.get(entry.user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._user_digests[entry.user_id]
+
+    def discard_digest(self, digest: str) -> None:
+        """Drop a single entry on this node."""
+        self._remove(digest)
+
+    def discard_user(self, user_id: int) -> None:
+        """Drop every entry of a user on this node."""
+        for digest in list(self._user_digests.get(user_id, ())):
+            self._remove(digest)
+
+    def clear(self) -> None:
+        """Drop every entry on this node."""
+        self._entries.clear()
+        self._user_digests.clear()
+
+    async def _publish(self, message: Dict[str, Any]) -> None:
+        if self.redis is None:
+            return
+        message["origin"] = self.node_id
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, json.dumps(message))
+        except (RedisError, OSError) as e:
+            logger.error("Failed to publish token cache invalidation: %s", e)
+
+    async def invalidate_token(self, digest: str) -> None:
+        """Drop a token, given by its digest, on every replica."""
+        self.discard_digest(digest)
+        await self._publish({"digest": digest})
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop every token of a user on every replica."""
+        self.discard_user(user_id)
+        await self._publish({"user_id": user_id})
+
+    def handle_message(self, data: bytes | str) -> None:
+        """Apply an invalidation published by another replica."""
+        message: Dict[str, Any] = json.loads(data)
+        if message.get("origin") == self.node_id:
+            return
+        if "digest" in message:
+            self.discard_digest(message["digest"])
+        if "user_id" in message:
+            self.discard_user(message["user_id"])
+
+    async def listen(self) -> None:
+        """Apply invalidations from other replicas until cancelled."""
+        if self.redis is None:
+            return
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        try:
+            while True:
+                try:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                except (RedisError, OSError) as e:
+                    logger.error("Token cache invalidation listener failed: %s", e)
+                    # Anything could have been missed, start from scratch.
+                    self.clear()
+                    await asyncio.sleep(1)
+                    continue
+                if message is not None:
+                    self.handle_message(message["data"])
+        finally:
+            await pubsub.aclose()  # type: ignore[no-untyped-call]
+
+
+async def load_cached_token(
+    db: AsyncSession, entry: CachedToken
+) -> Tuple[Optional[User], UserToken]:
+    """Attach the cached token to the session and load its user by primary key."""
+    user = await db.get(User, entry.user_id)
+    user_token = UserToken(**entry.user_token)
+    make_transient_to_detached(user_token)
+    user_token = await db.merge(user_token, load=False)
+    return user, user_token
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
+    enabled=settings.TOKEN_CACHE_ENABLED,
+)
@@ -1,21 +1,26 @@
 import random
 import time
 from io import BytesIO
-from typing import Any, List, Optional, TypedDict
+from typing import Any, List, Optional, Tuple, TypedDict
 
 from argon2 import PasswordHasher
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, literal, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.sql.selectable import Select
 from sqlmodel import select
 
 from src.config.config import settings
-from src.models import Chat, User, UserToken
+from src.models import Chat, Friend, Group, User, UserToken
+from src.models.user_token import hash_token
 from src.util.gold_logging import logger
+from src.util.security import decode_token
+from src.util.session_store import session_store
 from src.util.storage_util import download_image
+from src.util.token_cache import token_cache
 
 ph = PasswordHasher()
 
@@ -37,29 +42,8 @@ class SuccessfulLoginResponse(TypedDict):
 async def get_successful_login_response(
     user_token: UserToken, user: User, db: AsyncSession
 ) -> SuccessfulLoginResponse:
-    # Load friends using the existing User.friends relationship
-    # First refresh the user object to get the latest data
-    await db.refresh(user, ["friends", "groups"])
-
-    # Serialize friends data from the loaded relationship
-    friends_data = []
-    for friend in user.friends:
-        friends_data.append(
-            {
-                "friend_id": friend.friend_id,
-                "friend_version": friend.friend_version,
-            }
-        )
-
-    # Serialize groups data from the loaded relationship
-    groups_data = []
-    for group in user.groups:
-        groups_data.append(
-            {
-                "group_id": group.group_id,
-                "group_version": group.group_version,
-            }
-        )
+    await session_store.store(user_token)
+    friends_data, groups_data = await get_login_snapshot(db, user_token.user_id)
 
     return {
         "success": True,
@@ -74,6 +58,37 @@ async def get_successful_login_response(
     }
 
 
+async def get_login_snapshot(
+    db: AsyncSession, user_id: int
+) -> Tuple[List[dict[str, Any]], List[dict[str, Any]]]:
+    """
+    Return the (friend_id, friend_version) and (group_id, group_version) pairs of a user.
+
+    Both relations are read with a single UNION ALL of plain columns, so no
+    Friend or Group objects are built or added to the identity map.
+    """
+    friend_statement = select(
+        literal(0).label("kind"),
+        Friend.friend_id.label("id"),  # type: ignore[attr-defined]
+        Friend.friend_version.label("version"),  # type: ignore[attr-defined]
+    ).where(Friend.user_id == user_id)
+    group_statement = select(
+        literal(1).label("kind"),
+        Group.group_id.label("id"),  # type: ignore[attr-defined]
+        Group.group_version.label("version"),  # type: ignore[attr-defined]
+    ).where(Group.user_id == user_id)
+    results = await db.execute(union_all(friend_statement, group_statement))
+
+    friends_data: List[dict[str, Any]] = []
+    groups_data: List[dict[str, Any]] = []
+    for kind, relation_id, version in results.tuples():
+        if kind == 0:
+            friends_data.append({"friend_id": relation_id, "friend_version": version})
+        else:
+            groups_data.append({"group_id": relation_id, "group_version": version})
+    return friends_data, groups_data
+
+
 def get_user_tokens(
     user: User, access_expiration: int = 1800, refresh_expiration: int = 345600
 ) -> UserToken:
@@ -93,36 +108,91 @@ def get_user_tokens(
     return user_token
 
 
-async def delete_user_token_and_return(
-    db: AsyncSession, user_token: UserToken, return_value: Optional[User]
-) -> Optional[User]:
-    await db.delete(user_token)
-    await db.commit()
-    return return_value
+def forget_deleted_token(db: AsyncSession, token_id: int) -> None:
+    """Expunge a UserToken that was deleted in SQL from the session, if loaded."""
+    deleted = db.identity_map.get(identity_key(UserToken, token_id))
+    if deleted is not None:
+        db.expunge(deleted)
 
 
-async def refresh_user_token(
+async def claim_user_token(
     db: AsyncSession, access_token: str, refresh_token: str
-) -> Optional[User]:
-    token_statement: Select = (
-        select(UserToken)
-        .where(UserToken.access_token == access_token)
-        .where(UserToken.refresh_token == refresh_token)
+) -> Tuple[Optional[User], int]:
+    """
+    Delete the row matching both tokens, returning its user and refresh expiry.
+
+    On PostgreSQL the row is deleted and joined to its user in a single
+    `DELETE ... USING ... RETURNING` statement. Other dialects return the
+    token columns and load the user separately. A copy of the row already in
+    the session is expunged, so a new row reusing its id (as on SQLite) does
+    not clash with it. Nothing is committed.
+    """
+    access_token_hash = hash_token(access_token)
+    refresh_token_hash = hash_token(refresh_token)
+    if db.get_bind().dialect.name == "postgresql":
+        statement = (
+            delete(UserToken)
+            .where(UserToken.user_id == User.id)  # type: ignore[arg-type]
+            .where(UserToken.access_token_hash == access_token_hash)  # type: ignore[arg-type]
+            .where(UserToken.refresh_token_hash == refresh_token_hash)  # type: ignore[arg-type]
+            .returning(User, UserToken.refresh_token_expiration, UserToken.id)  # type: ignore[call-overload]
+            .execution_options(synchronize_session=False)
+        )
+        results = await db.execute(
+            select(
+                User, UserToken.refresh_token_expiration, UserToken.id
+            ).from_statement(statement)
+        )
+        result = results.first()
+        if result is None:
+            return None, 0
+        forget_deleted_token(db, result[2])
+        return result[0], result[1]
+
+    token_statement = (
+        delete(UserToken)
+        .where(UserToken.access_token_hash == access_token_hash)  # type: ignore[arg-type]
+        .where(UserToken.refresh_token_hash == refresh_token_hash)  # type: ignore[arg-type]
+        .returning(  # type: ignore[call-overload]
+            UserToken.id, UserToken.user_id, UserToken.refresh_token_expiration
+        )
+        .execution_options(synchronize_session=False)
+    )
+    token_results = await db.execute(token_statement)
+    token_result = token_results.first()
+    if token_result is None:
+        return None, 0
+    forget_deleted_token(db, token_result.id)
+    user: Optional[User] = await db.get(User, token_result.user_id)
+    return user, token_result.refresh_token_expiration
+
+
+async def rotate_user_token(
+    db: AsyncSession, access_token: str, refresh_token: str
+) -> Optional[Tuple[User, UserToken]]:
+    """
+    Swap a valid access and refresh token pair for a new one in one transaction.
+
+    A refresh token with a bad signature is refused before anything is
+    touched, so a forged pair cannot end a session. Otherwise the old row is
+    removed, also when it expired, and a new row is only issued when the
+    refresh token is still valid and its user exists.
+    """
+    if not decode_token(refresh_token, "refresh", verify_exp=False):
+        return None
+    user, refresh_token_expiration = await claim_user_token(
+        db, access_token, refresh_token
     )
-    results_token = await db.execute(token_statement)
-    result_token = results_token.first()
-    if result_token is None:
+    user_token: Optional[UserToken] = None
+    if user is not None and refresh_token_expiration >= int(time.time()):
+        user_token = get_user_tokens(user)
+        db.add(user_token)
+    await db.commit()
+    await token_cache.invalidate_token(hash_token(access_token))
+    await session_store.delete(hash_token(access_token), hash_token(refresh_token))
+    if user is None or user_token is None:
         return None
-    user_token: UserToken = result_token.UserToken
-    if user_token.refresh_token_expiration < int(time.time()):
-        return await delete_user_token_and_return(db, user_token, None)
-    user_statement: Select = select(User).where(User.id == user_token.user_id)
-    user_results = await db.execute(user_statement)
-    user_result = user_results.first()
-    if user_result is None:
-        return await delete_user_token_and_return(db, user_token, None)
-    user: User = user_result.User
-    return await delete_user_token_and_return(db, user_token, user)
+    return user, user_token
 
 
 def hash_password(password: str) -> str:
@@ -212,9 +282,7 @@ async def get_chat_and_verify_admin(
     Raises:
         HTTPException: If group not found or user doesn't have required permissions
     """
-    chat_statement: Select = (
-        select(Chat).where(Chat.id == group_id).options(selectinload(Chat.groups))  # type: ignore
-    )
+    chat_statement: Select = select(Chat).where(Chat.id == group_id)
     chat: Chat = (await db.execute(chat_statement)).scalar_one()
 
     # Check if current user has required permissions
@@ -20,7 +20,9 @@ from src.database import get_db
 from src.models import User
 from src.models.user import hash_email
 from src.models.user_token import UserToken
+from src.util.token_cache import token_cache
 from src.util.util import get_random_colour, hash_password
+from tests.helpers import QueryCounter
 
 
 def generate_unique_username(base_name: str) -> str:
@@ -43,6 +45,7 @@ async def test_setup() -> AsyncGenerator[TestClient, None]:
     """Create a SQLAlchemy engine and TestClient for tests."""
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+    token_cache.clear()
 
     app.state.s3 = MagicMock()
     app.state.cipher = MagicMock()
@@ -95,6 +98,13 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
         app.dependency_overrides.pop(get_db, None)
 
 
+@pytest_asyncio.fixture
+async def query_counter() -> AsyncGenerator[QueryCounter, None]:
+    """Fixture recording the statements run on the test database."""
+    with QueryCounter(engine.sync_engine) as counter:
+        yield counter
+
+
 async def add_user(
     username: str,
     origin: int,
@@ -1,13 +1,19 @@
 """Helper class for the test."""
 
-from typing import Any
+from collections import Counter
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Tuple, Type
 from unittest.mock import MagicMock
 
 import httpx
 from fakeredis import FakeRedis
 from fastapi import HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
+from age_of_gold_worker.age_of_gold_worker.util.gold_logging import correlation_id
+from src.util.query_log import statement_fingerprint
 from src.util.util import SuccessfulLoginResponse, LoginData
 
 
@@ -165,3 +171,73 @@ def assert_successful(
     assert response.status_code == status_code
     response_json: SuccessfulLoginResponse = response.json()
     return assert_successful_dict(response_json)
+
+
+class QueryCounter:
+    """
+    Record the statements an engine runs, grouped per request.
+
+    Statements are grouped by the correlation id of the request that ran them,
+    statements outside a request share the `None` group. Use it as a context
+    manager around the calls under test, or through the `query_counter` fixture.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.statements: List[Tuple[Optional[str], str]] = []
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        self.statements.append((correlation_id.get(), statement))
+
+    @property
+    def count(self) -> int:
+        """Number of statements recorded."""
+        return len(self.statements)
+
+    def reset(self) -> None:
+        """Forget the statements recorded so far."""
+        self.statements = []
+
+    def per_request(self) -> Dict[Optional[str], List[str]]:
+        """The recorded statements of every request, in order."""
+        requests: Dict[Optional[str], List[str]] = {}
+        for request_id, statement in self.statements:
+            requests.setdefault(request_id, []).append(statement)
+        return requests
+
+    def repeated(self, max_repeats: int = 1) -> Dict[str, int]:
+        """Fingerprints one request ran more than `max_repeats` times."""
+        repeated: Dict[str, int] = {}
+        for statements in self.per_request().values():
+            counts = Counter(statement_fingerprint(s) for s in statements)
+            for fingerprint, count in counts.items():
+                if count > max_repeats:
+                    repeated[fingerprint] = max(count, repeated.get(fingerprint, 0))
+        return repeated
+
+    def assert_budget(self, budget: int, max_repeats: int = 1) -> None:
+        """
+        Fail when a request ran more than `budget` statements, or ran the same
+        statement fingerprint more than `max_repeats` times, a likely N+1.
+        """
+        for request_id, statements in self.per_request().items():
+            assert len(statements) <= budget, (
+                f"Request {request_id} ran {len(statements)} statements, "
+                f"budget is {budget}:\n" + "\n".join(statements)
+            )
+        repeated = self.repeated(max_repeats)
+        assert not repeated, "Likely N+1 queries:\n" + "\n".join(
+            f"{count}x {fingerprint}" for fingerprint, count in repeated.items()
+        )
@@ -0,0 +1,130 @@
+"""Test file for the global change sequence."""
+
+import asyncio
+from pathlib import Path
+from typing import Dict, Set
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel, select
+
+from src.models import Chat, Friend, Group
+from src.models.model_util.change_sequence import change_seq_horizon, next_change_seq
+
+WRITERS = 6
+WRITES_PER_WRITER = 8
+
+
+def test_change_sequence_postgresql() -> None:
+    """Test that PostgreSQL stamps transaction ids and reads the snapshot horizon."""
+    dialect = postgresql.dialect()  # type: ignore[no-untyped-call]
+    assert "pg_current_xact_id()" in str(
+        select(next_change_seq()).compile(dialect=dialect)
+    )
+    assert "pg_snapshot_xmin" in str(
+        select(change_seq_horizon()).compile(dialect=dialect)
+    )
+
+
+@pytest.mark.asyncio
+async def test_writes_are_stamped(tmp_path: Path) -> None:
+    """Test that inserts, ORM updates and set-based updates advance the sequence."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/stamps.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        chat = Chat(
+            group_name="group",
+            group_description="",
+            group_colour="#000000",
+            current_message_id=1,
+        )
+        friend = Friend(user_id=1, friend_id=2)
+        db.add_all([chat, friend])
+        await db.commit()
+        group = Group(user_id=1, group_id=chat.id, unread_messages=0)
+        db.add(group)
+        await db.commit()
+        assert friend.change_seq is not None and chat.change_seq is not None
+        assert group.change_seq is not None
+        assert group.change_seq > max(friend.change_seq, chat.change_seq)
+
+        friend.friend_version += 1
+        await db.commit()
+        assert friend.change_seq > group.change_seq
+
+        await db.execute(
+            update(Group)
+            .where(Group.id == group.id)  # type: ignore[arg-type]
+            .values(group_version=Group.group_version + 1)
+        )
+        await db.commit()
+        stamped = (
+            await db.execute(select(Group.change_seq).where(Group.id == group.id))
+        ).scalar_one()
+        assert stamped > friend.change_seq
+        horizon = (await db.execute(select(change_seq_horizon()))).scalar_one()
+        assert horizon == stamped + 1
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers_are_never_skipped(tmp_path: Path) -> None:
+    """Test that a reader following the cursor sees the last write of every row."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/concurrent.db",
+        poolclass=NullPool,
+        connect_args={"timeout": 30},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async def writer(writer_id: int) -> None:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            friend = Friend(user_id=1, friend_id=writer_id)
+            db.add(friend)
+            await db.commit()
+            for _ in range(WRITES_PER_WRITER):
+                friend.friend_version += 1
+                await db.commit()
+                await asyncio.sleep(0)
+
+    seen: Dict[int, int] = {}
+    stamps: Set[int] = set()
+    writers_done = asyncio.Event()
+
+    async def reader() -> None:
+        cursor = 0
+        while True:
+            done = writers_done.is_set()
+            async with AsyncSession(engine) as db:
+                horizon = (await db.execute(select(change_seq_horizon()))).scalar_one()
+                rows = await db.execute(
+                    select(Friend.id, Friend.friend_version, Friend.change_seq).where(
+                        Friend.change_seq >= cursor  # type: ignore[operator]
+                    )
+                )
+                for friend_id, friend_version, change_seq in rows:
+                    seen[friend_id] = max(seen.get(friend_id, 0), friend_version)
+                    stamps.add(change_seq)
+            assert horizon >= cursor
+            cursor = horizon
+            if done:
+                return
+            await asyncio.sleep(0)
+
+    reading = asyncio.create_task(reader())
+    await asyncio.gather(*(writer(writer_id) for writer_id in range(WRITERS)))
+    writers_done.set()
+    await reading
+
+    assert len(seen) == WRITERS
+    assert all(version == WRITES_PER_WRITER + 1 for version in seen.values())
+    async with AsyncSession(engine) as db:
+        final_stamps = (await db.execute(select(Friend.change_seq))).scalars().all()
+    assert len(set(final_stamps)) == WRITERS
+    assert set(final_stamps) <= stamps
+    await engine.dispose()
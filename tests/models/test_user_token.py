@@ -11,6 +11,7 @@ from sqlalchemy.sql.selectable import Select
 from sqlmodel import select
 
 from src.models import User, UserToken
+from src.models.user_token import hash_token
 from src.util.util import get_user_tokens
 
 
@@ -89,3 +90,30 @@ async def test_user_token_reference(
     await test_db.delete(user_token)
     await test_db.commit()
     assert await test_db.get(UserToken, user_token.id) is None
+
+
+@pytest.mark.asyncio
+async def test_user_token_stores_digests(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Test that only digests are stored and raw tokens stay with the issuer"""
+    user_token = UserToken(
+        user_id=1,
+        access_token="access_token",
+        token_expiration=int(time.time()) + 1000,
+        refresh_token="refresh_token",
+        refresh_token_expiration=int(time.time()) + 1000,
+    )
+    test_db.add(user_token)
+    await test_db.commit()
+    assert user_token.access_token_hash == hash_token("access_token")
+    assert len(user_token.refresh_token_hash) == 64
+    assert "access_token" not in user_token.model_dump()
+
+    statement = select(UserToken).where(UserToken.id == user_token.id)
+    test_db.expunge(user_token)
+    result = await test_db.execute(statement)
+    loaded_token = result.scalar_one()
+    assert loaded_token.refresh_token_hash == hash_token("refresh_token")
+    with pytest.raises(ValueError):
+        _ = loaded_token.access_token
@@ -0,0 +1,61 @@
+"""Test for the slow query log endpoint via get call."""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from src.config.config import settings
+from src.util.query_log import slow_query_log
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_disabled_without_admin_token(
+    test_setup: TestClient,
+) -> None:
+    """The endpoint does not exist while no admin token is configured."""
+    with patch.object(settings, "ADMIN_TOKEN", ""):
+        response = test_setup.get(
+            f"{settings.API_V1_STR}/admin/slow-queries",
+            headers={"X-Admin-Token": ""},
+        )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_wrong_token(test_setup: TestClient) -> None:
+    """A missing or wrong admin token is refused."""
+    with patch.object(settings, "ADMIN_TOKEN", "secret"):
+        missing = test_setup.get(f"{settings.API_V1_STR}/admin/slow-queries")
+        wrong = test_setup.get(
+            f"{settings.API_V1_STR}/admin/slow-queries",
+            headers={"X-Admin-Token": "guess"},
+        )
+
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+    assert wrong.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_dump(test_setup: TestClient) -> None:
+    """The admin gets the stats and slow statements of the process."""
+    with (
+        patch.object(settings, "ADMIN_TOKEN", "secret"),
+        patch.object(
+            slow_query_log,
+            "dump",
+            return_value={"threshold": 0.2, "stats": [], "slow_queries": []},
+        ),
+    ):
+        response = test_setup.get(
+            f"{settings.API_V1_STR}/admin/slow-queries",
+            headers={"X-Admin-Token": "secret"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "success": True,
+        "data": {"threshold": 0.2, "stats": [], "slow_queries": []},
+    }
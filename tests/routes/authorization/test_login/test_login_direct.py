@@ -4,7 +4,7 @@ from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from fastapi.testclient import TestClient
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,7 +14,7 @@ from src.api.api_v1.authorization import login
 from src.models.user_token import UserToken
 from src.models.user import User
 from src.models.friend import Friend
-from src.util.util import SuccessfulLoginResponse, get_random_colour
+from src.util.util import get_random_colour
 from tests.helpers import (
     assert_exception_error_response,
     assert_integrity_error_response,
@@ -33,7 +33,8 @@ async def test_successful_login_with_username_direct(
     expected_access_token, expected_refresh_token, _, _ = mock_tokens
     login_request = login.LoginRequest(username="testuser", password="testpassword")
 
-    response: SuccessfulLoginResponse = await login.login_user(login_request, test_db)
+    response = await login.login_user(login_request, test_db)
+    assert not isinstance(response, Response)
 
     user_tokens = await test_db.execute(select(UserToken).where(UserToken.user_id == 1))
     assert user_tokens.scalar() is not None
@@ -55,7 +56,8 @@ async def test_successful_login_with_email_direct(
         email="testuser@example.com", password="testpassword"
     )
 
-    response: SuccessfulLoginResponse = await login.login_user(login_request, test_db)
+    response = await login.login_user(login_request, test_db)
+    assert not isinstance(response, Response)
     assert_successful_login_dict(
         response, expected_access_token, expected_refresh_token
     )
@@ -242,7 +244,8 @@ async def test_successful_login_with_friends(
     await test_db.commit()
     login_request = login.LoginRequest(username="testuser", password="testpassword")
 
-    response: SuccessfulLoginResponse = await login.login_user(login_request, test_db)
+    response = await login.login_user(login_request, test_db)
+    assert not isinstance(response, Response)
 
     user_tokens = await test_db.execute(select(UserToken).where(UserToken.user_id == 1))
     assert user_tokens.scalar() is not None
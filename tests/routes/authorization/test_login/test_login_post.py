@@ -3,6 +3,7 @@
 from typing import Any
 from unittest.mock import MagicMock, patch
 
+import msgpack
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.exc import SQLAlchemyError
@@ -136,3 +137,26 @@ async def test_unexpected_error_during_login_post(
     assert response.status_code == 500
     response_json = response.json()
     assert response_json["detail"] == "Login failed"
+
+
+@pytest.mark.asyncio
+async def test_successful_login_columnar_msgpack_post(
+    mock_tokens: tuple[str, str, MagicMock, MagicMock],
+    test_setup: TestClient,
+) -> None:
+    """Test that a client can opt in to the columnar msgpack payload."""
+    expected_access_token, _, _, _ = mock_tokens
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/login",
+        json={"username": "testuser", "password": "testpassword"},
+        headers={"X-Login-Format": "columnar", "Accept": "application/msgpack"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    data = msgpack.unpackb(response.content)["data"]
+    assert data["access_token"] == expected_access_token
+    assert data["friend_ids"] == [] and data["friend_versions"] == []
+    assert data["group_ids"] == [] and data["group_versions"] == []
+    assert "friends" not in data
@@ -3,12 +3,11 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Response, status
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.api_v1.authorization import register
-from src.util.util import SuccessfulLoginResponse
 from tests.helpers import (
     assert_exception_error_response,
     assert_integrity_error_response,
@@ -33,9 +32,8 @@ async def test_successful_register_direct(
         password="new_test1password",
     )
 
-    response_dict: SuccessfulLoginResponse = await register.register_user(
-        login_request, test_db
-    )
+    response_dict = await register.register_user(login_request, test_db)
+    assert not isinstance(response_dict, Response)
 
     assert_successful_login_dict(
         response_dict, expected_access_token, expected_refresh_token
@@ -106,9 +104,8 @@ async def test_register_username_already_taken(
         username="new_test5",
         password="new_test5password",
     )
-    response_dict: SuccessfulLoginResponse = await register.register_user(
-        register_request, test_db
-    )
+    response_dict = await register.register_user(register_request, test_db)
+    assert not isinstance(response_dict, Response)
 
     assert_successful_login_dict(
         response_dict, expected_access_token, expected_refresh_token
@@ -142,9 +139,8 @@ async def test_register_email_already_used(
         username="new_test6",
         password="new_test6password",
     )
-    response_dict: SuccessfulLoginResponse = await register.register_user(
-        register_request, test_db
-    )
+    response_dict = await register.register_user(register_request, test_db)
+    assert not isinstance(response_dict, Response)
 
     assert_successful_login_dict(
         response_dict, expected_access_token, expected_refresh_token
@@ -5,7 +5,7 @@ from typing import Any, Tuple
 from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from fastapi.testclient import TestClient
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,7 +13,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.api_v1.authorization import token_login
 from src.models.user import User
 from src.models.user_token import UserToken
-from src.util.util import SuccessfulLoginResponse
 from tests.conftest import add_token
 from tests.helpers import (
     assert_exception_error_response,
@@ -31,9 +30,8 @@ async def test_successful_token_login_direct(
     """Test successful token login via direct function call."""
     user, test_user_token = await add_token(1000, 1000, test_db)
     auth: Tuple[User, UserToken] = (user, test_user_token)
-    response_dict: SuccessfulLoginResponse = await token_login.login_token_user(
-        auth, test_db
-    )
+    response_dict = await token_login.login_token_user(auth, test_db)
+    assert not isinstance(response_dict, Response)
 
     assert_successful_login_dict_key(response_dict)
 
@@ -147,9 +145,8 @@ async def test_tokens_assigned_correctly_during_token_login_direct(
     mock_get_user_tokens.return_value = new_token
 
     auth: Tuple[User, UserToken] = (user, test_user_token)
-    response_dict: SuccessfulLoginResponse = await token_login.login_token_user(
-        auth, test_db
-    )
+    response_dict = await token_login.login_token_user(auth, test_db)
+    assert not isinstance(response_dict, Response)
 
     assert test_user_token.access_token == new_token.access_token
     assert test_user_token.refresh_token == new_token.refresh_token
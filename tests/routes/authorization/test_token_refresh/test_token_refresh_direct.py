@@ -4,13 +4,12 @@ from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Response, status
 from fastapi.testclient import TestClient
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.api_v1.authorization import token_refresh
-from src.util.util import SuccessfulLoginResponse
 from tests.conftest import add_token
 from tests.helpers import (
     assert_exception_error_response,
@@ -30,9 +29,8 @@ async def test_successful_refresh_direct(
         refresh_token=user_token.refresh_token, access_token=user_token.access_token
     )
 
-    response_dict: SuccessfulLoginResponse = await token_refresh.refresh_user(
-        refresh_request, test_db
-    )
+    response_dict = await token_refresh.refresh_user(refresh_request, test_db)
+    assert not isinstance(response_dict, Response)
 
     assert_successful_login_dict_key(response_dict)
 
@@ -1,6 +1,7 @@
 """Test for fetch all friends endpoint via direct function call."""
 
 from typing import Tuple
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -9,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.api_v1.friends import fetch_all_friends, add_friend, respond_friend_request
 from src.models.user import User
 from src.models.user_token import UserToken
+from src.util.presence import UserPresence
 from tests.conftest import add_token, add_user
 
 
@@ -67,6 +69,28 @@ async def test_successful_fetch_all_friends_direct(
 
     assert response5["success"] is True
     assert len(response5["data"]) == 2
+    assert all(friend["online"] is False for friend in response5["data"])
+    assert all(friend["last_seen"] is None for friend in response5["data"])
+
+    # Presence of accepted friends comes from the presence service
+    with patch(
+        "src.api.api_v1.friends.fetch_all_friends.presence.lookup",
+        new_callable=AsyncMock,
+        return_value={other_user1.id: UserPresence(online=True, last_seen=1234)},
+    ) as mock_lookup:
+        response6 = await fetch_all_friends.fetch_all_friends(
+            fetch_friends_request, auth, test_db
+        )
+
+    mock_lookup.assert_awaited_once()
+    assert sorted(mock_lookup.await_args.args[0]) == sorted(  # type: ignore[union-attr]
+        [other_user1.id, other_user2.id]
+    )
+    presences = {
+        friend["friend_id"]: (friend["online"], friend["last_seen"])
+        for friend in response6["data"]
+    }
+    assert presences == {other_user1.id: (True, 1234), other_user2.id: (False, None)}
 
 
 @pytest.mark.asyncio
@@ -39,9 +39,7 @@ async def test_successful_accept_friend_request_direct(
     )
 
     # Mock the socket emit
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response2 = await respond_friend_request.respond_friend_request(
             respond_friend_request_request, other_auth, test_db
         )
@@ -77,9 +75,7 @@ async def test_successful_reject_friend_request_direct(
     )
 
     # Mock the socket emit
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response2 = await respond_friend_request.respond_friend_request(
             respond_friend_request_request, other_auth, test_db
         )
@@ -1,8 +1,11 @@
 """Test for search friend endpoint via direct function call."""
 
+from types import SimpleNamespace
 from typing import Any, Tuple
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -72,3 +75,35 @@ async def test_search_friend_case_insensitive_direct(
 
     assert response["success"] is True
     assert response["data"]["username"] == other_user.username
+
+
+@pytest.mark.asyncio
+async def test_search_friend_fuzzy_uses_trigrams_on_postgres() -> None:
+    """On PostgreSQL fuzzy search ranks by trigram similarity and pages by score."""
+    users = [
+        User(id=index, username=f"gold{index}", colour="", email_hash="")
+        for index in (3, 7)
+    ]
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute = AsyncMock(return_value=MagicMock())
+    db.execute.return_value.all.return_value = [
+        SimpleNamespace(User=users[0], score=0.8),
+        SimpleNamespace(User=users[1], score=0.5),
+    ]
+    request = search_friend.SearchFriendRequest(
+        username="Gold",
+        mode="fuzzy",
+        limit=1,
+        after=search_friend.SearchCursor(id=1, score=0.9),
+    )
+
+    found, next_cursor = await search_friend.search_users(db, request)
+
+    assert found == [users[0]]
+    assert next_cursor == search_friend.SearchCursor(id=3, score=0.8)
+    statement = db.execute.await_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))  # type: ignore[no-untyped-call]
+    assert 'similarity(lower("User".username)' in sql
+    assert 'lower("User".username) %% ' in sql
+    assert "ORDER BY similarity" in sql
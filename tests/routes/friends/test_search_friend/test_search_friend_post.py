@@ -74,3 +74,72 @@ async def test_search_friend_case_insensitive(
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["success"] is True
     assert response.json()["data"]["username"] == other_user.username
+
+
+@pytest.mark.asyncio
+async def test_search_friend_prefix_pages(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Prefix search returns the matches in username order, page by page."""
+    _, user_token = await add_token(1000, 1000, test_db)
+    for name in ("Prefix_b", "prefix_a", "prefix_c", "other_prefix"):
+        await add_user(name, 1004, test_db)
+    headers = {"Authorization": f"Bearer {user_token.access_token}"}
+
+    first = test_setup.post(
+        f"{settings.API_V1_STR}/friend/search",
+        headers=headers,
+        json={"username": "PREFIX", "mode": "prefix", "limit": 2},
+    )
+    assert first.status_code == status.HTTP_200_OK
+    assert [u["username"] for u in first.json()["data"]] == ["prefix_a", "Prefix_b"]
+    next_cursor = first.json()["next"]
+    assert next_cursor["username"] == "prefix_b"
+
+    second = test_setup.post(
+        f"{settings.API_V1_STR}/friend/search",
+        headers=headers,
+        json={"username": "prefix", "mode": "prefix", "limit": 2, "after": next_cursor},
+    )
+    assert [u["username"] for u in second.json()["data"]] == ["prefix_c"]
+    assert second.json()["next"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_friend_fuzzy_falls_back_on_sqlite(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Without pg_trgm fuzzy search matches the term anywhere, wildcards escaped."""
+    _, user_token = await add_token(1000, 1000, test_db)
+    for name in ("my_gold", "mygold", "gold_digger"):
+        await add_user(name, 1005, test_db)
+    headers = {"Authorization": f"Bearer {user_token.access_token}"}
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/friend/search",
+        headers=headers,
+        json={"username": "_gold", "mode": "fuzzy"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [u["username"] for u in response.json()["data"]] == ["my_gold"]
+    assert response.json()["next"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_friend_limit_is_bounded(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Pages are at most 50 users."""
+    _, user_token = await add_token(1000, 1000, test_db)
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/friend/search",
+        headers={"Authorization": f"Bearer {user_token.access_token}"},
+        json={"username": "test", "mode": "prefix", "limit": 51},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
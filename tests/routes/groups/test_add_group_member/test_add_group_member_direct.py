@@ -42,9 +42,7 @@ async def test_successful_add_group_member_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -112,7 +110,7 @@ async def test_add_member_not_admin_direct(
         friend_id=admin_user.id, accept=True
     )
     with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit",
+        "src.sockets.sockets.sio.emit",
         new_callable=AsyncMock,
     ):
         await respond_friend_request.respond_friend_request(
@@ -174,9 +172,7 @@ async def test_add_member_already_in_group_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
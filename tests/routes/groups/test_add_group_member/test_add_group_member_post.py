@@ -33,9 +33,7 @@ async def test_successful_add_group_member(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -97,9 +95,7 @@ async def test_add_member_not_admin(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -157,9 +153,7 @@ async def test_add_member_already_in_group(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -0,0 +1,101 @@
+"""Test for add group members endpoint via direct function call."""
+
+from typing import Tuple
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException, status
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.api_v1.groups import add_group_members, create_group
+from src.models.user import User
+from src.models.user_token import UserToken
+from src.util.util import get_group_room, get_user_room
+from tests.conftest import add_token, add_user, generate_unique_username
+
+
+@pytest.mark.asyncio
+async def test_successful_add_group_members_direct(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """The group and the new members each get one event."""
+    admin_user, admin_token = await add_token(1000, 1000, test_db)
+    assert admin_user.id is not None
+    admin_auth: Tuple[User, UserToken] = (admin_user, admin_token)
+    member1 = await add_user(generate_unique_username("member1"), 1001, test_db)
+    member2 = await add_user(generate_unique_username("member2"), 1002, test_db)
+    assert member1.id is not None and member2.id is not None
+
+    create_request = create_group.CreateGroupRequest(
+        group_name="Batch Group",
+        group_description="A group for batch adds",
+        group_colour="#FF5733",
+        friend_ids=[],
+    )
+    with patch(
+        "age_of_gold_worker.age_of_gold_worker.tasks.task_generate_avatar.delay"
+    ):
+        create_response = await create_group.create_group(
+            create_request, admin_auth, test_db
+        )
+    group_id = create_response["data"]
+    assert isinstance(group_id, int)
+
+    add_members_request = add_group_members.AddGroupMembersRequest(
+        group_id=group_id, user_add_ids=[member2.id, member1.id]
+    )
+    with patch(
+        "src.util.socket_outbox.emit_to_rooms", new_callable=AsyncMock
+    ) as mock_emit_to_rooms:
+        response = await add_group_members.add_group_members(
+            add_members_request, admin_auth, test_db
+        )
+
+    assert response["success"] is True
+    assert mock_emit_to_rooms.await_count == 2
+    mock_emit_to_rooms.assert_any_await(
+        "group_members_added",
+        {"group_id": group_id, "user_ids": [member1.id, member2.id]},
+        [get_group_room(group_id)],
+    )
+    event, data, rooms = mock_emit_to_rooms.await_args_list[-1].args
+    assert event == "group_created"
+    assert data["user_ids"] == sorted([admin_user.id, member1.id, member2.id])
+    assert rooms == [get_user_room(member1.id), get_user_room(member2.id)]
+
+
+@pytest.mark.asyncio
+async def test_add_group_members_already_in_group_direct(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Adding a current member fails before anything is written."""
+    admin_user, admin_token = await add_token(1000, 1000, test_db)
+    assert admin_user.id is not None
+    admin_auth: Tuple[User, UserToken] = (admin_user, admin_token)
+
+    create_request = create_group.CreateGroupRequest(
+        group_name="Batch Group",
+        group_description="A group for batch adds",
+        group_colour="#FF5733",
+        friend_ids=[],
+    )
+    with patch(
+        "age_of_gold_worker.age_of_gold_worker.tasks.task_generate_avatar.delay"
+    ):
+        create_response = await create_group.create_group(
+            create_request, admin_auth, test_db
+        )
+    group_id = create_response["data"]
+    assert isinstance(group_id, int)
+
+    add_members_request = add_group_members.AddGroupMembersRequest(
+        group_id=group_id, user_add_ids=[admin_user.id]
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        await add_group_members.add_group_members(
+            add_members_request, admin_auth, test_db
+        )
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert exc_info.value.detail == f"User {admin_user.id} is already in the group"
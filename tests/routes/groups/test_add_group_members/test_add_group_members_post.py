@@ -0,0 +1,151 @@
+"""Test for add group members endpoint via post call."""
+
+from typing import Dict, List
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.config.config import settings
+from src.models.chat import Chat
+from src.models.group import Group
+from tests.conftest import add_token, add_user, generate_unique_username
+
+
+def create_solo_group(test_setup: TestClient, headers: Dict[str, str]) -> int:
+    """Create a group with only the caller in it and return its id."""
+    with patch(
+        "age_of_gold_worker.age_of_gold_worker.tasks.task_generate_avatar.delay"
+    ):
+        response = test_setup.post(
+            f"{settings.API_V1_STR}/group/create",
+            headers=headers,
+            json={
+                "group_name": "Batch Group",
+                "group_description": "A group for batch adds",
+                "group_colour": "#FF5733",
+                "friend_ids": [],
+            },
+        )
+    group_id: int = response.json()["data"]
+    return group_id
+
+
+async def add_users(test_db: AsyncSession, count: int, origin: int) -> List[int]:
+    """Add `count` users and return their ids."""
+    user_ids = []
+    for index in range(count):
+        user = await add_user(
+            generate_unique_username("member"), origin + index, test_db
+        )
+        assert user.id is not None
+        user_ids.append(user.id)
+    return user_ids
+
+
+@pytest.mark.asyncio
+async def test_successful_add_group_members(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """All users are added to the chat and get a Group row."""
+    admin_user, admin_token = await add_token(1000, 1000, test_db)
+    assert admin_user.id is not None
+    admin_headers = {"Authorization": f"Bearer {admin_token.access_token}"}
+    group_id = create_solo_group(test_setup, admin_headers)
+    new_member_ids = await add_users(test_db, 3, 1001)
+
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
+        response = test_setup.post(
+            f"{settings.API_V1_STR}/group/member/add/batch",
+            headers=admin_headers,
+            json={
+                "group_id": group_id,
+                "user_add_ids": new_member_ids + new_member_ids[:1],
+            },
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"success": True}
+
+    chat = await test_db.get(Chat, group_id, populate_existing=True)
+    assert chat is not None
+    assert chat.user_ids == sorted([admin_user.id, *new_member_ids])
+    member_rows = await test_db.execute(
+        select(Group.user_id).where(Group.group_id == group_id)
+    )
+    assert sorted(member_rows.scalars().all()) == chat.user_ids
+
+
+@pytest.mark.asyncio
+async def test_add_group_members_already_in_group(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Nobody is added when one of the users is already a member."""
+    admin_user, admin_token = await add_token(1000, 1000, test_db)
+    admin_headers = {"Authorization": f"Bearer {admin_token.access_token}"}
+    group_id = create_solo_group(test_setup, admin_headers)
+    new_member_ids = await add_users(test_db, 2, 1001)
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/group/member/add/batch",
+        headers=admin_headers,
+        json={"group_id": group_id, "user_add_ids": [*new_member_ids, admin_user.id]},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == f"User {admin_user.id} is already in the group"
+    chat = await test_db.get(Chat, group_id, populate_existing=True)
+    assert chat is not None
+    assert chat.user_ids == [admin_user.id]
+
+
+@pytest.mark.asyncio
+async def test_add_group_members_not_admin(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Only an admin of the group may add members."""
+    _, admin_token = await add_token(1000, 1000, test_db)
+    other_user = await add_user(generate_unique_username("other"), 1001, test_db)
+    _, other_token = await add_token(1000, 1000, test_db, other_user.id)
+    group_id = create_solo_group(
+        test_setup, {"Authorization": f"Bearer {admin_token.access_token}"}
+    )
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/group/member/add/batch",
+        headers={"Authorization": f"Bearer {other_token.access_token}"},
+        json={"group_id": group_id, "user_add_ids": [9999]},
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert "Only group admins can add members" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_add_group_members_limits(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """An empty or oversized list of users is rejected."""
+    _, admin_token = await add_token(1000, 1000, test_db)
+    admin_headers = {"Authorization": f"Bearer {admin_token.access_token}"}
+
+    empty = test_setup.post(
+        f"{settings.API_V1_STR}/group/member/add/batch",
+        headers=admin_headers,
+        json={"group_id": 1, "user_add_ids": []},
+    )
+    oversized = test_setup.post(
+        f"{settings.API_V1_STR}/group/member/add/batch",
+        headers=admin_headers,
+        json={"group_id": 1, "user_add_ids": list(range(1, 502))},
+    )
+
+    assert empty.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert oversized.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
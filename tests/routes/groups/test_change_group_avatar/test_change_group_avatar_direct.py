@@ -39,9 +39,7 @@ async def test_successful_change_group_avatar_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -166,9 +164,7 @@ async def test_change_group_avatar_not_admin_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
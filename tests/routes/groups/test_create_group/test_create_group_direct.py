@@ -12,6 +12,7 @@ from src.api.api_v1.groups import create_group
 from src.api.api_v1.friends import add_friend, respond_friend_request
 from src.models.user import User
 from src.models.user_token import UserToken
+from src.util.util import get_user_room
 from tests.conftest import add_token, add_user
 
 
@@ -41,9 +42,7 @@ async def test_successful_create_group_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=test_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response2 = await respond_friend_request.respond_friend_request(
             respond_request, other_auth, test_db
         )
@@ -162,7 +161,7 @@ async def test_create_group_multiple_friends_direct(
             friend_id=test_user.id, accept=True
         )
         with patch(
-            "src.api.api_v1.friends.respond_friend_request.sio.emit",
+            "src.sockets.sockets.sio.emit",
             new_callable=AsyncMock,
         ):
             await respond_friend_request.respond_friend_request(
@@ -188,8 +187,13 @@ async def test_create_group_multiple_friends_direct(
 
     assert response["success"] is True
     assert "data" in response
-    # Should emit to both friends
-    assert mock_emit.await_count == 2
+    # Should emit once to both friends
+    mock_emit.assert_awaited_once()
+    assert mock_emit.await_args is not None
+    assert mock_emit.await_args.kwargs["room"] == [
+        get_user_room(friend1.id),
+        get_user_room(friend2.id),
+    ]
 
 
 @pytest.mark.asyncio
@@ -35,9 +35,7 @@ async def test_successful_create_group(
     assert response1.status_code == status.HTTP_200_OK
 
     # Accept friend request
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response2 = test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend_headers,
@@ -160,7 +158,7 @@ async def test_create_group_multiple_friends(
             )
 
         with patch(
-            "src.api.api_v1.friends.respond_friend_request.sio.emit",
+            "src.sockets.sockets.sio.emit",
             new_callable=AsyncMock,
         ):
             test_setup.post(
@@ -38,9 +38,7 @@ async def test_successful_fetch_all_groups_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=test_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend_auth, test_db
         )
@@ -99,7 +97,7 @@ async def test_fetch_groups_with_filter_direct(
             friend_id=test_user.id, accept=True
         )
         with patch(
-            "src.api.api_v1.friends.respond_friend_request.sio.emit",
+            "src.sockets.sockets.sio.emit",
             new_callable=AsyncMock,
         ):
             await respond_friend_request.respond_friend_request(
@@ -178,9 +176,7 @@ async def test_fetch_multiple_groups_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=test_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend_auth, test_db
         )
@@ -33,9 +33,7 @@ async def test_successful_fetch_all_groups(
             json={"user_id": friend.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend_headers,
@@ -93,9 +91,7 @@ async def test_fetch_groups_with_filter(
             json={"user_id": friend.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend_headers,
@@ -38,9 +38,7 @@ async def test_successful_leave_group_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -66,9 +64,7 @@ async def test_successful_leave_group_direct(
     # Friend1 leaves group
     leave_request = leave_group.LeaveGroupRequest(group_id=group_id)
 
-    with patch(
-        "src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await leave_group.leave_group(leave_request, friend1_auth, test_db)
 
     assert response["success"] is True
@@ -126,7 +122,7 @@ async def test_leave_group_last_member_deletes_group_direct(
     # Admin leaves group (last member)
     leave_request = leave_group.LeaveGroupRequest(group_id=group_id)
 
-    with patch("src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response = await leave_group.leave_group(leave_request, admin_auth, test_db)
 
     assert response["success"] is True
@@ -156,9 +152,7 @@ async def test_leave_group_admin_removes_admin_status_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -184,9 +178,7 @@ async def test_leave_group_admin_removes_admin_status_direct(
     # Admin leaves group
     leave_request = leave_group.LeaveGroupRequest(group_id=group_id)
 
-    with patch(
-        "src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await leave_group.leave_group(leave_request, admin_auth, test_db)
 
     assert response["success"] is True
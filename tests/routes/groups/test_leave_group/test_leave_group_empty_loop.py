@@ -39,9 +39,7 @@ async def test_leave_group_empty_notification_loop_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -88,9 +86,7 @@ async def test_leave_group_empty_notification_loop_direct(
     # Admin leaves group (should trigger empty notification loop)
     leave_request = leave_group.LeaveGroupRequest(group_id=group_id)
 
-    with patch(
-        "src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await leave_group.leave_group(leave_request, admin_auth, test_db)
 
     assert response["success"] is True
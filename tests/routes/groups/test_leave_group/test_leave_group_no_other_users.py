@@ -41,9 +41,7 @@ async def test_leave_group_no_other_users_direct(
     # Admin leaves group (no other users to notify)
     leave_request = leave_group.LeaveGroupRequest(group_id=group_id)
 
-    with patch(
-        "src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await leave_group.leave_group(leave_request, admin_auth, test_db)
 
     assert response["success"] is True
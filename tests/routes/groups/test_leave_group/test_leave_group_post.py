@@ -32,9 +32,7 @@ async def test_successful_leave_group(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -60,7 +58,7 @@ async def test_successful_leave_group(
     group_id = create_response.json()["data"]
 
     # Friend1 leaves group
-    with patch("src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response = test_setup.post(
             f"{settings.API_V1_STR}/group/leave",
             headers=friend1_headers,
@@ -121,7 +119,7 @@ async def test_leave_group_last_member_deletes_group(
     group_id = create_response.json()["data"]
 
     # Admin leaves group (last member)
-    with patch("src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response = test_setup.post(
             f"{settings.API_V1_STR}/group/leave",
             headers=headers,
@@ -154,9 +152,7 @@ async def test_leave_group_admin_removes_admin_status(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -182,7 +178,7 @@ async def test_leave_group_admin_removes_admin_status(
     group_id = create_response.json()["data"]
 
     # Admin leaves group
-    with patch("src.api.api_v1.groups.leave_group.sio.emit", new_callable=AsyncMock):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response = test_setup.post(
             f"{settings.API_V1_STR}/group/leave",
             headers=admin_headers,
@@ -32,9 +32,7 @@ async def test_successful_mute_group(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -174,7 +174,7 @@ async def test_promote_admin_not_admin_direct(
             friend_id=admin_user.id, accept=True
         )
         with patch(
-            "src.api.api_v1.friends.respond_friend_request.sio.emit",
+            "src.sockets.sockets.sio.emit",
             new_callable=AsyncMock,
         ):
             await respond_friend_request.respond_friend_request(
@@ -264,9 +264,7 @@ async def test_promote_admin_user_not_in_group_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
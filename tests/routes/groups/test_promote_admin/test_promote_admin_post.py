@@ -167,7 +167,7 @@ async def test_promote_admin_not_admin(
             )
 
         with patch(
-            "src.api.api_v1.friends.respond_friend_request.sio.emit",
+            "src.sockets.sockets.sio.emit",
             new_callable=AsyncMock,
         ):
             test_setup.post(
@@ -256,9 +256,7 @@ async def test_promote_admin_user_not_in_group(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -39,9 +39,7 @@ async def test_successful_remove_member_by_admin_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -69,9 +67,7 @@ async def test_successful_remove_member_by_admin_direct(
         group_id=group_id, user_remove_id=friend1.id
     )
 
-    with patch(
-        "src.api.api_v1.groups.remove_group_member.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await remove_group_member.remove_group_member(
             remove_request, admin_auth, test_db
         )
@@ -104,9 +100,7 @@ async def test_successful_self_removal_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -134,9 +128,7 @@ async def test_successful_self_removal_direct(
         group_id=group_id, user_remove_id=friend1.id
     )
 
-    with patch(
-        "src.api.api_v1.groups.remove_group_member.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await remove_group_member.remove_group_member(
             remove_request, friend1_auth, test_db
         )
@@ -175,7 +167,7 @@ async def test_remove_member_not_admin_not_self_direct(
             friend_id=admin_user.id, accept=True
         )
         with patch(
-            "src.api.api_v1.friends.respond_friend_request.sio.emit",
+            "src.sockets.sockets.sio.emit",
             new_callable=AsyncMock,
         ):
             await respond_friend_request.respond_friend_request(
@@ -269,9 +261,7 @@ async def test_remove_member_not_in_group_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -336,9 +326,7 @@ async def test_remove_admin_from_group_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -366,9 +354,7 @@ async def test_remove_admin_from_group_direct(
         group_id=group_id, user_remove_id=friend1.id
     )
 
-    with patch(
-        "src.api.api_v1.groups.remove_group_member.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await remove_group_member.remove_group_member(
             remove_request, admin_auth, test_db
         )
@@ -38,9 +38,7 @@ async def test_remove_group_member_no_entry_direct(
     respond_request = respond_friend_request.RespondFriendRequest(
         friend_id=admin_user.id, accept=True
     )
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         await respond_friend_request.respond_friend_request(
             respond_request, friend1_auth, test_db
         )
@@ -77,9 +75,7 @@ async def test_remove_group_member_no_entry_direct(
         group_id=group_id, user_remove_id=friend1.id
     )
 
-    with patch(
-        "src.api.api_v1.groups.remove_group_member.sio.emit", new_callable=AsyncMock
-    ) as mock_emit:
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
         response = await remove_group_member.remove_group_member(
             remove_request, admin_auth, test_db
         )
@@ -32,9 +32,7 @@ async def test_successful_remove_member_by_admin(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -60,9 +58,7 @@ async def test_successful_remove_member_by_admin(
     group_id = create_response.json()["data"]
 
     # Remove friend1 from group
-    with patch(
-        "src.api.api_v1.groups.remove_group_member.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response = test_setup.post(
             f"{settings.API_V1_STR}/group/member/remove",
             headers=admin_headers,
@@ -95,9 +91,7 @@ async def test_successful_self_removal(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -123,9 +117,7 @@ async def test_successful_self_removal(
     group_id = create_response.json()["data"]
 
     # Friend1 removes themselves from group
-    with patch(
-        "src.api.api_v1.groups.remove_group_member.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         response = test_setup.post(
             f"{settings.API_V1_STR}/group/member/remove",
             headers=friend1_headers,
@@ -167,7 +159,7 @@ async def test_remove_member_not_admin_not_self(
             )
 
         with patch(
-            "src.api.api_v1.friends.respond_friend_request.sio.emit",
+            "src.sockets.sockets.sio.emit",
             new_callable=AsyncMock,
         ):
             test_setup.post(
@@ -256,9 +248,7 @@ async def test_remove_member_not_in_group(
             json={"user_id": friend1.id},
         )
 
-    with patch(
-        "src.api.api_v1.friends.respond_friend_request.sio.emit", new_callable=AsyncMock
-    ):
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
         test_setup.post(
             f"{settings.API_V1_STR}/friend/respond",
             headers=friend1_headers,
@@ -57,17 +57,16 @@ def test_sanitize_username_without_email() -> None:
 
 
 @pytest.mark.asyncio
-async def test_find_available_username_available(
+async def test_available_usernames_available(
     test_setup: TestClient, test_db: AsyncSession
 ) -> None:
-    username: str = await login_oauth._find_available_username(
-        test_db, "test_user_login"
-    )
-    assert username == "test_user_login"
+    usernames = await login_oauth._available_usernames(test_db, "test_user_login")
+    assert usernames[:2] == ["test_user_login", "test_user_login_2"]
+    assert len(usernames) == 99
 
 
 @pytest.mark.asyncio
-async def test_find_available_username_taken(
+async def test_available_usernames_taken(
     test_setup: TestClient, test_db: AsyncSession
 ) -> None:
     login_user: User = User(
@@ -80,14 +79,14 @@ async def test_find_available_username_taken(
     )
     test_db.add(login_user)
     await test_db.commit()
-    username: str = await login_oauth._find_available_username(
-        test_db, "test_user_login_available"
+    usernames = await login_oauth._available_usernames(
+        test_db, "Test_User_Login_Available"
     )
-    assert username == "test_user_login_available_2"
+    assert usernames[0] == "Test_User_Login_Available_2"
 
 
 @pytest.mark.asyncio
-async def test_find_available_username_all_taken(
+async def test_available_usernames_all_taken(
     test_setup: TestClient, test_db: AsyncSession
 ) -> None:
     test_db.add(
@@ -113,8 +112,13 @@ async def test_find_available_username_all_taken(
         )
     await test_db.commit()
 
+    assert (
+        await login_oauth._available_usernames(test_db, "test_user_login_taken") == []
+    )
     with pytest.raises(HTTPException) as exc_info:
-        await login_oauth._find_available_username(test_db, "test_user_login_taken")
+        await login_oauth._create_user(
+            test_db, "test_user_login_taken", hash_email("taken@example.com"), 1
+        )
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert exc_info.value.detail == "Couldn't create the user"
@@ -136,6 +140,68 @@ async def test_create_user(test_setup: TestClient, test_db: AsyncSession) -> Non
     assert created is True
 
 
+@pytest.mark.asyncio
+async def test_create_user_name_taken_concurrently(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """A name taken after the lookup fails the insert and the next one is used."""
+    test_db.add(
+        User(
+            username="test_user_login_race",
+            email_hash="test_user_login_race@example.com",
+            password_hash="",
+            salt="",
+            origin=0,
+            colour=get_random_colour(),
+        )
+    )
+    await test_db.commit()
+
+    with patch(
+        "src.api.api_v1.oauth.login_oauth._taken_usernames", return_value=set()
+    ) as mock_taken:
+        user, created = await login_oauth._create_user(
+            test_db, "test_user_login_race", hash_email("race@example.com"), 1
+        )
+
+    mock_taken.assert_awaited_once()
+    assert user.username == "test_user_login_race_2"
+    assert created is True
+
+
+@pytest.mark.asyncio
+async def test_create_user_gives_up_after_attempts(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Sign up fails when every name tried is taken concurrently."""
+    for name in [
+        "test_user_login_busy",
+        "test_user_login_busy_2",
+        "test_user_login_busy_3",
+    ]:
+        test_db.add(
+            User(
+                username=name,
+                email_hash="test_user_login_busy@example.com",
+                password_hash="",
+                salt="",
+                origin=0,
+                colour=get_random_colour(),
+            )
+        )
+    await test_db.commit()
+
+    with (
+        patch("src.api.api_v1.oauth.login_oauth._taken_usernames", return_value=set()),
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await login_oauth._create_user(
+            test_db, "test_user_login_busy", hash_email("busy@example.com"), 1
+        )
+
+    assert exc_info.value.detail == "Couldn't create the user"
+
+
 @pytest.mark.asyncio
 async def test_login_user_oauth_existing_user(
     test_setup: TestClient, test_db: AsyncSession
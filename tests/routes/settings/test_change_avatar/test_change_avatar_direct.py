@@ -163,10 +163,10 @@ async def test_change_avatar_invalid_extension_direct(
 
 
 @pytest.mark.asyncio
-async def test_change_avatar_updates_friend_versions(
+async def test_change_avatar_notifies_friends(
     test_setup: TestClient, test_db: AsyncSession, mocker: MockerFixture
 ) -> None:
-    """Test that changing avatar updates friend versions and emits socket events."""
+    """Test that changing avatar emits one event to all friends."""
     # Setup: Add a friend for the test user
     test_user, test_user_token = await add_token(1000, 1000, test_db)
     friend_user = User(
@@ -219,10 +219,9 @@ async def test_change_avatar_updates_friend_versions(
         # Assert the response
         assert response_json["success"]
 
-        # Assert the friend_version was incremented
-        friend_result = await test_db.get(Friend, friend.id)
-        assert friend_result is not None
-        assert friend_result.friend_version == 1
+        # Assert the friend_version was left alone
+        await test_db.refresh(friend)
+        assert friend.friend_version == 0
 
         # Assert the socket emit was called
         mock_emit.assert_awaited_once_with(
@@ -230,12 +229,12 @@ async def test_change_avatar_updates_friend_versions(
             {
                 "user_id": test_user.id,
             },
-            room=get_user_room(friend.user_id),
+            room=[get_user_room(friend.user_id)],
         )
 
 
 @pytest.mark.asyncio
-async def test_successful_change_avatar_default_friend_versions(
+async def test_successful_change_avatar_default_notifies_friends(
     test_setup: TestClient,
     test_db: AsyncSession,
 ) -> None:
@@ -285,10 +284,9 @@ async def test_successful_change_avatar_default_friend_versions(
         assert test_user_result is not None
         assert test_user_result.default_avatar
 
-        # Assert the friend_version was incremented
-        friend_result = await test_db.get(Friend, friend.id)
-        assert friend_result is not None
-        assert friend_result.friend_version == 1
+        # Assert the friend_version was left alone
+        await test_db.refresh(friend)
+        assert friend.friend_version == 0
 
         # Assert the socket emit was called
         mock_emit_default.assert_awaited_once_with(
@@ -296,5 +294,5 @@ async def test_successful_change_avatar_default_friend_versions(
             {
                 "user_id": friend_user.id,
             },
-            room=get_user_room(friend.user_id),
+            room=[get_user_room(friend.user_id)],
         )
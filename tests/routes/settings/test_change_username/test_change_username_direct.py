@@ -8,11 +8,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from unittest.mock import AsyncMock, patch
 
 from src.api.api_v1.settings import change_username
+from src.config.config import settings
 from src.models.user import User
 from src.models.friend import Friend
 from src.models.user_token import UserToken
 from src.util.util import get_random_colour, get_user_room
-from tests.conftest import add_token
+from tests.conftest import add_token, add_user
 
 
 @pytest.mark.asyncio
@@ -41,10 +42,10 @@ async def test_successful_change_username_direct(
 
 
 @pytest.mark.asyncio
-async def test_change_username_updates_friend_versions(
+async def test_change_username_notifies_friends(
     test_setup: TestClient, test_db: AsyncSession
 ) -> None:
-    """Test that changing username updates friend versions and emits socket events."""
+    """Test that changing username emits one event to all friends."""
     # Setup: Add a friend for the test user
     test_user, test_user_token = await add_token(1000, 1000, test_db)
     friend_user = User(
@@ -80,10 +81,9 @@ async def test_change_username_updates_friend_versions(
         # Assert the response
         assert response_json["success"]
 
-        # Assert the friend_version was incremented
-        friend_result = await test_db.get(Friend, friend.id)
-        assert friend_result is not None
-        assert friend_result.friend_version == 1
+        # Assert the friend_version was left alone
+        await test_db.refresh(friend)
+        assert friend.friend_version == 0
 
         # Assert the socket emit was called
         mock_emit.assert_awaited_once_with(
@@ -93,5 +93,45 @@ async def test_change_username_updates_friend_versions(
                 "new_username": new_username,
                 "profile_version": test_user.profile_version,
             },
-            room=get_user_room(friend.user_id),
+            room=[get_user_room(friend.user_id)],
         )
+
+
+@pytest.mark.asyncio
+async def test_change_username_bumps_friend_versions_when_enabled(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Test that the compatibility flag still increments friend versions."""
+    test_user, test_user_token = await add_token(1000, 1000, test_db)
+    friend_user = await add_user("friend_user_version_bump", 2001, test_db)
+    other_user = await add_user("other_user_version_bump", 2002, test_db)
+    friend = Friend(user_id=friend_user.id, friend_id=test_user.id, friend_version=3)
+    other = Friend(user_id=friend_user.id, friend_id=other_user.id, friend_version=3)
+    test_db.add_all([friend, other])
+    await test_db.commit()
+
+    with (
+        patch.object(settings, "FRIEND_VERSION_BUMP", True),
+        patch("src.util.rest_util.sio.emit", new_callable=AsyncMock) as mock_emit,
+    ):
+        change_username_request = change_username.ChangeUsernameRequest(
+            new_username="bumped_username"
+        )
+        response_json = await change_username.change_username(
+            change_username_request, (test_user, test_user_token), test_db
+        )
+
+    assert response_json["success"]
+    await test_db.refresh(friend)
+    await test_db.refresh(other)
+    assert friend.friend_version == 4
+    assert other.friend_version == 3
+    mock_emit.assert_awaited_once_with(
+        "username_updated",
+        {
+            "user_id": test_user.id,
+            "new_username": "bumped_username",
+            "profile_version": test_user.profile_version,
+        },
+        room=[get_user_room(friend.user_id)],
+    )
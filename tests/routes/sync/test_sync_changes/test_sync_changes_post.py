@@ -0,0 +1,252 @@
+"""Test for sync changes endpoint via post call."""
+
+from typing import Any, Dict, Optional
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.config.config import settings
+from src.models import Chat, Friend, Group, Tombstone, User
+from tests.conftest import add_token, add_user
+
+
+def sync(test_setup: TestClient, access_token: str, cursor: int = 0) -> Any:
+    """Post a sync and return its data."""
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/sync",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"cursor": cursor},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()["data"]
+
+
+async def add_group(test_db: AsyncSession, admin: User, member: User) -> Chat:
+    """A group of two users with a Group row for each."""
+    chat = Chat(
+        user_ids=[admin.id, member.id],
+        user_admin_ids=[admin.id],
+        private=False,
+        group_name="Test Group",
+        group_description="A test group",
+        group_colour="#FF5733",
+        current_message_id=1,
+    )
+    test_db.add(chat)
+    await test_db.commit()
+    for user in [admin, member]:
+        test_db.add(Group(user_id=user.id, group_id=chat.id, unread_messages=0))
+    await test_db.commit()
+    return chat
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_changes_since_cursor(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test that only rows written at or after the cursor are returned."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    other_user = await add_user("testuser2", 1002, test_db)
+    third_user = await add_user("testuser3", 1003, test_db)
+    assert user.id is not None and other_user.id is not None
+    assert third_user.id is not None
+    headers = {"Authorization": f"Bearer {user_token.access_token}"}
+
+    chat = Chat(
+        user_ids=[user.id, other_user.id],
+        user_admin_ids=[user.id],
+        private=False,
+        group_name="Test Group",
+        group_description="A test group",
+        group_colour="#FF5733",
+        current_message_id=1,
+    )
+    friend = Friend(user_id=user.id, friend_id=other_user.id, accepted=True)
+    other_friend = Friend(user_id=user.id, friend_id=third_user.id, accepted=True)
+    not_my_friend = Friend(user_id=other_user.id, friend_id=user.id, accepted=True)
+    test_db.add_all([chat, friend, other_friend, not_my_friend])
+    await test_db.commit()
+    group = Group(user_id=user.id, group_id=chat.id, unread_messages=0)
+    test_db.add(group)
+    await test_db.commit()
+
+    response = test_setup.post(f"{settings.API_V1_STR}/sync", headers=headers, json={})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()["data"]
+    assert sorted(item["friend_id"] for item in data["friends"]) == [
+        other_user.id,
+        third_user.id,
+    ]
+    assert [item["group_id"] for item in data["groups"]] == [chat.id]
+    cursor = data["cursor"]
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/sync", headers=headers, json={"cursor": cursor}
+    )
+    data = response.json()["data"]
+    assert data["friends"] == [] and data["groups"] == []
+    assert data["cursor"] == cursor
+
+    friend.friend_version += 1
+    chat.group_name = "Renamed Group"
+    await test_db.commit()
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}/sync", headers=headers, json={"cursor": cursor}
+    )
+    data = response.json()["data"]
+    assert data["friends"] == [
+        {
+            "id": friend.id,
+            "friend_id": other_user.id,
+            "accepted": True,
+            "friend_version": 2,
+            "profile_version": 1,
+            "avatar_version": 1,
+        }
+    ]
+    assert data["groups"][0]["group_name"] == "Renamed Group"
+    assert data["removed_friend_ids"] == [] and data["removed_group_ids"] == []
+    assert data["cursor"] > cursor
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("path", "extra_json", "my_accepted", "other_accepted"),
+    [
+        pytest.param("/friend/remove", {}, True, True, id="remove"),
+        pytest.param("/friend/cancel", {}, None, False, id="cancel"),
+        pytest.param("/friend/respond", {"accept": False}, False, None, id="deny"),
+    ],
+)
+async def test_sync_reports_removed_friends(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+    path: str,
+    extra_json: Dict[str, Any],
+    my_accepted: Optional[bool],
+    other_accepted: Optional[bool],
+) -> None:
+    """Test that every way of dropping a friend row shows up for both users."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    other_user = await add_user("testuser2", 1002, test_db)
+    assert user.id is not None and other_user.id is not None
+    test_db.add_all(
+        [
+            Friend(user_id=user.id, friend_id=other_user.id, accepted=my_accepted),
+            Friend(user_id=other_user.id, friend_id=user.id, accepted=other_accepted),
+        ]
+    )
+    await test_db.commit()
+    cursor = sync(test_setup, user_token.access_token)["cursor"]
+
+    response = test_setup.post(
+        f"{settings.API_V1_STR}{path}",
+        headers={"Authorization": f"Bearer {user_token.access_token}"},
+        json={"friend_id": other_user.id, **extra_json},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    data = sync(test_setup, user_token.access_token, cursor)
+    assert data["friends"] == []
+    assert data["removed_friend_ids"] == [other_user.id]
+    assert sync(test_setup, user_token.access_token)["removed_friend_ids"] == []
+    tombstones = (await test_db.execute(select(Tombstone))).scalars().all()
+    assert sorted((t.user_id, t.kind, t.target_id) for t in tombstones) == sorted(
+        [(user.id, "friend", other_user.id), (other_user.id, "friend", user.id)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_removed_friend_added_again(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test that a friend removed and added again is returned as a friend."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    other_user = await add_user("testuser2", 1002, test_db)
+    assert user.id is not None and other_user.id is not None
+    friend = Friend(user_id=user.id, friend_id=other_user.id, accepted=True)
+    test_db.add(friend)
+    await test_db.commit()
+    cursor = sync(test_setup, user_token.access_token)["cursor"]
+
+    await test_db.delete(friend)
+    await test_db.commit()
+    test_db.add(Friend(user_id=user.id, friend_id=other_user.id, accepted=None))
+    await test_db.commit()
+
+    data = sync(test_setup, user_token.access_token, cursor)
+    assert [item["friend_id"] for item in data["friends"]] == [other_user.id]
+    assert data["removed_friend_ids"] == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/group/leave", "/group/member/remove"])
+async def test_sync_reports_removed_groups(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+    path: str,
+) -> None:
+    """Test that leaving and being removed from a group both show up."""
+    admin, admin_token = await add_token(1000, 1000, test_db)
+    member = await add_user("testuser2", 1002, test_db)
+    _, member_token = await add_token(1000, 1000, test_db, member.id)
+    chat = await add_group(test_db, admin, member)
+    cursor = sync(test_setup, member_token.access_token)["cursor"]
+
+    token = member_token if path == "/group/leave" else admin_token
+    response = test_setup.post(
+        f"{settings.API_V1_STR}{path}",
+        headers={"Authorization": f"Bearer {token.access_token}"},
+        json={"group_id": chat.id, "user_remove_id": member.id},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    data = sync(test_setup, member_token.access_token, cursor)
+    assert data["groups"] == []
+    assert data["removed_group_ids"] == [chat.id]
+    admin_data = sync(test_setup, admin_token.access_token, cursor)
+    assert admin_data["removed_group_ids"] == []
+
+
+@pytest.mark.asyncio
+async def test_sync_reports_friend_profile_changes(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test that a friend changing their name is returned with the new version."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    other_user = await add_user("testuser2", 1002, test_db)
+    _, other_token = await add_token(1000, 1000, test_db, other_user.id)
+    assert user.id is not None and other_user.id is not None
+    test_db.add(Friend(user_id=user.id, friend_id=other_user.id, accepted=True))
+    await test_db.commit()
+    cursor = sync(test_setup, user_token.access_token)["cursor"]
+    assert sync(test_setup, user_token.access_token, cursor)["friends"] == []
+
+    response = test_setup.patch(
+        f"{settings.API_V1_STR}/user/username",
+        headers={"Authorization": f"Bearer {other_token.access_token}"},
+        json={"new_username": "renamed_user"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    friends = sync(test_setup, user_token.access_token, cursor)["friends"]
+    assert [(item["friend_id"], item["profile_version"]) for item in friends] == [
+        (other_user.id, 2)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_requires_token(test_setup: TestClient) -> None:
+    """Test that sync is only available to logged in users."""
+    response = test_setup.post(f"{settings.API_V1_STR}/sync", json={})
+    assert response.status_code in (
+        status.HTTP_401_UNAUTHORIZED,
+        status.HTTP_403_FORBIDDEN,
+    )
@@ -0,0 +1,171 @@
+"""Testing file for the socket event coalescer."""
+
+import asyncio
+from typing import Any, List, Tuple
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.sockets.coalescer import EventCoalescer, supersede_key
+from src.sockets.sockets import emit_to_rooms
+
+
+class Recorder:
+    """Collects what a coalescer sends."""
+
+    def __init__(self) -> None:
+        self.sent: List[Tuple[str, Any, List[str]]] = []
+
+    async def __call__(self, event: str, data: Any, rooms: List[str]) -> None:
+        self.sent.append((event, data, rooms))
+
+
+def test_supersede_key() -> None:
+    """Only snapshot events naming a subject can supersede each other."""
+    assert supersede_key("avatar_updated", {"friend_id": 1}) == (
+        "avatar_updated",
+        1,
+        None,
+        None,
+    )
+    assert supersede_key("avatar_updated", {"text": "hi"}) is None
+    assert supersede_key("avatar_updated", "hi") is None
+    assert supersede_key("group_members_added", {"group_id": 1}) is None
+
+
+@pytest.mark.asyncio
+async def test_delta_events_are_all_kept() -> None:
+    """Events that are not snapshots reach the room even about one subject."""
+    recorder = Recorder()
+    coalescer = EventCoalescer(recorder, window=10, max_events=10, enabled=True)
+
+    await coalescer.add("group_members_added", {"group_id": 5, "user_ids": [1]}, ["r"])
+    await coalescer.add("group_members_added", {"group_id": 5, "user_ids": [2]}, ["r"])
+    await coalescer.flush()
+
+    assert recorder.sent == [
+        (
+            "batch",
+            {
+                "events": [
+                    {
+                        "event": "group_members_added",
+                        "data": {"group_id": 5, "user_ids": [1]},
+                    },
+                    {
+                        "event": "group_members_added",
+                        "data": {"group_id": 5, "user_ids": [2]},
+                    },
+                ]
+            },
+            ["r"],
+        )
+    ]
+    assert coalescer.stats.superseded == 0
+
+
+@pytest.mark.asyncio
+async def test_window_flush_batches_and_supersedes() -> None:
+    """Events of a window reach each room once, with superseded ones dropped."""
+    recorder = Recorder()
+    coalescer = EventCoalescer(recorder, window=0.01, max_events=10, enabled=True)
+
+    await coalescer.add(
+        "avatar_updated", {"friend_id": 1, "v": 1}, ["room_a", "room_b"]
+    )
+    await coalescer.add("group_member_added", {"group_id": 5, "user_id": 2}, ["room_a"])
+    await coalescer.add(
+        "avatar_updated", {"friend_id": 1, "v": 2}, ["room_a", "room_b"]
+    )
+    assert recorder.sent == []
+    assert coalescer.timer is not None
+    await coalescer.timer
+
+    assert recorder.sent == [
+        (
+            "batch",
+            {
+                "events": [
+                    {
+                        "event": "group_member_added",
+                        "data": {"group_id": 5, "user_id": 2},
+                    },
+                    {"event": "avatar_updated", "data": {"friend_id": 1, "v": 2}},
+                ]
+            },
+            ["room_a"],
+        ),
+        ("avatar_updated", {"friend_id": 1, "v": 2}, ["room_b"]),
+    ]
+    assert coalescer.pending == {}
+    assert coalescer.stats.as_dict() == {
+        "events": 3,
+        "superseded": 2,
+        "emits": 2,
+        "batches": 1,
+        "window_flushes": 1,
+        "size_flushes": 0,
+        "failed_emits": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_rooms_with_the_same_events_share_one_emit() -> None:
+    """A fan-out buffered for many rooms is still a single emit."""
+    recorder = Recorder()
+    coalescer = EventCoalescer(recorder, window=10, max_events=10, enabled=True)
+    rooms = [f"room_{index}" for index in range(100)]
+
+    await coalescer.add("group_updated", {"group_id": 1}, rooms)
+    await coalescer.flush()
+
+    assert recorder.sent == [("group_updated", {"group_id": 1}, rooms)]
+    assert coalescer.timer is None
+
+
+@pytest.mark.asyncio
+async def test_full_room_flushes_at_once() -> None:
+    """A room reaching max_events is flushed without waiting for the window."""
+    recorder = Recorder()
+    coalescer = EventCoalescer(recorder, window=10, max_events=2, enabled=True)
+
+    await coalescer.add("notice", {"text": "one"}, ["room_a"])
+    await coalescer.add("notice", {"text": "two"}, ["room_a"])
+
+    assert len(recorder.sent) == 1
+    assert recorder.sent[0][0] == "batch"
+    assert coalescer.timer is None
+    assert coalescer.stats.size_flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_logged() -> None:
+    """A failing emit is counted and does not stop the other rooms."""
+    send = AsyncMock(side_effect=[ConnectionError("down"), None])
+    coalescer = EventCoalescer(send, window=10, max_events=10, enabled=True)
+    await coalescer.add("first", {}, ["room_a"])
+    await coalescer.add("second", {}, ["room_b"])
+
+    with patch("src.sockets.coalescer.logger.error") as mock_error:
+        await coalescer.flush()
+
+    mock_error.assert_called_once()
+    assert send.await_count == 2
+    assert coalescer.stats.failed_emits == 1
+    assert coalescer.stats.emits == 1
+
+
+@pytest.mark.asyncio
+async def test_emit_to_rooms_uses_enabled_coalescer() -> None:
+    """With coalescing enabled emit_to_rooms buffers instead of emitting."""
+    with (
+        patch("src.sockets.sockets.sio") as mock_sio,
+        patch("src.sockets.sockets.coalescer.enabled", True),
+        patch("src.sockets.sockets.coalescer.window", 0.01),
+    ):
+        mock_sio.emit = AsyncMock()
+        await emit_to_rooms("event", {"a": 1}, ["room_1", "room_1"])
+        mock_sio.emit.assert_not_awaited()
+        await asyncio.sleep(0.05)
+
+    mock_sio.emit.assert_awaited_once_with("event", {"a": 1}, room=["room_1"])
@@ -0,0 +1,53 @@
+"""Testing file for the msgpack client manager codec."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import msgpack
+import pytest
+
+from src.sockets import msgpack_codec
+from src.sockets.sharded_manager import ShardedRedisManager
+
+MESSAGE = {
+    "method": "emit",
+    "event": "group_created",
+    "data": {"group_id": 1, "user_ids": [1, 2, 3], "avatar": b"\x89PNG"},
+    "namespace": "/",
+    "room": ["room_1", "room_2"],
+    "skip_sid": None,
+    "callback": None,
+    "host_id": "abc",
+}
+
+
+def test_round_trip() -> None:
+    """Messages survive encoding, including binary payloads."""
+    encoded = msgpack_codec.dumps(MESSAGE)
+    assert isinstance(encoded, bytes)
+    assert len(encoded) < len(json.dumps({**MESSAGE, "data": {}}))
+    assert msgpack_codec.loads(encoded) == MESSAGE
+
+
+def test_json_messages_are_still_read() -> None:
+    """Messages from nodes publishing JSON are decoded as JSON."""
+    message = {"method": "disconnect", "sid": "sid"}
+    assert msgpack_codec.loads(json.dumps(message)) == message
+    assert msgpack_codec.loads(json.dumps(message).encode("utf-8")) == message
+    with pytest.raises(ValueError):
+        msgpack_codec.loads(b"not a message")
+
+
+@pytest.mark.asyncio
+async def test_manager_publishes_msgpack() -> None:
+    """A manager configured with the codec publishes msgpack."""
+    manager = ShardedRedisManager("redis://", shards=2, json=msgpack_codec)
+    manager.connected = True
+    manager.redis = MagicMock()
+    manager.redis.publish = AsyncMock()
+
+    await manager._publish_on("socketio", MESSAGE)
+
+    channel, payload = manager.redis.publish.await_args.args
+    assert channel == "socketio"
+    assert msgpack.unpackb(payload) == MESSAGE
@@ -0,0 +1,185 @@
+"""Query budgets of endpoints that are prone to N+1 queries."""
+
+from typing import Dict, List, Tuple
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from age_of_gold_worker.age_of_gold_worker.util.gold_logging import correlation_id
+from src.api.api_v1.oauth.login_oauth import login_user_oauth
+from src.config.config import settings
+from src.models.friend import Friend
+from tests.conftest import add_token, add_user, engine
+from tests.helpers import QueryCounter
+
+# Most statements one request may run, and most runs of one statement fingerprint,
+# for the scenario of each test below. Known N+1 loops show up as repeats above one.
+QUERY_BUDGETS: Dict[str, Tuple[int, int]] = {
+    # Checks the token and all friends at once, inserts the chat and its members.
+    "/group/create": (4, 1),
+    # Checks the token, loads the chat, bumps the member versions, updates the
+    # chat and inserts the members.
+    "/group/member/add/batch": (5, 1),
+    # Checks the token, loads the accounts of 3 origins with their tokens,
+    # friends and groups, deletes all tokens and then all accounts at once.
+    "/delete/account/all": (7, 1),
+    # Looks up the email and all candidate names once, inserts and refreshes.
+    "login_user_oauth": (4, 1),
+}
+
+
+async def add_friends(db: AsyncSession, user_id: int, count: int) -> List[int]:
+    """Add `count` accepted friends of a user and return their ids."""
+    friend_ids = []
+    for index in range(count):
+        friend = await add_user(f"budget_friend_{index}", 1000 + index, db)
+        assert friend.id is not None
+        db.add(Friend(user_id=user_id, friend_id=friend.id, accepted=True))
+        friend_ids.append(friend.id)
+    await db.commit()
+    return friend_ids
+
+
+@pytest.mark.asyncio
+async def test_query_counter_groups_per_request() -> None:
+    """Statements are grouped by request and repeats are flagged."""
+    with QueryCounter(engine.sync_engine) as counter:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            token = correlation_id.set("request")
+            try:
+                await conn.execute(text("SELECT 2"))
+                await conn.execute(text("SELECT 3"))
+            finally:
+                correlation_id.reset(token)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 4"))
+
+    assert counter.count == 3
+    assert counter.per_request() == {
+        None: ["SELECT 1"],
+        "request": ["SELECT 2", "SELECT 3"],
+    }
+    assert counter.repeated() == {"SELECT ?": 2}
+    assert counter.repeated(max_repeats=2) == {}
+    counter.assert_budget(2, max_repeats=2)
+    with pytest.raises(AssertionError, match="ran 2 statements, budget is 1"):
+        counter.assert_budget(1, max_repeats=2)
+    with pytest.raises(AssertionError, match="Likely N\\+1 queries:\n2x SELECT \\?"):
+        counter.assert_budget(2)
+    counter.reset()
+    assert counter.count == 0
+
+
+@pytest.mark.asyncio
+async def test_create_group_query_budget(
+    test_setup: TestClient, test_db: AsyncSession, query_counter: QueryCounter
+) -> None:
+    """Creating a group with several friends stays within its budget."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    assert user.id is not None
+    friend_ids = await add_friends(test_db, user.id, 3)
+    query_counter.reset()
+
+    with (
+        patch("age_of_gold_worker.age_of_gold_worker.tasks.task_generate_avatar.delay"),
+        patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock),
+    ):
+        response = test_setup.post(
+            f"{settings.API_V1_STR}/group/create",
+            headers={"Authorization": f"Bearer {user_token.access_token}"},
+            json={
+                "group_name": "Budget group",
+                "group_description": "",
+                "group_colour": "#FF5733",
+                "friend_ids": friend_ids,
+            },
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    query_counter.assert_budget(*QUERY_BUDGETS["/group/create"])
+
+
+@pytest.mark.asyncio
+async def test_add_group_members_query_budget(
+    test_setup: TestClient, test_db: AsyncSession, query_counter: QueryCounter
+) -> None:
+    """Adding many members to a group at once stays within its budget."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    assert user.id is not None
+    headers = {"Authorization": f"Bearer {user_token.access_token}"}
+    with patch(
+        "age_of_gold_worker.age_of_gold_worker.tasks.task_generate_avatar.delay"
+    ):
+        create_response = test_setup.post(
+            f"{settings.API_V1_STR}/group/create",
+            headers=headers,
+            json={
+                "group_name": "Budget group",
+                "group_description": "",
+                "group_colour": "#FF5733",
+                "friend_ids": [],
+            },
+        )
+    member_ids = []
+    for index in range(5):
+        member = await add_user(f"budget_member_{index}", 1000 + index, test_db)
+        member_ids.append(member.id)
+    query_counter.reset()
+
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock):
+        response = test_setup.post(
+            f"{settings.API_V1_STR}/group/member/add/batch",
+            headers=headers,
+            json={
+                "group_id": create_response.json()["data"],
+                "user_add_ids": member_ids,
+            },
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    query_counter.assert_budget(*QUERY_BUDGETS["/group/member/add/batch"])
+
+
+@pytest.mark.asyncio
+async def test_delete_account_all_query_budget(
+    test_setup: TestClient, test_db: AsyncSession, query_counter: QueryCounter
+) -> None:
+    """Deleting the accounts of every origin stays within its budget."""
+    _, user_token = await add_token(1000, 1000, test_db)
+    for origin in (1, 2):
+        await add_user(
+            f"budget_origin_{origin}",
+            origin,
+            test_db,
+            full_email="testuser@example.com",
+        )
+    query_counter.reset()
+
+    response = test_setup.delete(
+        f"{settings.API_V1_STR}/delete/account/all",
+        headers={"Authorization": f"Bearer {user_token.access_token}"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    query_counter.assert_budget(*QUERY_BUDGETS["/delete/account/all"])
+
+
+@pytest.mark.asyncio
+async def test_oauth_username_query_budget(
+    test_setup: TestClient, test_db: AsyncSession, query_counter: QueryCounter
+) -> None:
+    """Finding a free username after taken ones stays within its budget."""
+    for name in ("budget", "budget_2", "budget_3"):
+        await add_user(name, 0, test_db)
+    query_counter.reset()
+
+    with patch("src.api.api_v1.oauth.login_oauth.task_generate_avatar.delay"):
+        user = await login_user_oauth("budget", "budget@oauth.com", 1, test_db)
+
+    assert user.username == "budget_4"
+    query_counter.assert_budget(*QUERY_BUDGETS["login_user_oauth"])
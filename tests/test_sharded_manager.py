@@ -0,0 +1,344 @@
+"""Testing file for the sharded socket.io client manager."""
+
+import asyncio
+import inspect
+from types import SimpleNamespace
+from typing import AsyncGenerator, List, Tuple
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+import socketio
+from fakeredis import FakeServer
+from fakeredis import aioredis as fake_aioredis
+from socketio.base_manager import BaseManager
+
+from src.sockets.sharded_manager import (
+    SID_SEPARATOR,
+    ShardedRedisManager,
+    room_shard,
+    sid_node,
+)
+
+SHARDS = 8
+
+
+def make_manager(
+    server: FakeServer,
+) -> Tuple[ShardedRedisManager, socketio.AsyncServer]:
+    """A sharded manager on fakeredis with its own socket.io server."""
+    manager = ShardedRedisManager(
+        "redis://", shards=SHARDS, redis_options={"server": server}
+    )
+    manager._get_redis_module = lambda: SimpleNamespace(Redis=fake_aioredis.FakeRedis)
+    sio_server = socketio.AsyncServer(async_mode="asgi", client_manager=manager)
+    sio_server._send_eio_packet = AsyncMock()
+    return manager, sio_server
+
+
+def rooms_on_other_shards(room: str, count: int) -> List[str]:
+    """Rooms that hash onto shards other than the shard of `room`."""
+    shard = room_shard(room, SHARDS)
+    rooms = (f"group_{index}" for index in range(1000))
+    return [r for r in rooms if room_shard(r, SHARDS) != shard][:count]
+
+
+async def wait_for_await(mock: AsyncMock) -> None:
+    """Give the listener tasks a moment to deliver a published message."""
+    for _ in range(100):
+        if mock.await_count:
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest_asyncio.fixture
+async def managers() -> AsyncGenerator[
+    Tuple[
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+    ],
+    None,
+]:
+    """Two listening managers sharing one fake Redis."""
+    server = FakeServer()
+    sender = make_manager(server)
+    receiver = make_manager(server)
+    tasks = [
+        asyncio.create_task(manager._thread()) for manager, _ in (sender, receiver)
+    ]
+    for manager, _ in (sender, receiver):
+        while manager.listener is None:
+            await asyncio.sleep(0.01)
+    try:
+        yield sender, receiver
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_room_emit_reaches_hosting_node_only_for_its_shards(
+    managers: Tuple[
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+    ],
+) -> None:
+    """A node receives emits for rooms it hosts and never sees other shards."""
+    (_, sender_server), (receiver, receiver_server) = managers
+    sid = await receiver.connect("eio_1", "/")
+    assert sid is not None
+    await receiver.enter_room(sid, "/", "user_1")
+    assert room_shard("user_1", SHARDS) in receiver.subscribed_shards
+
+    handle_emit = AsyncMock(wraps=receiver._handle_emit)
+    with patch.object(receiver, "_handle_emit", handle_emit):
+        other_rooms = [
+            room
+            for room in rooms_on_other_shards("user_1", 50)
+            if room_shard(room, SHARDS) not in receiver.subscribed_shards
+        ][:3]
+        assert other_rooms
+        await sender_server.emit("elsewhere", {}, room=other_rooms)
+        await sender_server.emit("hello", {"a": 1}, room=["user_1", *other_rooms])
+        await wait_for_await(handle_emit)
+        await asyncio.sleep(0.05)
+
+    handle_emit.assert_awaited_once()
+    message = handle_emit.await_args.args[0]  # type: ignore[union-attr]
+    assert message["event"] == "hello"
+    assert message["room"] == ["user_1"]
+    receiver_server._send_eio_packet.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_uses_shared_channel(
+    managers: Tuple[
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+    ],
+) -> None:
+    """Emits without a room are still delivered to every node."""
+    (_, sender_server), (receiver, receiver_server) = managers
+    await receiver.connect("eio_1", "/")
+
+    await sender_server.emit("everyone", {"a": 1})
+    await wait_for_await(receiver_server._send_eio_packet)
+
+    receiver_server._send_eio_packet.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_follow_rooms(
+    managers: Tuple[
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+    ],
+) -> None:
+    """Shards are dropped once the last local room on them is left."""
+    _, (receiver, _) = managers
+    sid = await receiver.connect("eio_1", "/")
+    other_sid = await receiver.connect("eio_2", "/")
+    assert sid is not None and other_sid is not None
+    shard = room_shard("user_1", SHARDS)
+    await receiver.enter_room(sid, "/", "user_1")
+    await receiver.enter_room(other_sid, "/", "user_1")
+
+    await receiver.leave_room(sid, "/", "user_1")
+    await asyncio.gather(*receiver.subscription_tasks)
+    assert shard in receiver.local_rooms
+
+    await receiver.disconnect(other_sid, "/")
+    await receiver.disconnect(sid, "/")
+    await asyncio.gather(*receiver.subscription_tasks)
+    assert receiver.local_rooms == {}
+    assert receiver.subscribed_shards == set()
+
+    # Leaving a room that was never entered changes nothing.
+    receiver.basic_leave_room("unknown", "/", "user_1")
+    assert receiver.subscription_tasks == set()
+
+
+@pytest.mark.asyncio
+async def test_connections_alone_subscribe_no_shards(
+    managers: Tuple[
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+    ],
+) -> None:
+    """Sid rooms are not sharded, only the rooms clients join pick shards."""
+    _, (receiver, _) = managers
+    sids = [await receiver.connect(f"eio_{index}", "/") for index in range(500)]
+    assert all(sid is not None for sid in sids)
+    assert receiver.local_rooms == {}
+    assert receiver.subscribed_shards == set()
+
+    await receiver.enter_room(sids[0], "/", "user_1")  # type: ignore[arg-type]
+    assert receiver.subscribed_shards == {room_shard("user_1", SHARDS)}
+
+
+@pytest.mark.asyncio
+async def test_sid_emit_goes_to_hosting_node(
+    managers: Tuple[
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+        Tuple[ShardedRedisManager, socketio.AsyncServer],
+    ],
+) -> None:
+    """An emit to a sid is published on the channel of the node hosting it."""
+    (sender, sender_server), (receiver, receiver_server) = managers
+    sid = await receiver.connect("eio_1", "/")
+    assert sid is not None
+    assert sid.startswith(receiver.node_id + SID_SEPARATOR)
+    assert sid_node(sid) == receiver.node_id
+
+    publish_on = AsyncMock(wraps=sender._publish_on)
+    with patch.object(sender, "_publish_on", publish_on):
+        await sender_server.emit("direct", {"a": 1}, room=sid)
+        await wait_for_await(receiver_server._send_eio_packet)
+
+    receiver_server._send_eio_packet.assert_awaited_once()
+    publish_on.assert_awaited_once()
+    assert publish_on.await_args.args[0] == (  # type: ignore[union-attr]
+        f"socketio:node:{receiver.node_id}"
+    )
+
+
+def test_publish_splits_rooms_by_shard() -> None:
+    """An emit is published once per shard, with that shard's rooms."""
+    manager = ShardedRedisManager("redis://", shards=SHARDS)
+    rooms = ["user_1", *rooms_on_other_shards("user_1", 1)]
+    publish_on = AsyncMock()
+    with patch.object(manager, "_publish_on", publish_on):
+        asyncio.run(manager._publish({"method": "emit", "room": rooms}))
+        asyncio.run(manager._publish({"method": "emit", "room": "user_1"}))
+        asyncio.run(manager._publish({"method": "disconnect", "sid": "sid"}))
+        remote_sid = f"{'0' * 12}{SID_SEPARATOR}abc"
+        local_sid = f"{manager.node_id}{SID_SEPARATOR}abc"
+        asyncio.run(
+            manager._publish({"method": "emit", "room": [remote_sid, local_sid]})
+        )
+        asyncio.run(manager._publish({"method": "emit", "room": local_sid}))
+
+    assert [c.args for c in publish_on.await_args_list] == [
+        (
+            f"socketio:{room_shard(rooms[0], SHARDS)}",
+            {"method": "emit", "room": [rooms[0]]},
+        ),
+        (
+            f"socketio:{room_shard(rooms[1], SHARDS)}",
+            {"method": "emit", "room": [rooms[1]]},
+        ),
+        (
+            f"socketio:{room_shard('user_1', SHARDS)}",
+            {"method": "emit", "room": "user_1"},
+        ),
+        ("socketio", {"method": "disconnect", "sid": "sid"}),
+        (f"socketio:node:{'0' * 12}", {"method": "emit", "room": [remote_sid]}),
+    ]
+
+
+def test_sid_node() -> None:
+    """Only sids made by a sharded manager name a node."""
+    assert sid_node(f"{'a' * 12}{SID_SEPARATOR}xyz") == "a" * 12
+    assert sid_node(f"short{SID_SEPARATOR}xyz") is None
+    assert sid_node("user_1") is None
+    assert sid_node(1) is None
+
+
+def test_connect_twice_is_refused() -> None:
+    """A second connect of the same engine.io session is refused, as upstream."""
+    manager, _ = make_manager(FakeServer())
+    assert asyncio.run(manager.connect("eio_1", "/")) is not None
+    assert asyncio.run(manager.connect("eio_1", "/")) is None
+
+
+def test_redis_manager_hooks_are_unchanged() -> None:
+    """
+    The private parts of python-socketio the sharded manager builds on.
+
+    Fails when an upgrade renames or reworks them, the manager has to be
+    checked against the new version before the pin is raised.
+    """
+    for hook in ("_publish", "_listen", "_redis_listen_with_retries", "_thread"):
+        assert callable(getattr(socketio.AsyncRedisManager, hook)), hook
+    manager = socketio.AsyncRedisManager(
+        "redis://", redis_options={"server": FakeServer()}
+    )
+    manager._get_redis_module = lambda: SimpleNamespace(Redis=fake_aioredis.FakeRedis)
+    assert manager.connected is False
+    manager._redis_connect()
+    assert manager.connected is True
+    assert manager.redis is not None and manager.pubsub is not None
+    # `connect` is a copy of this one with a different sid.
+    source = inspect.getsource(BaseManager.connect)
+    assert "sid = self.server.eio.generate_id()" in source
+    assert source.count("self.basic_enter_room(") == 2
+
+
+def test_rooms_without_running_loop() -> None:
+    """Membership is tracked even when no loop is running to subscribe."""
+    manager = ShardedRedisManager("redis://", shards=SHARDS)
+    manager.basic_enter_room("sid", "/", None, eio_sid="eio")
+    manager.basic_enter_room("sid", "/", "user_1")
+
+    assert manager.local_rooms == {room_shard("user_1", SHARDS): {("/", "user_1")}}
+    assert manager.subscription_tasks == set()
+
+
+@pytest.mark.asyncio
+async def test_publish_retries_once() -> None:
+    """A failed publish reconnects once and then gives up."""
+    manager = ShardedRedisManager("redis://", shards=SHARDS)
+    manager.connected = True
+    manager.redis = MagicMock()
+    manager.redis.publish = AsyncMock(side_effect=ConnectionError("down"))
+    manager._redis_connect = MagicMock()
+
+    with patch("src.sockets.sharded_manager.logger.error") as mock_error:
+        assert await manager._publish_on("socketio", {"method": "emit"}) is None
+
+    assert manager.redis.publish.await_count == 2
+    manager._redis_connect.assert_called_once()
+    assert mock_error.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_subscription_failure_is_logged() -> None:
+    """A failing subscribe leaves the subscribed shards untouched."""
+    manager = ShardedRedisManager("redis://", shards=SHARDS)
+    manager.listener = MagicMock()
+    manager.listener.subscribe = AsyncMock(side_effect=ConnectionError("down"))
+    manager.local_rooms = {1: {("/", "user_1")}}
+
+    with patch("src.sockets.sharded_manager.logger.error") as mock_error:
+        await manager.sync_subscriptions()
+
+    mock_error.assert_called_once()
+    assert manager.subscribed_shards == set()
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_after_failure() -> None:
+    """The listener drops a broken connection and subscribes again."""
+    manager, _ = make_manager(FakeServer())
+    broken = MagicMock()
+    broken.subscribe = AsyncMock(side_effect=ConnectionError("down"))
+    redis_connect = manager._redis_connect
+
+    def connect_broken_first() -> None:
+        redis_connect()
+        if manager.listener is None and broken.subscribe.await_count == 0:
+            manager.pubsub = broken
+
+    manager._redis_connect = connect_broken_first
+    with patch("src.sockets.sharded_manager.logger.error") as mock_error:
+        listen = manager._listen()
+        next_message = asyncio.ensure_future(listen.__anext__())
+        while manager.listener is None:
+            await asyncio.sleep(0.01)
+        await manager.redis.publish("socketio", b"payload")
+        await manager.redis.publish("other", b"ignored")
+        assert await next_message == b"payload"
+        await listen.aclose()
+
+    mock_error.assert_called_once()
@@ -1,14 +1,22 @@
 """Testing file for sockets."""
 
-from typing import Dict, Optional, Union
-from unittest.mock import AsyncMock, patch
+import logging
+from typing import Any, Dict, Optional, Union
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
-from pytest import CaptureFixture
-
-from src.models.user import User
+from pytest import LogCaptureFixture
+from socketio.exceptions import ConnectionRefusedError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.chat import Chat
+from src.models.friend import Friend
+from src.models.group import Group
+from src.sockets.sharded_manager import ShardedRedisManager
 from src.sockets.sockets import (
+    emit_to_rooms,
+    get_user_rooms,
     handle_connect,
     handle_disconnect,
     handle_join,
@@ -17,44 +25,183 @@ from src.sockets.sockets import (
     handle_leave_group,
     handle_message_event,
 )
-from tests.conftest import ASYNC_TESTING_SESSION_LOCAL
+from src.util.util import get_group_room, get_user_room
+from tests.conftest import ASYNC_TESTING_SESSION_LOCAL, add_token, add_user
+
+
+async def add_chat_member(db: AsyncSession, user_id: int) -> int:
+    """Create a group chat with a single member and return its id."""
+    chat = Chat(
+        group_name="socket_group",
+        group_description="",
+        group_colour="#000000",
+        current_message_id=1,
+        user_ids=[user_id],
+    )
+    db.add(chat)
+    await db.commit()
+    db.add(Group(user_id=user_id, group_id=chat.id, unread_messages=0))
+    await db.commit()
+    return chat.id
 
 
 @pytest.mark.asyncio
-async def test_handle_connect(capfd: CaptureFixture[str]) -> None:
-    """Test the handle_connect function."""
-    await handle_connect("test_sid")
-    captured = capfd.readouterr()
-    assert "Received connect: test_sid" in captured.out
+async def test_handle_connect(test_setup: TestClient, test_db: AsyncSession) -> None:
+    """Test that connect authenticates and enters the user and group rooms."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    group_id = await add_chat_member(test_db, 1)
+
+    with (
+        patch("src.sockets.sockets.sio") as mock_sio,
+        patch("src.sockets.sockets.mgr") as mock_mgr,
+        patch("src.sockets.sockets.async_session", new=ASYNC_TESTING_SESSION_LOCAL),
+    ):
+        mock_sio.save_session = AsyncMock()
+        await handle_connect("test_sid", {}, {"token": user_token.access_token})
+
+    mock_sio.save_session.assert_awaited_once_with("test_sid", {"user_id": user.id})
+    assert [c.args for c in mock_mgr.basic_enter_room.call_args_list] == [
+        ("test_sid", "/", "room_1"),
+        ("test_sid", "/", get_group_room(group_id)),
+    ]
 
 
 @pytest.mark.asyncio
-async def test_handle_disconnect(capfd: CaptureFixture[str]) -> None:
-    """Test the handle_disconnect function."""
-    await handle_disconnect("test_sid")
-    captured = capfd.readouterr()
-    assert "Received disconnect: test_sid" in captured.out
+async def test_handle_connect_reads_authorization_header(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Test that connect accepts a bearer token header and syncs shards once."""
+    _, user_token = await add_token(1000, 1000, test_db)
+    sharded_mgr = ShardedRedisManager("redis://", shards=4)
+    environ = {"HTTP_AUTHORIZATION": f"Bearer {user_token.access_token}"}
+
+    with (
+        patch("src.sockets.sockets.sio") as mock_sio,
+        patch("src.sockets.sockets.mgr", sharded_mgr),
+        patch.object(sharded_mgr, "basic_enter_room") as mock_enter,
+        patch.object(
+            sharded_mgr, "sync_subscriptions", new_callable=AsyncMock
+        ) as mock_sync,
+        patch("src.sockets.sockets.async_session", new=ASYNC_TESTING_SESSION_LOCAL),
+    ):
+        mock_sio.save_session = AsyncMock()
+        await handle_connect("test_sid", environ)
+
+    mock_enter.assert_called_once_with("test_sid", "/", "room_1")
+    mock_sync.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_handle_message_event(capfd: CaptureFixture[str]) -> None:
-    """Test the handle_message_event function."""
-    await handle_message_event("test_sid")
-    captured = capfd.readouterr()
-    assert "Received message_event: test_sid" in captured.out
+async def test_presence_changes_are_sent_to_friends(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Test that accepted friends hear when a user comes online and goes offline."""
+    _, user_token = await add_token(1000, 1000, test_db)
+    friend = await add_user("presence_friend", 1001, test_db)
+    requester = await add_user("presence_requester", 1002, test_db)
+    assert friend.id is not None and requester.id is not None
+    test_db.add(Friend(user_id=friend.id, friend_id=1, accepted=True))
+    test_db.add(Friend(user_id=requester.id, friend_id=1))
+    await test_db.commit()
+
+    session_factory = MagicMock(wraps=ASYNC_TESTING_SESSION_LOCAL)
+    with (
+        patch("src.sockets.sockets.sio") as mock_sio,
+        patch("src.sockets.sockets.mgr"),
+        patch("src.sockets.sockets.presence") as mock_presence,
+        patch("src.sockets.sockets.async_session", new=session_factory),
+    ):
+        mock_sio.save_session = AsyncMock()
+        mock_sio.emit = AsyncMock()
+        mock_presence.connect = AsyncMock(return_value=True)
+        mock_presence.disconnect = AsyncMock(return_value=1)
+
+        await handle_connect("test_sid", {}, {"token": user_token.access_token})
+        # The friends come from the session that checked the token.
+        assert session_factory.call_count == 1
+        await handle_disconnect("test_sid")
+
+    mock_presence.connect.assert_awaited_once_with("test_sid", 1)
+    mock_presence.disconnect.assert_awaited_once_with("test_sid")
+    events = [
+        (c.args[0], c.args[1]["online"], c.kwargs)
+        for c in mock_sio.emit.await_args_list
+    ]
+    assert events == [
+        ("friend_presence", True, {"room": [get_user_room(friend.id)]}),
+        ("friend_presence", False, {"room": [get_user_room(friend.id)]}),
+    ]
 
 
 @pytest.mark.asyncio
-async def test_handle_join(test_setup: TestClient) -> None:
-    """Test the handle_join function."""
+@pytest.mark.parametrize(
+    "environ, auth",
+    [
+        ({}, None),
+        ({"HTTP_AUTHORIZATION": "Basic abc"}, {"token": 1}),
+        ({}, {"token": "not_a_token"}),
+    ],
+)
+async def test_handle_connect_refuses_unauthenticated(
+    test_setup: TestClient,
+    environ: Dict[str, str],
+    auth: Optional[Dict[str, Any]],
+) -> None:
+    """Test that connections without a valid access token are refused."""
     with (
         patch("src.sockets.sockets.sio") as mock_sio,
+        patch("src.sockets.sockets.mgr") as mock_mgr,
         patch("src.sockets.sockets.async_session", new=ASYNC_TESTING_SESSION_LOCAL),
     ):
+        mock_sio.save_session = AsyncMock()
+        with pytest.raises(ConnectionRefusedError):
+            await handle_connect("test_sid", environ, auth)
+
+    mock_sio.save_session.assert_not_awaited()
+    mock_mgr.basic_enter_room.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_user_rooms_uses_room_cache(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Test that cached rooms answer without a database query."""
+    with patch("src.sockets.sockets.room_cache") as mock_cache:
+        mock_cache.get = AsyncMock(return_value=["room_1", "group_3"])
+        mock_cache.store = AsyncMock()
+        with patch.object(test_db, "execute", new_callable=AsyncMock) as mock_execute:
+            rooms = await get_user_rooms(test_db, 1)
+
+    assert rooms == ["room_1", "group_3"]
+    mock_execute.assert_not_called()
+    mock_cache.store.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_handle_disconnect(caplog: LogCaptureFixture) -> None:
+    """Test the handle_disconnect function."""
+    with caplog.at_level(logging.INFO, logger="src.sockets.sockets"):
+        await handle_disconnect("test_sid")
+    assert "Received disconnect: test_sid" in caplog.messages
+
+
+@pytest.mark.asyncio
+async def test_handle_message_event(caplog: LogCaptureFixture) -> None:
+    """Test the handle_message_event function."""
+    with caplog.at_level(logging.DEBUG, logger="src.sockets.sockets"):
+        await handle_message_event("test_sid")
+    assert "Received message_event: test_sid" in caplog.messages
+
+
+@pytest.mark.asyncio
+async def test_handle_join() -> None:
+    """Test that join enters the room of the session user, whatever is sent."""
+    with patch("src.sockets.sockets.sio") as mock_sio:
+        mock_sio.get_session = AsyncMock(return_value={"user_id": 1})
         mock_sio.enter_room = AsyncMock()
         mock_sio.emit = AsyncMock()
 
-        data: Dict[str, Union[int, str]] = {"user_id": 1}
+        data: Dict[str, Union[int, str]] = {"user_id": 2}
         await handle_join("test_sid", data)
 
         mock_sio.enter_room.assert_called_once_with("test_sid", "room_1")
@@ -65,10 +212,27 @@ async def test_handle_join(test_setup: TestClient) -> None:
         )
 
 
+@pytest.mark.asyncio
+async def test_handlers_ignore_unauthenticated_sessions() -> None:
+    """Test that join and leave do nothing without an authenticated session."""
+    with patch("src.sockets.sockets.sio") as mock_sio:
+        mock_sio.get_session = AsyncMock(return_value={})
+        mock_sio.enter_room = AsyncMock()
+        mock_sio.leave_room = AsyncMock()
+
+        await handle_join("test_sid", {"user_id": 1})
+        await handle_join_group("test_sid", {"group_id": 1})
+        await handle_leave("test_sid", {"user_id": 1})
+
+        mock_sio.enter_room.assert_not_called()
+        mock_sio.leave_room.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_handle_leave() -> None:
     """Test the handle_leave function."""
     with patch("src.sockets.sockets.sio") as mock_sio:
+        mock_sio.get_session = AsyncMock(return_value={"user_id": 1})
         mock_sio.leave_room = AsyncMock()
         mock_sio.emit = AsyncMock()
 
@@ -84,68 +248,29 @@ async def test_handle_leave() -> None:
 
 
 @pytest.mark.asyncio
-async def test_handle_join_with_db(test_setup: TestClient) -> None:
-    """Test the handle_join function with database interaction."""
-
-    async with ASYNC_TESTING_SESSION_LOCAL() as db:
-        user: Optional[User] = await db.get(User, 1)
-        assert user is not None
-
+async def test_handle_join_group(test_setup: TestClient, test_db: AsyncSession) -> None:
+    """Test that join_group only enters groups the session user is a member of."""
+    group_id = await add_chat_member(test_db, 1)
+    group_room = get_group_room(group_id)
     with (
         patch("src.sockets.sockets.sio") as mock_sio,
         patch("src.sockets.sockets.async_session", new=ASYNC_TESTING_SESSION_LOCAL),
     ):
+        mock_sio.get_session = AsyncMock(return_value={"user_id": 1})
         mock_sio.enter_room = AsyncMock()
         mock_sio.emit = AsyncMock()
 
-        data: Dict[str, Union[int, str]] = {"user_id": 1}
-        await handle_join("test_sid_1", data)
-
-        mock_sio.enter_room.assert_called_once_with("test_sid_1", "room_1")
-        mock_sio.emit.assert_called_once_with(
-            "message_event",
-            "User has entered room room_1",
-            room="room_1",
-        )
+        await handle_join_group("test_sid", {"group_id": group_id + 1})
+        mock_sio.enter_room.assert_not_called()
 
-        data_not_real: Dict[str, Union[int, str]] = {"user_id": 2}
-        await handle_join("test_sid_2", data_not_real)
-
-        mock_sio.enter_room.assert_any_call("test_sid_1", "room_1")
-        mock_sio.enter_room.assert_any_call("test_sid_2", "room_2")
-        mock_sio.emit.assert_any_call(
-            "message_event",
-            "User has entered room room_2",
-            room="room_2",
-        )
-        mock_sio.emit.assert_any_call(
-            "message_event",
-            "User has entered room room_1",
-            room="room_1",
-        )
-
-        async with ASYNC_TESTING_SESSION_LOCAL() as db:
-            retrieved_user: Optional[User] = await db.get(User, 1)
-            assert retrieved_user is not None
-            assert retrieved_user.id == user.id
-            assert retrieved_user.username == user.username
-
-
-@pytest.mark.asyncio
-async def test_handle_join_group() -> None:
-    """Test the handle_join_group function."""
-    with patch("src.sockets.sockets.sio") as mock_sio:
-        mock_sio.enter_room = AsyncMock()
-        mock_sio.emit = AsyncMock()
-
-        data: Dict[str, Union[int, str]] = {"group_id": 1}
+        data: Dict[str, Union[int, str]] = {"group_id": group_id}
         await handle_join_group("test_sid", data)
 
-        mock_sio.enter_room.assert_called_once_with("test_sid", "group_1")
+        mock_sio.enter_room.assert_called_once_with("test_sid", group_room)
         mock_sio.emit.assert_called_once_with(
             "message_event",
-            "User has entered group room group_1",
-            room="group_1",
+            f"User has entered group room {group_room}",
+            room=group_room,
         )
 
 
@@ -165,3 +290,17 @@ async def test_handle_leave_group() -> None:
             "User has left group room group_1",
             room="test_sid",
         )
+
+
+@pytest.mark.asyncio
+async def test_emit_to_rooms() -> None:
+    """Test that emit_to_rooms sends one emit for all distinct rooms."""
+    with patch("src.sockets.sockets.sio") as mock_sio:
+        mock_sio.emit = AsyncMock()
+
+        await emit_to_rooms("event", {"a": 1}, ["room_2", "room_1", "room_2"])
+        await emit_to_rooms("event", {"a": 1}, [])
+
+        mock_sio.emit.assert_awaited_once_with(
+            "event", {"a": 1}, room=["room_2", "room_1"]
+        )
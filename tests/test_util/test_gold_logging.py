@@ -0,0 +1,68 @@
+"""Test file for the api logging setup."""
+
+from typing import Any, List, MutableMapping, Optional
+
+import pytest
+
+from age_of_gold_worker.age_of_gold_worker.util.gold_logging import correlation_id
+from src.util.gold_logging import CorrelationIdMiddleware
+
+Message = MutableMapping[str, Any]
+
+
+class App:
+    """ASGI app that records the correlation id it ran under."""
+
+    def __init__(self) -> None:
+        self.seen: Optional[str] = None
+
+    async def __call__(self, scope: Message, receive: Any, send: Any) -> None:
+        self.seen = correlation_id.get()
+        if scope["type"] == "http":
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+
+async def run(scope: Message) -> tuple[App, List[Message]]:
+    """Send one scope through the middleware."""
+    app = App()
+    sent: List[Message] = []
+
+    async def receive() -> Message:
+        return {}  # pragma: no cover
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    await CorrelationIdMiddleware(app)(scope, receive, send)
+    return app, sent
+
+
+@pytest.mark.asyncio
+async def test_request_id_header_is_used_and_returned() -> None:
+    """An incoming X-Request-ID is the correlation id of the request."""
+    app, sent = await run({"type": "http", "headers": [(b"x-request-id", b"abc")]})
+
+    assert app.seen == "abc"
+    assert (b"x-request-id", b"abc") in sent[0]["headers"]
+    assert "headers" not in sent[1]
+    assert correlation_id.get() is None
+
+
+@pytest.mark.asyncio
+async def test_missing_or_oversized_request_id_is_generated() -> None:
+    """Requests without a usable id get a fresh one."""
+    app, _ = await run({"type": "websocket", "headers": []})
+    assert app.seen is not None and len(app.seen) == 32
+
+    app, sent = await run({"type": "http", "headers": [(b"x-request-id", b"x" * 200)]})
+    assert app.seen is not None and len(app.seen) == 32
+    assert (b"x-request-id", app.seen.encode()) in sent[0]["headers"]
+
+
+@pytest.mark.asyncio
+async def test_other_scopes_pass_through() -> None:
+    """Lifespan events are not given a correlation id."""
+    app, sent = await run({"type": "lifespan"})
+    assert app.seen is None
+    assert sent == []
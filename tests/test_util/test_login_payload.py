@@ -0,0 +1,95 @@
+"""Test file for the compact login payload encodings."""
+
+import json
+
+import msgpack
+
+from src.util.login_payload import (
+    LoginFormat,
+    columnar_login_data,
+    delta_decode,
+    delta_encode,
+    encode_login_response,
+    get_login_format,
+)
+from src.util.util import SuccessfulLoginResponse
+
+
+def login_response() -> SuccessfulLoginResponse:
+    """A default login response with a few friends and groups."""
+    return {
+        "success": True,
+        "data": {
+            "access_token": "access",
+            "refresh_token": "refresh",
+            "profile_version": 2,
+            "avatar_version": 3,
+            "friends": [
+                {"friend_id": 9, "friend_version": 1},
+                {"friend_id": 4, "friend_version": 5},
+            ],
+            "groups": [{"group_id": 7, "group_version": 2}],
+        },
+    }
+
+
+def test_get_login_format() -> None:
+    """Test reading the format from the request headers."""
+    assert get_login_format(None, None) == LoginFormat()
+    assert get_login_format("Columnar", "application/json") == LoginFormat(
+        columnar=True
+    )
+    assert get_login_format("columnar-delta", "application/msgpack") == LoginFormat(
+        columnar=True, delta=True, msgpack=True
+    )
+    assert get_login_format("rows", "application/x-msgpack") == LoginFormat(
+        msgpack=True
+    )
+
+
+def test_delta_round_trip() -> None:
+    """Test that delta encoding is reversible."""
+    values = [3, 4, 10, 1000]
+    assert delta_encode(values) == [3, 1, 6, 990]
+    assert delta_decode(delta_encode(values)) == values
+    assert delta_encode([]) == []
+
+
+def test_columnar_login_data() -> None:
+    """Test the parallel arrays with and without delta encoding."""
+    data = login_response()["data"]
+    columnar = columnar_login_data(data)
+    assert columnar["friend_ids"] == [9, 4]
+    assert columnar["friend_versions"] == [1, 5]
+    assert columnar["group_ids"] == [7]
+    assert columnar["group_versions"] == [2]
+    assert columnar["delta"] is False
+
+    delta = columnar_login_data(data, delta=True)
+    assert delta["friend_ids"] == [4, 5]
+    assert delta_decode(delta["friend_ids"]) == [4, 9]
+    assert delta["friend_versions"] == [5, 1]
+    assert delta["access_token"] == "access"
+    assert delta["delta"] is True
+
+
+def test_encode_login_response() -> None:
+    """Test every encoding of the login response."""
+    response = login_response()
+    assert encode_login_response(response, LoginFormat()) is response
+
+    columnar = encode_login_response(response, LoginFormat(columnar=True), 201)
+    assert not isinstance(columnar, dict)
+    assert columnar.status_code == 201
+    assert json.loads(bytes(columnar.body))["data"]["friend_ids"] == [9, 4]
+
+    packed = encode_login_response(
+        response, LoginFormat(columnar=True, delta=True, msgpack=True)
+    )
+    assert not isinstance(packed, dict)
+    assert packed.media_type == "application/msgpack"
+    assert msgpack.unpackb(packed.body)["data"]["friend_ids"] == [4, 5]
+
+    packed_rows = encode_login_response(response, LoginFormat(msgpack=True))
+    assert not isinstance(packed_rows, dict)
+    assert msgpack.unpackb(packed_rows.body) == response
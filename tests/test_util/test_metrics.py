@@ -0,0 +1,309 @@
+"""Test file for the per route request metrics."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, List, MutableMapping
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+from fakeredis import aioredis as fake_aioredis
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config.config import settings
+from src.util.metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    RequestMetrics,
+    current_request,
+    instrument_engine,
+    instrument_manager,
+    instrument_password_hashing,
+    instrument_redis,
+    instrument_s3,
+)
+
+Message = MutableMapping[str, Any]
+
+
+async def receive() -> Message:
+    return {}  # pragma: no cover
+
+
+async def send(message: Message) -> None:
+    pass
+
+
+async def ok_app(scope: Message, receive: Any, send: Any) -> None:
+    """ASGI app that answers 204 on the route set in the scope."""
+    scope["route"] = SimpleNamespace(path="/items/{item_id}")
+    request = current_request.get()
+    assert request is not None
+    request.db_queries += 2
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def test_render_prometheus_text() -> None:
+    """Latency is a cumulative histogram, the rest counters per route."""
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("/a", "GET", 0.05, RequestMetrics(status=200, db_queries=3))
+    registry.observe("/a", "GET", 0.5, RequestMetrics(status=200, socket_emits=1))
+    registry.observe('/b"', "POST", 5.0, RequestMetrics(status=500))
+
+    lines = registry.render().splitlines()
+
+    labels = 'route="/a",method="GET",status="200"'
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in lines
+    assert f'http_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in lines
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in lines
+    assert f"http_request_duration_seconds_sum{{{labels}}} 0.55" in lines
+    assert f"http_request_db_queries_total{{{labels}}} 3" in lines
+    assert f"http_request_socket_emits_total{{{labels}}} 1" in lines
+    assert "# TYPE http_request_redis_seconds_total counter" in lines
+    escaped = 'route="/b\\"",method="POST",status="500"'
+    assert f'http_request_duration_seconds_bucket{{{escaped},le="1.0"}} 0' in lines
+
+
+def test_collected_metrics_are_read_on_render() -> None:
+    """Collected metrics show their value at the time of the scrape."""
+    registry = MetricsRegistry()
+    values = iter([1, 3])
+    registry.collect("jobs_queued", "gauge", "Jobs queued.", lambda: next(values))
+
+    assert "jobs_queued 1" in registry.render().splitlines()
+    lines = registry.render().splitlines()
+    assert lines[-3:] == [
+        "# HELP jobs_queued Jobs queued.",
+        "# TYPE jobs_queued gauge",
+        "jobs_queued 3",
+    ]
+
+
+def test_password_hashing_pool_is_exposed() -> None:
+    """The figures of the hashing pool become gauges and a job counter."""
+    service = MagicMock()
+    service.metrics = {
+        "queue_depth": 4,
+        "waiting": 3,
+        "running": 1,
+        "completed": 9,
+        "average_latency_ms": 12.5,
+        "max_latency_ms": 40.0,
+    }
+    with patch("src.util.metrics.metrics", MetricsRegistry()) as registry:
+        instrument_password_hashing(service)
+        lines = registry.render().splitlines()
+
+    assert "password_hash_queue_depth 4.0" in lines
+    assert "password_hash_waiting 3.0" in lines
+    assert "password_hash_running 1.0" in lines
+    assert "# TYPE password_hash_jobs_total counter" in lines
+    assert "password_hash_jobs_total 9.0" in lines
+    assert "password_hash_average_latency_ms 12.5" in lines
+    assert "password_hash_max_latency_ms 40.0" in lines
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_route_and_status() -> None:
+    """Requests are labelled with their route template and response status."""
+    registry = MetricsRegistry()
+
+    await MetricsMiddleware(ok_app, registry)(
+        {"type": "http", "method": "GET"}, receive, send
+    )
+
+    totals = registry.routes[("/items/{item_id}", "GET", 204)]
+    assert totals.count == 1
+    assert totals.db_queries == 2
+    assert current_request.get() is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_failures_and_other_scopes() -> None:
+    """A failing request counts as an unmatched 500, lifespan is not counted."""
+    registry = MetricsRegistry()
+    failing = AsyncMock(side_effect=[RuntimeError("boom"), None])
+    middleware = MetricsMiddleware(failing, registry)
+
+    with pytest.raises(RuntimeError):
+        await middleware({"type": "http", "method": "POST"}, receive, send)
+    await middleware({"type": "lifespan"}, receive, send)
+
+    assert list(registry.routes) == [("<unmatched>", "POST", 500)]
+    assert failing.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_engine_queries_are_counted_per_request() -> None:
+    """Only queries run while a request is active are charged to it."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine.sync_engine)
+    request = RequestMetrics()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            token = current_request.set(request)
+            try:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+            finally:
+                current_request.reset(token)
+    finally:
+        await engine.dispose()
+
+    assert request.db_queries == 2
+    assert request.db_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_engine_query_leaves_connection_clean() -> None:
+    """A failing statement is not counted and keeps nothing on the connection."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine.sync_engine)
+    request = RequestMetrics()
+    try:
+        async with engine.connect() as conn:
+            token = current_request.set(request)
+            try:
+                with pytest.raises(DBAPIError):
+                    await conn.execute(text("SELECT * FROM missing"))
+                await conn.execute(text("SELECT 1"))
+            finally:
+                current_request.reset(token)
+            info = (await conn.get_raw_connection()).info
+    finally:
+        await engine.dispose()
+
+    assert request.db_queries == 1
+    assert "metrics_query_start" not in info
+
+
+@pytest.mark.asyncio
+async def test_redis_commands_and_pipelines_are_timed() -> None:
+    """Commands and pipeline executions add to the Redis time of a request."""
+    redis = fake_aioredis.FakeRedis()
+    instrument_redis(redis)
+    await redis.set("outside", 1)
+    request = RequestMetrics()
+    token = current_request.set(request)
+    try:
+        await redis.set("key", 1)
+        command_seconds = request.redis_seconds
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.get("key")
+            assert await pipe.execute() == [b"1"]
+    finally:
+        current_request.reset(token)
+
+    assert 0 < command_seconds < request.redis_seconds
+
+
+def test_s3_calls_are_timed() -> None:
+    """boto3 calls made during a request add to its S3 time."""
+    client = boto3.client(
+        "s3",
+        region_name="eu-central-1",
+        aws_access_key_id="key",
+        aws_secret_access_key="secret",
+    )
+    instrument_s3(client)
+    request = RequestMetrics()
+    token = current_request.set(request)
+    try:
+        with Stubber(client) as stubber:
+            stubber.add_response("head_bucket", {}, {"Bucket": "bucket"})
+            client.head_bucket(Bucket="bucket")
+        timed_seconds = request.s3_seconds
+        # A call that was not seen starting is not timed.
+        client.meta.events.emit("after-call.s3.HeadBucket", context={})
+    finally:
+        current_request.reset(token)
+
+    assert timed_seconds > 0
+    assert request.s3_seconds == timed_seconds
+
+
+@pytest.mark.asyncio
+async def test_manager_emits_are_counted() -> None:
+    """Emits handed to the client manager are counted on the request."""
+    emit = AsyncMock(return_value="sent")
+    manager = SimpleNamespace(emit=emit)
+    instrument_manager(manager)
+    await manager.emit("outside", {})
+    request = RequestMetrics()
+    token = current_request.set(request)
+    try:
+        assert await manager.emit("event", {"a": 1}, room="group_1") == "sent"
+    finally:
+        current_request.reset(token)
+
+    assert request.socket_emits == 1
+    emit.assert_awaited_with("event", {"a": 1}, room="group_1")
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(test_setup: TestClient) -> None:
+    """The metrics of earlier requests are exposed in the text format."""
+    headers = {"X-Admin-Token": "secret"}
+    with patch.object(settings, "ADMIN_TOKEN", "secret"):
+        test_setup.get("/metrics", headers=headers)
+        response = test_setup.get("/metrics", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_duration_seconds_count{route="/metrics",method="GET",status="200"}'
+        in response.text
+    )
+    assert "password_hash_queue_depth 0.0" in response.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_requires_admin_token(test_setup: TestClient) -> None:
+    """Without the admin token the metrics endpoint does not exist."""
+    with patch.object(settings, "ADMIN_TOKEN", "secret"):
+        missing = test_setup.get("/metrics")
+        wrong = test_setup.get("/metrics", headers={"X-Admin-Token": "guess"})
+    with patch.object(settings, "ADMIN_TOKEN", ""):
+        disabled = test_setup.get("/metrics", headers={"X-Admin-Token": ""})
+
+    assert missing.status_code == 404
+    assert wrong.status_code == 404
+    assert disabled.status_code == 404
+    assert "http_request_duration_seconds" not in missing.text
+
+
+def test_middleware_overhead_is_small() -> None:
+    """Recording a request costs well under a tenth of a millisecond."""
+    calls = 2000
+    middleware = MetricsMiddleware(ok_app, MetricsRegistry())
+
+    async def bare(scope: Message, receive: Any, send: Any) -> None:
+        token = current_request.set(RequestMetrics())
+        try:
+            await ok_app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+
+    async def timed(app: Any) -> float:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(calls):
+                await app({"type": "http", "method": "GET"}, receive, send)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    async def measure() -> List[float]:
+        return [await timed(bare), await timed(middleware)]
+
+    bare_seconds, middleware_seconds = asyncio.run(measure())
+
+    assert (middleware_seconds - bare_seconds) / calls < 100e-6
@@ -0,0 +1,42 @@
+"""Test file for the password hashing service."""
+
+import asyncio
+
+import pytest
+
+from src.util.password_hashing import PasswordHashingService, password_hashing
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify() -> None:
+    """Test hashing and verifying a password off the event loop."""
+    hashed_password = await password_hashing.hash("test_password")
+    assert hashed_password.startswith("$argon2")
+    assert await password_hashing.verify(hashed_password, "test_password") is True
+    assert await password_hashing.verify(hashed_password, "wrong_password") is False
+
+
+@pytest.mark.asyncio
+async def test_check_needs_rehash() -> None:
+    """Test the needs-rehash check for current and outdated parameters."""
+    hashed_password = await password_hashing.hash("test_password")
+    assert password_hashing.check_needs_rehash(hashed_password) is False
+
+    outdated_hash = hashed_password.replace("m=65536", "m=1024")
+    assert password_hashing.check_needs_rehash(outdated_hash) is True
+
+
+@pytest.mark.asyncio
+async def test_metrics_bounded_queue() -> None:
+    """Test that concurrent jobs are bounded and recorded in the metrics."""
+    service = PasswordHashingService(max_workers=1, max_pending=2)
+    assert service.metrics["average_latency_ms"] == 0.0
+
+    hashes = await asyncio.gather(*(service.hash(f"pw_{i}") for i in range(5)))
+    assert len(set(hashes)) == 5
+
+    metrics = service.metrics
+    assert metrics["queue_depth"] == 0
+    assert metrics["completed"] == 5
+    assert metrics["max_latency_ms"] >= metrics["average_latency_ms"] > 0
+    service.shutdown()
@@ -0,0 +1,122 @@
+"""Test file for the Redis presence service."""
+
+import asyncio
+import time
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis
+from redis.exceptions import RedisError
+
+from src.util.presence import Presence, UserPresence, sids_key
+
+
+@pytest_asyncio.fixture
+async def fake_redis() -> AsyncGenerator[aioredis.FakeRedis, None]:
+    """A fakeredis client shared by the presence services of a test."""
+    redis = aioredis.FakeRedis()
+    try:
+        yield redis
+    finally:
+        await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_presence_across_nodes(fake_redis: aioredis.FakeRedis) -> None:
+    """A user stays online until the last sid on any node disconnects."""
+    node_a = Presence(ttl=60, heartbeat_interval=30)
+    node_b = Presence(ttl=60, heartbeat_interval=30)
+    node_a.redis = node_b.redis = fake_redis
+
+    assert await node_a.connect("sid_a", 1) is True
+    assert await node_b.connect("sid_b", 1) is False
+    assert (await node_a.lookup([1]))[1].online is True
+
+    assert await node_a.disconnect("sid_a") is None
+    assert (await node_b.lookup([1]))[1].online is True
+    assert await node_b.disconnect("sid_b") == 1
+    assert await node_b.disconnect("sid_b") is None
+
+    offline = (await node_a.lookup([1]))[1]
+    assert offline.online is False
+    assert offline.last_seen is not None
+    assert offline.last_seen >= int(time.time()) - 1
+
+
+@pytest.mark.asyncio
+async def test_leases_lapse_without_heartbeat(fake_redis: aioredis.FakeRedis) -> None:
+    """Sids of a node that stopped sending heartbeats no longer count."""
+    node = Presence(ttl=60, heartbeat_interval=30)
+    node.redis = fake_redis
+    await node.connect("sid", 1)
+    await fake_redis.zadd(sids_key(1), {"sid": int(time.time()) - 1})
+
+    assert (await node.lookup([1]))[1].online is False
+    await node.heartbeat()
+    assert (await node.lookup([1]))[1].online is True
+
+
+@pytest.mark.asyncio
+async def test_lookup_is_one_round_trip(fake_redis: aioredis.FakeRedis) -> None:
+    """Presence of thousands of users is answered by a single pipeline."""
+    node = Presence(ttl=60, heartbeat_interval=30)
+    node.redis = fake_redis
+    await node.connect("sid", 7)
+    user_ids = list(range(5000))
+
+    with patch.object(
+        fake_redis, "pipeline", wraps=fake_redis.pipeline
+    ) as mock_pipeline:
+        presences = await node.lookup(user_ids)
+
+    mock_pipeline.assert_called_once()
+    assert len(presences) == 5000
+    assert presences[7].online is True
+    assert presences[8] == UserPresence(online=False, last_seen=None)
+    assert await node.lookup([]) == {}
+
+
+@pytest.mark.asyncio
+async def test_run_sends_heartbeats() -> None:
+    """The heartbeat loop runs until cancelled."""
+    node = Presence(ttl=60, heartbeat_interval=0.01)
+    with patch.object(node, "heartbeat", new_callable=AsyncMock) as mock_heartbeat:
+        task = asyncio.create_task(node.run())
+        for _ in range(100):
+            if mock_heartbeat.await_count:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    mock_heartbeat.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_without_redis() -> None:
+    """Without Redis sids are tracked locally and nobody is reported online."""
+    node = Presence(ttl=60, heartbeat_interval=30)
+    assert await node.connect("sid", 1) is False
+    await node.heartbeat()
+    assert await node.lookup([1]) == {}
+    assert await node.disconnect("sid") is None
+    assert node.local_sids == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_logged() -> None:
+    """Redis failures are logged and treated as no presence change."""
+    node = Presence(ttl=60, heartbeat_interval=30)
+    node.redis = MagicMock()
+    node.redis.pipeline.side_effect = RedisError("down")
+
+    with patch("src.util.presence.logger.error") as mock_error:
+        assert await node.connect("sid", 1) is False
+        await node.heartbeat()
+        assert await node.lookup([1]) == {}
+        assert await node.disconnect("sid") is None
+
+    assert mock_error.call_count == 4
@@ -0,0 +1,227 @@
+"""Test file for the slow query log."""
+
+import asyncio
+from typing import AsyncGenerator
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.util.query_log import (
+    QueryStats,
+    SlowQuery,
+    SlowQueryLog,
+    statement_fingerprint,
+)
+
+
+def make_log(threshold: float = 0.0, **kwargs: float | bool) -> SlowQueryLog:
+    """A slow query log that treats every statement as slow by default."""
+    options = {
+        "window": 10,
+        "size": 3,
+        "max_fingerprints": 10,
+        "explain": True,
+        "explain_cooldown": 60.0,
+        **kwargs,
+    }
+    return SlowQueryLog(threshold=threshold, **options)  # type: ignore[arg-type]
+
+
+@pytest_asyncio.fixture
+async def sqlite_engine() -> AsyncGenerator[AsyncEngine, None]:
+    """A throwaway in memory engine with one table."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+        )
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+def test_statement_fingerprint() -> None:
+    """Literals, placeholders, IN lists and whitespace do not change a fingerprint."""
+    assert (
+        statement_fingerprint(
+            "SELECT *  FROM t\n WHERE a = 'it''s' AND b = 12 AND c IN ($1, $2, $3)"
+        )
+        == "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (?...)"
+    )
+    assert statement_fingerprint("SELECT 1.5, t1.x WHERE y = %s") == (
+        "SELECT ?, t1.x WHERE y = ?"
+    )
+    assert statement_fingerprint("INSERT INTO t VALUES (?, ?), (?, ?), (?, ?)") == (
+        "INSERT INTO t VALUES (?...)..."
+    )
+
+
+def test_query_stats_percentiles() -> None:
+    """Percentiles are taken over the rolling window only."""
+    stats = QueryStats(window=100)
+    for value in range(1, 201):
+        stats.add(value / 1000)
+
+    assert stats.as_dict() == {
+        "count": 200,
+        "p50": 0.15,
+        "p95": 0.195,
+        "p99": 0.199,
+        "max": 0.2,
+    }
+
+
+def test_record_keeps_slow_statements_and_bounds_memory() -> None:
+    """Only slow runs enter the ring buffer, and old fingerprints are evicted."""
+    log = make_log(threshold=0.1, max_fingerprints=2, size=2)
+
+    with patch("src.util.query_log.logger.warning") as mock_warning:
+        assert log.record("SELECT 1", 0.01) is None
+        slow = log.record("SELECT 2", 0.5)
+        log.record("SELECT a FROM t", 0.2)
+        log.record("SELECT b FROM t", 0.3)
+
+    assert isinstance(slow, SlowQuery) and slow.fingerprint == "SELECT ?"
+    assert list(log.stats) == ["SELECT a FROM t", "SELECT b FROM t"]
+    assert [entry.statement for entry in log.slow] == [
+        "SELECT a FROM t",
+        "SELECT b FROM t",
+    ]
+    assert mock_warning.call_count == 3
+
+    dump = log.dump()
+    assert dump["threshold"] == 0.1
+    assert [entry["fingerprint"] for entry in dump["stats"]] == [
+        "SELECT b FROM t",
+        "SELECT a FROM t",
+    ]
+    assert dump["slow_queries"][0]["statement"] == "SELECT b FROM t"
+    assert dump["slow_queries"][0]["plan"] is None
+
+
+@pytest.mark.asyncio
+async def test_slow_selects_are_explained_once(sqlite_engine: AsyncEngine) -> None:
+    """A slow SELECT gets its plan captured, within the cooldown only once."""
+    log = make_log(size=10)
+    log.instrument(sqlite_engine)
+
+    with patch("src.util.query_log.logger.warning"):
+        async with sqlite_engine.connect() as conn:
+            await conn.execute(text("SELECT name FROM item WHERE id = :id"), {"id": 1})
+            await conn.execute(text("SELECT name FROM item WHERE id = :id"), {"id": 2})
+            await conn.execute(
+                text("INSERT INTO item (name) VALUES (:name)"),
+                [{"name": "a"}, {"name": "b"}],
+            )
+            await conn.execute(text("UPDATE item SET name = 'c' WHERE id = 1"))
+        await asyncio.gather(*log.explain_tasks)
+
+    select, again, insert, update = log.slow
+    assert select.plan is not None and "item" in " ".join(select.plan)
+    assert select.explain_error is None
+    assert again.plan is None
+    assert insert.plan is None and update.plan is None
+    assert log.stats["SELECT name FROM item WHERE id = ?"].count == 2
+    # The EXPLAIN statements themselves are not logged.
+    assert not any(fingerprint.startswith("EXPLAIN") for fingerprint in log.stats)
+
+
+def test_expired_explain_cooldowns_are_dropped() -> None:
+    """Fingerprints whose cooldown ran out are forgotten and explained again."""
+    log = make_log(explain_cooldown=10.0)
+    sqlite = MagicMock()
+    sqlite.dialect.name = "sqlite"
+    loop = MagicMock()
+    first = SlowQuery("SELECT 1", "SELECT 1", 1.0, 0.0)
+    second = SlowQuery("SELECT 2", "SELECT 2", 1.0, 0.0)
+
+    with (
+        patch("src.util.query_log.asyncio.get_running_loop", return_value=loop),
+        patch("src.util.query_log.time.monotonic", side_effect=[0.0, 5.0, 8.0, 16.0]),
+        patch.object(log, "capture_plan", new=MagicMock()),
+    ):
+        log.schedule_explain(sqlite, first, ())
+        log.schedule_explain(sqlite, second, ())
+        log.schedule_explain(sqlite, first, ())
+        assert log.explained == {"SELECT 1": 0.0, "SELECT 2": 5.0}
+        log.schedule_explain(sqlite, first, ())
+
+    assert log.explained == {"SELECT 1": 16.0}
+    assert loop.create_task.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_explain_is_recorded(sqlite_engine: AsyncEngine) -> None:
+    """An EXPLAIN that fails leaves the error on the entry."""
+    log = make_log()
+    slow = SlowQuery("SELECT ?", "SELECT name FROM missing", 1.0, 0.0)
+
+    with patch("src.util.query_log.logger.error") as mock_error:
+        await log.capture_plan(sqlite_engine, "EXPLAIN QUERY PLAN ", slow, ())
+
+    assert slow.plan is None
+    assert slow.explain_error is not None and "missing" in slow.explain_error
+    mock_error.assert_called_once()
+
+
+def test_explain_is_skipped_when_not_possible() -> None:
+    """No plan is captured when disabled, unsupported or outside a loop."""
+    slow = SlowQuery("SELECT ?", "SELECT 1", 1.0, 0.0)
+    sqlite = MagicMock()
+    sqlite.dialect.name = "sqlite"
+    mysql = MagicMock()
+    mysql.dialect.name = "mysql"
+
+    make_log(explain=False).schedule_explain(sqlite, slow, ())
+    make_log().schedule_explain(mysql, slow, ())
+    log = make_log()
+    log.schedule_explain(sqlite, slow, ())
+
+    assert log.explain_tasks == set()
+    assert log.explained == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "statement",
+    [
+        'SELECT id FROM "SocketEvent" ORDER BY id LIMIT 100 FOR UPDATE SKIP LOCKED',
+        "SELECT id FROM item for share",
+        "SELECT id FROM item FOR NO KEY UPDATE NOWAIT",
+    ],
+)
+async def test_locking_selects_are_not_explained(statement: str) -> None:
+    """A SELECT that takes row locks is never run again to explain it."""
+    postgres = MagicMock()
+    postgres.dialect.name = "postgresql"
+    log = make_log(explain_analyze=True)
+    slow = SlowQuery("SELECT ?", statement, 1.0, 0.0)
+
+    with patch.object(log, "capture_plan", new=MagicMock()) as mock_capture:
+        log.schedule_explain(postgres, slow, ())
+
+    mock_capture.assert_not_called()
+    assert log.explain_tasks == set()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("explain_analyze", "prefix"),
+    [(False, "EXPLAIN "), (True, "EXPLAIN (ANALYZE, BUFFERS) ")],
+)
+async def test_explain_analyze_is_opt_in(explain_analyze: bool, prefix: str) -> None:
+    """Postgres plans are estimates unless ANALYZE is switched on."""
+    postgres = MagicMock()
+    postgres.dialect.name = "postgresql"
+    log = make_log(explain_analyze=explain_analyze)
+    slow = SlowQuery("SELECT ?", "SELECT name FROM item", 1.0, 0.0)
+
+    with patch.object(log, "capture_plan") as mock_capture:
+        log.schedule_explain(postgres, slow, ())
+        await asyncio.gather(*log.explain_tasks)
+
+    mock_capture.assert_called_once_with(postgres, prefix, slow, ())
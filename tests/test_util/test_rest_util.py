@@ -0,0 +1,58 @@
+"""Test for rest_util.py group version bumps."""
+
+from typing import Any, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.models.group import Group
+from src.util.rest_util import bump_group_versions
+from tests.conftest import add_token, add_user, engine
+
+
+@pytest.mark.asyncio
+async def test_bump_group_versions_single_statement(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """All members of a group are bumped by one UPDATE, other groups untouched."""
+    user, _ = await add_token(1000, 1000, test_db)
+    other = await add_user("other", 1001, test_db)
+    assert user.id is not None and other.id is not None
+    test_db.add_all(
+        [
+            Group(user_id=user.id, group_id=1, unread_messages=0, group_version=1),
+            Group(user_id=other.id, group_id=1, unread_messages=0, group_version=4),
+            Group(user_id=user.id, group_id=2, unread_messages=0, group_version=7),
+        ]
+    )
+    await test_db.commit()
+
+    statements: List[str] = []
+
+    def record(_conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await bump_group_versions(test_db, 1)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    await test_db.commit()
+
+    assert len(statements) == 1
+    assert statements[0].startswith('UPDATE "Group"')
+
+    result = await test_db.execute(
+        select(Group.user_id, Group.group_id, Group.group_version).order_by(
+            Group.group_id,  # type: ignore[arg-type]
+            Group.user_id,  # type: ignore[arg-type]
+        )
+    )
+    assert [tuple(row) for row in result.all()] == [
+        (user.id, 1, 2),
+        (other.id, 1, 5),
+        (user.id, 2, 7),
+    ]
@@ -0,0 +1,50 @@
+"""Test file for the Redis cache of socket rooms."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fakeredis import aioredis
+from redis.exceptions import RedisError
+
+from src.util.room_cache import RoomCache, rooms_key
+
+
+@pytest.mark.asyncio
+async def test_store_get_and_invalidate() -> None:
+    """Test that stored rooms are read back until they are invalidated."""
+    cache = RoomCache(ttl=60)
+    assert await cache.get(1) is None
+    await cache.store(1, ["room_1"])
+    await cache.invalidate(1)
+
+    fake_redis = aioredis.FakeRedis()
+    cache.redis = fake_redis
+    assert await cache.get(1) is None
+
+    await cache.store(1, ["room_1", "group_2"])
+    await cache.store(1, ["room_1", "group_3"])
+    await cache.store(2, [])
+    assert await cache.get(1) == ["group_3", "room_1"]
+    assert 0 < await fake_redis.ttl(rooms_key(1)) <= 60
+
+    await cache.invalidate()
+    await cache.invalidate(1, 2)
+    assert await cache.get(1) is None
+    await fake_redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_logged() -> None:
+    """Test that Redis failures fall back to a miss and are logged."""
+    cache = RoomCache(ttl=60)
+    cache.redis = MagicMock()
+    cache.redis.smembers = AsyncMock(side_effect=RedisError("down"))
+    cache.redis.delete = AsyncMock(side_effect=RedisError("down"))
+    cache.redis.pipeline.side_effect = RedisError("down")
+
+    with patch("src.util.room_cache.logger.error") as mock_error:
+        assert await cache.get(1) is None
+        await cache.store(1, ["room_1"])
+        await cache.invalidate(1)
+
+    assert mock_error.call_count == 3
@@ -0,0 +1,148 @@
+"""Test file for the Redis session store."""
+
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.user import User
+from src.util.security import check_token
+from src.util.session_store import SessionStore, session_key, session_store
+from src.util.token_cache import token_cache
+from src.util.util import rotate_user_token
+from tests.conftest import ASYNC_TESTING_SESSION_LOCAL, add_token
+
+
+@pytest_asyncio.fixture
+async def fake_session_store() -> AsyncGenerator[aioredis.FakeRedis, None]:
+    """Enable the session store against fakeredis."""
+    fake_redis = aioredis.FakeRedis()
+    session_store.redis = fake_redis
+    session_store.enabled = True
+    token_cache.enabled = False
+    try:
+        yield fake_redis
+    finally:
+        session_store.redis = None
+        session_store.enabled = False
+        token_cache.enabled = True
+
+
+@pytest.mark.asyncio
+async def test_check_token_reads_session_store(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+    fake_session_store: aioredis.FakeRedis,
+) -> None:
+    """Test that a stored session answers check_token without a database query."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    await session_store.store(user_token)
+    assert await fake_session_store.ttl(session_key(user_token.access_token_hash)) > 0
+
+    with patch.object(test_db, "execute", new_callable=AsyncMock) as mock_execute:
+        session_user, session_token = await check_token(
+            test_db, user_token.access_token, "access"
+        )
+        refresh_user, _ = await check_token(
+            test_db, user_token.refresh_token, "refresh"
+        )
+    mock_execute.assert_not_called()
+    assert session_user is not None and session_token is not None
+    assert session_user.id == user.id
+    assert session_token.id == user_token.id
+    assert refresh_user is not None and refresh_user.id == user.id
+
+
+@pytest.mark.asyncio
+async def test_check_token_falls_back_and_writes_through(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+    fake_session_store: aioredis.FakeRedis,
+) -> None:
+    """Test that a miss is served by the database and then stored."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    assert not await fake_session_store.exists(
+        session_key(user_token.access_token_hash)
+    )
+
+    checked_user, _ = await check_token(test_db, user_token.access_token, "access")
+    assert checked_user == user
+    assert await fake_session_store.exists(session_key(user_token.access_token_hash))
+    assert await fake_session_store.exists(session_key(user_token.refresh_token_hash))
+
+
+@pytest.mark.asyncio
+async def test_session_loads_current_user(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+    fake_session_store: aioredis.FakeRedis,
+) -> None:
+    """Test that a session holds no user columns and a hit reads the user row."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    await session_store.store(user_token)
+    access_key = session_key(user_token.access_token_hash)
+    stored = await fake_session_store.hgetall(access_key)  # type: ignore[misc]
+    assert set(stored) == {b"user_token", b"user_id"}
+    for secret in [user.password_hash, user.salt, user.email_hash]:
+        assert secret.encode() not in stored[b"user_token"]
+
+    await test_db.execute(
+        update(User).where(User.id == user.id).values(profile_version=5)  # type: ignore[arg-type]
+    )
+    await test_db.commit()
+    async with ASYNC_TESTING_SESSION_LOCAL() as db:
+        checked_user, _ = await check_token(db, user_token.access_token, "access")
+        assert checked_user is not None and checked_user.profile_version == 5
+
+
+@pytest.mark.asyncio
+async def test_refresh_and_delete_user_remove_sessions(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+    fake_session_store: aioredis.FakeRedis,
+) -> None:
+    """Test that refreshing and deleting a user remove their sessions."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    await session_store.store(user_token)
+    await rotate_user_token(test_db, user_token.access_token, user_token.refresh_token)
+    assert await session_store.get(user_token.access_token) is None
+    assert await session_store.get(user_token.refresh_token) is None
+
+    _, other_token = await add_token(1000, 1000, test_db)
+    await session_store.store(other_token)
+    await session_store.delete_user(user.id)  # type: ignore[arg-type]
+    assert await session_store.get(other_token.access_token) is None
+
+
+@pytest.mark.asyncio
+async def test_session_store_inactive_and_failing() -> None:
+    """Test that an inactive or failing store never breaks a request."""
+    store = SessionStore(enabled=True)
+    assert not store.active
+    user_token = MagicMock(access_token_hash="access", refresh_token_hash="refresh")
+    await store.store(user_token)
+    assert await store.get("access") is None
+    await store.delete("access")
+    await store.delete_user(1)
+
+    store.redis = MagicMock()
+    store.redis.hgetall = AsyncMock(side_effect=RedisError("down"))
+    store.redis.delete = AsyncMock(side_effect=RedisError("down"))
+    store.redis.smembers = AsyncMock(side_effect=RedisError("down"))
+    store.redis.pipeline.side_effect = RedisError("down")
+    with patch("src.util.session_store.logger.error") as mock_logger_error:
+        user_token.model_dump.return_value = {}
+        user_token.user_id = 1
+        user_token.token_expiration = 1
+        user_token.refresh_token_expiration = 1
+        await store.store(user_token)
+        assert await store.get("access") is None
+        await store.delete("access")
+        await store.delete_user(1)
+    assert mock_logger_error.call_count == 4
@@ -0,0 +1,155 @@
+"""Test file for the socket event outbox."""
+
+import asyncio
+from typing import List
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.api.api_v1.friends import add_friend
+from src.models.socket_event import SocketEvent
+from src.util.socket_outbox import PENDING_EVENTS_KEY, SocketOutbox
+from src.util.util import get_user_room
+from tests.conftest import ASYNC_TESTING_SESSION_LOCAL, add_token, add_user
+
+
+async def stored_events(db: AsyncSession) -> List[SocketEvent]:
+    """All outbox rows in id order."""
+    result = await db.execute(select(SocketEvent).order_by(SocketEvent.id))  # type: ignore[arg-type]
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_disabled_outbox_emits_on_flush(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """A disabled outbox keeps events on the session until the flush."""
+    outbox = SocketOutbox(enabled=False, batch_size=10, poll_interval=1.0)
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
+        outbox.add(test_db, "first", {"a": 1}, "room_1")
+        outbox.add(test_db, "second", {"b": 2}, ["room_1", "room_2"])
+        outbox.add(test_db, "nobody", {"c": 3}, [])
+        await test_db.commit()
+        mock_emit.assert_not_awaited()
+
+        await outbox.flush(test_db)
+
+    assert mock_emit.await_args_list == [
+        call("first", {"a": 1}, room=["room_1"]),
+        call("second", {"b": 2}, room=["room_1", "room_2"]),
+    ]
+    assert PENDING_EVENTS_KEY not in test_db.info
+    assert await stored_events(test_db) == []
+    assert not outbox.wakeup.is_set()
+
+
+@pytest.mark.asyncio
+async def test_enabled_outbox_stores_events_in_transaction(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """An enabled outbox writes rows that commit and roll back with the change."""
+    outbox = SocketOutbox(enabled=True, batch_size=10, poll_interval=1.0)
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
+        outbox.add(test_db, "dropped", {}, "room_1")
+        await test_db.rollback()
+
+        outbox.add(test_db, "kept", {"a": 1}, "room_1")
+        await test_db.commit()
+        await outbox.flush(test_db)
+
+    mock_emit.assert_not_awaited()
+    assert outbox.wakeup.is_set()
+    events = await stored_events(test_db)
+    assert [(event.event, event.data, event.rooms) for event in events] == [
+        ("kept", {"a": 1}, ["room_1"])
+    ]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_emits_and_deletes_in_batches(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Dispatch emits the oldest batch, deletes it and leaves the rest."""
+    outbox = SocketOutbox(enabled=True, batch_size=2, poll_interval=1.0)
+    for index in range(3):
+        outbox.add(test_db, f"event_{index}", {"index": index}, [f"room_{index}"])
+    await test_db.commit()
+
+    with patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit:
+        assert await outbox.dispatch(test_db) == 2
+        assert [event.event for event in await stored_events(test_db)] == ["event_2"]
+        assert await outbox.dispatch(test_db) == 1
+        assert await outbox.dispatch(test_db) == 0
+
+    assert mock_emit.await_args_list == [
+        call("event_0", {"index": 0}, room=["room_0"]),
+        call("event_1", {"index": 1}, room=["room_1"]),
+        call("event_2", {"index": 2}, room=["room_2"]),
+    ]
+    assert await stored_events(test_db) == []
+
+
+@pytest.mark.asyncio
+async def test_run_drains_until_cancelled(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """The dispatcher drains full batches at once and survives failures."""
+    outbox = SocketOutbox(enabled=True, batch_size=1, poll_interval=0.01)
+    for index in range(2):
+        outbox.add(test_db, f"event_{index}", {}, "room")
+    await test_db.commit()
+
+    # The first session cannot be opened, later ones work.
+    factories = iter([MagicMock(side_effect=RuntimeError("database down"))])
+
+    def session_factory() -> AsyncSession:
+        return next(factories, ASYNC_TESTING_SESSION_LOCAL)()
+
+    with (
+        patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit,
+        patch("src.util.socket_outbox.logger.error") as mock_error,
+    ):
+        task = asyncio.create_task(outbox.run(session_factory))
+        for _ in range(100):
+            if mock_emit.await_count == 2:
+                break
+            await asyncio.sleep(0.01)
+        outbox.wakeup.set()
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert mock_emit.await_count == 2
+    mock_error.assert_called_once()
+    assert await stored_events(test_db) == []
+
+
+@pytest.mark.asyncio
+async def test_add_friend_uses_outbox(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """With the outbox enabled the endpoint commits the event instead of emitting."""
+    me, me_token = await add_token(1000, 1000, test_db)
+    friend = await add_user("outbox_friend", 1001, test_db)
+    assert friend.id is not None
+    outbox = SocketOutbox(enabled=True, batch_size=10, poll_interval=1.0)
+
+    with (
+        patch("src.api.api_v1.friends.add_friend.socket_outbox", outbox),
+        patch("src.sockets.sockets.sio.emit", new_callable=AsyncMock) as mock_emit,
+    ):
+        response = await add_friend.add_friend(
+            add_friend.AddFriendRequest(user_id=friend.id), (me, me_token), test_db
+        )
+
+    assert response["success"] is True
+    mock_emit.assert_not_awaited()
+    events = await stored_events(test_db)
+    assert len(events) == 1
+    assert events[0].event == "friend_request_received"
+    assert events[0].data["friend_id"] == me.id
+    assert events[0].rooms == [get_user_room(friend.id)]
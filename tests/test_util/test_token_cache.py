@@ -0,0 +1,242 @@
+"""Test file for the verified-token cache."""
+
+import asyncio
+import json
+import time
+from typing import Generator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fakeredis import aioredis
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.user import User
+from src.models.user_token import hash_token
+from src.util.security import check_token
+from src.util.token_cache import (
+    INVALIDATION_CHANNEL,
+    TokenCache,
+    token_cache,
+)
+from tests.conftest import ASYNC_TESTING_SESSION_LOCAL, add_token, add_user
+
+
+@pytest.fixture(autouse=True)
+def enabled_token_cache() -> Generator[None, None, None]:
+    """The cache is off by default, these tests switch it on."""
+    with patch.object(token_cache, "enabled", True):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_check_token_uses_cache(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test that a repeated check skips the signature check and the database."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    cached_user, _ = await check_token(test_db, user_token.access_token, "access")
+    assert cached_user == user
+    assert token_cache.get(user_token.access_token) is not None
+
+    with (
+        patch("src.util.security.decode_token") as mock_decode,
+        patch.object(test_db, "execute", new_callable=AsyncMock) as mock_execute,
+    ):
+        hit_user, hit_token = await check_token(
+            test_db, user_token.access_token, "access"
+        )
+    mock_decode.assert_not_called()
+    mock_execute.assert_not_called()
+    assert hit_user is not None and hit_token is not None
+    assert hit_user.id == user.id
+    assert hit_user.username == user.username
+    assert hit_token.id == user_token.id
+
+
+@pytest.mark.asyncio
+async def test_cached_token_loads_current_user(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test that a cache hit reads the user row, not a snapshot of it."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    await check_token(test_db, user_token.access_token, "access")
+    entry = token_cache.get(user_token.access_token)
+    assert entry is not None
+    assert entry.user_id == user.id
+    assert "password_hash" not in entry.user_token
+    await test_db.execute(
+        update(User).where(User.id == user.id).values(profile_version=5)  # type: ignore[arg-type]
+    )
+    await test_db.commit()
+
+    async with ASYNC_TESTING_SESSION_LOCAL() as db:
+        with patch("src.util.security.decode_token") as mock_decode:
+            hit_user, _ = await check_token(db, user_token.access_token, "access")
+            mock_decode.assert_not_called()
+            assert hit_user is not None
+            assert hit_user.profile_version == 5
+
+            await db.execute(delete(User).where(User.id == user.id))  # type: ignore[arg-type]
+            await db.commit()
+            db.expunge_all()
+            assert await check_token(db, user_token.access_token, "access") == (
+                None,
+                None,
+            )
+
+
+@pytest.mark.asyncio
+async def test_check_token_cache_skips_refresh_tokens(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test that refresh tokens are never cached."""
+    _, user_token = await add_token(1000, 1000, test_db)
+    await check_token(test_db, user_token.refresh_token, "refresh")
+    assert len(token_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_token_and_user(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test dropping entries by token and by user."""
+    user, user_token = await add_token(1000, 1000, test_db)
+    _, second_token = await add_token(1000, 1000, test_db)
+    other_user = await add_user("other_user", 0, test_db)
+    _, other_token = await add_token(1000, 1000, test_db, other_user.id)
+    for token in [user_token, second_token, other_token]:
+        await check_token(test_db, token.access_token, "access")
+    assert len(token_cache) == 3
+
+    await token_cache.invalidate_token(user_token.access_token_hash)
+    assert token_cache.get(user_token.access_token) is None
+    assert len(token_cache) == 2
+
+    await token_cache.invalidate_user(user.id)  # type: ignore[arg-type]
+    assert token_cache.get(second_token.access_token) is None
+    assert token_cache.get(other_token.access_token) is not None
+
+
+def put_snapshot(
+    cache: TokenCache, token: str, user_id: int, expires_in: int = 1000
+) -> None:
+    """Put a minimal snapshot in the cache."""
+    user_token = MagicMock(
+        user_id=user_id,
+        access_token_hash=hash_token(token),
+        token_expiration=int(time.time()) + expires_in,
+    )
+    user_token.model_dump.return_value = {"id": user_id}
+    cache.put(user_token)
+
+
+def test_cache_expiry_and_eviction() -> None:
+    """Test that entries expire with the token and the cache stays bounded."""
+    cache = TokenCache(max_size=2, ttl=60)
+    for index in range(3):
+        put_snapshot(cache, f"token_{index}", index)
+    assert len(cache) == 2
+    assert cache.get("token_0") is None
+    assert cache.get("token_2") is not None
+
+    put_snapshot(cache, "token_1", 1, expires_in=-1)
+    assert cache.get("token_1") is None
+    assert len(cache) == 1
+
+    disabled_cache = TokenCache(max_size=2, ttl=60, enabled=False)
+    put_snapshot(disabled_cache, "token", 1)
+    assert disabled_cache.get("token") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_published_to_other_replicas() -> None:
+    """Test that an invalidation on one replica drops the entry on another."""
+    fake_redis = aioredis.FakeRedis()
+    publisher = TokenCache(max_size=10, ttl=60)
+    subscriber = TokenCache(max_size=10, ttl=60)
+    publisher.redis = fake_redis
+    subscriber.redis = fake_redis
+
+    put_snapshot(subscriber, "token", 1)
+    put_snapshot(subscriber, "other_token", 1)
+
+    pubsub = fake_redis.pubsub()
+    await pubsub.subscribe(INVALIDATION_CHANNEL)
+    await pubsub.get_message(timeout=1.0)
+    await publisher.invalidate_token(hash_token("token"))
+    await publisher.invalidate_user(1)
+    for _ in range(2):
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        assert message is not None
+        publisher.handle_message(message["data"])
+        subscriber.handle_message(message["data"])
+    assert len(subscriber) == 0
+    await pubsub.aclose()  # type: ignore[no-untyped-call]
+
+
+@pytest.mark.asyncio
+async def test_publish_failure_is_logged() -> None:
+    """Test that a Redis failure does not break the request."""
+    cache = TokenCache(max_size=10, ttl=60)
+    await cache.invalidate_user(1)
+    cache.redis = MagicMock()
+    cache.redis.publish = AsyncMock(side_effect=RedisError("down"))
+    with patch("src.util.token_cache.logger.error") as mock_logger_error:
+        await cache.invalidate_token(hash_token("token"))
+    mock_logger_error.assert_called_once()
+    cache.handle_message(json.dumps({"digest": hash_token("token")}))
+
+
+@pytest.mark.asyncio
+async def test_listen_applies_remote_invalidations() -> None:
+    """Test the background listener until it is cancelled."""
+    fake_redis = aioredis.FakeRedis()
+    publisher = TokenCache(max_size=10, ttl=60)
+    subscriber = TokenCache(max_size=10, ttl=60)
+    publisher.redis = fake_redis
+    subscriber.redis = fake_redis
+    put_snapshot(subscriber, "token", 1)
+
+    await TokenCache(max_size=10, ttl=60).listen()
+    listener = asyncio.create_task(subscriber.listen())
+    await asyncio.sleep(0.1)
+    await publisher.invalidate_user(1)
+    for _ in range(20):
+        if len(subscriber) == 0:
+            break
+        await asyncio.sleep(0.05)
+    assert len(subscriber) == 0
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
+
+
+@pytest.mark.asyncio
+async def test_listen_recovers_from_redis_errors() -> None:
+    """Test that a listener error clears the cache and keeps listening."""
+    cache = TokenCache(max_size=10, ttl=60)
+    put_snapshot(cache, "token", 1)
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    pubsub.get_message = AsyncMock(
+        side_effect=[RedisError("down"), asyncio.CancelledError()]
+    )
+    cache.redis = MagicMock()
+    cache.redis.pubsub.return_value = pubsub
+    with (
+        patch("src.util.token_cache.asyncio.sleep", new_callable=AsyncMock),
+        patch("src.util.token_cache.logger.error") as mock_logger_error,
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await cache.listen()
+    mock_logger_error.assert_called_once()
+    assert len(cache) == 0
+    pubsub.aclose.assert_awaited_once()
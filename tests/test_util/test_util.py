@@ -1,20 +1,23 @@
 """Test file for util."""
 
 import time
+import warnings
 from typing import Optional
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import SAWarning
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
 
 from src.models import User, UserToken
 from src.util.util import (
-    delete_user_token_and_return,
+    claim_user_token,
     get_random_colour,
     get_user_tokens,
     hash_password,
-    refresh_user_token,
+    rotate_user_token,
 )
 from tests.conftest import add_token
 
@@ -61,41 +64,80 @@ async def test_get_user_tokens(
 
 
 @pytest.mark.asyncio
-async def test_delete_user_token_and_return(
+async def test_rotate_user_token(
     test_setup: TestClient,
     test_db: AsyncSession,
 ) -> None:
-    """Test the delete_user_token_and_return function."""
+    """Test the rotate_user_token function."""
     user, user_token = await add_token(1000, 1000, test_db)
-    assert user is not None
-    assert await delete_user_token_and_return(test_db, user_token, user) == user
-    assert await test_db.get(UserToken, user_token.id) is None
+    # The old row is loaded in the session and SQLite hands its id out again.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", SAWarning)
+        rotated = await rotate_user_token(
+            test_db, user_token.access_token, user_token.refresh_token
+        )
+    assert rotated is not None
+    rotated_user, new_token = rotated
+    assert rotated_user == user
+    assert new_token.id is not None
+    assert new_token.access_token_hash != user_token.access_token_hash
+    token_statement = select(UserToken).where(
+        UserToken.access_token_hash == user_token.access_token_hash
+    )
+    assert (await test_db.execute(token_statement)).first() is None
+    assert (
+        await rotate_user_token(
+            test_db, user_token.access_token, user_token.refresh_token
+        )
+        is None
+    )
+    assert await rotate_user_token(test_db, "invalid_token", "invalid_token") is None
 
 
 @pytest.mark.asyncio
-async def test_refresh_user_token(
+async def test_rotate_user_token_expired(
     test_setup: TestClient,
     test_db: AsyncSession,
 ) -> None:
-    """Test the refresh_user_token function."""
-    user, user_token = await add_token(1000, 1000, test_db)
-    assert user is not None
+    """Test that an expired token row is removed without issuing a new one."""
+    _, user_token = await add_token(-1000, -1000, test_db)
     assert (
-        await refresh_user_token(
+        await rotate_user_token(
             test_db, user_token.access_token, user_token.refresh_token
         )
-        == user
+        is None
     )
-    assert await refresh_user_token(test_db, "invalid_token", "invalid_token") is None
-    assert await test_db.get(UserToken, user_token.id) is None
+    assert len((await test_db.execute(select(UserToken.id))).all()) == 0
 
 
 @pytest.mark.asyncio
-async def test_refresh_user_token_with_none_user_result(
+async def test_rotate_user_token_bad_refresh_signature(
     test_setup: TestClient,
     test_db: AsyncSession,
 ) -> None:
-    """Test the refresh_user_token function with a None user result."""
+    """Test that a pair with a forged refresh token leaves the session alone."""
+    user, _ = await add_token(1000, 1000, test_db)
+    forged_token = UserToken(
+        user_id=user.id,
+        access_token=user.generate_auth_token(),
+        token_expiration=int(time.time()) + 1000,
+        refresh_token="forged",
+        refresh_token_expiration=int(time.time()) + 1000,
+    )
+    test_db.add(forged_token)
+    await test_db.commit()
+
+    assert await rotate_user_token(test_db, forged_token.access_token, "forged") is None
+    token_statement = select(UserToken).where(UserToken.id == forged_token.id)
+    assert (await test_db.execute(token_statement)).first() is not None
+
+
+@pytest.mark.asyncio
+async def test_rotate_user_token_with_none_user_result(
+    test_setup: TestClient,
+    test_db: AsyncSession,
+) -> None:
+    """Test the rotate_user_token function with a None user result."""
     user: Optional[User] = await test_db.get(User, 1)
     assert user is not None
 
@@ -105,9 +147,27 @@ async def test_refresh_user_token_with_none_user_result(
     await test_db.commit()
 
     assert (
-        await refresh_user_token(
+        await rotate_user_token(
             test_db, user_token.access_token, user_token.refresh_token
         )
         is None
     )
-    assert await test_db.get(UserToken, user_token.id) is None
+    assert len((await test_db.execute(select(UserToken.id))).all()) == 0
+
+
+@pytest.mark.asyncio
+async def test_claim_user_token_postgresql() -> None:
+    """Test that PostgreSQL claims the row and loads its user in one statement."""
+    user = MagicMock()
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    result = MagicMock()
+    result.first.return_value = (user, 1234, 7)
+    db.execute = AsyncMock(return_value=result)
+    assert await claim_user_token(db, "access", "refresh") == (user, 1234)
+    statement = str(db.execute.call_args.args[0])
+    assert "DELETE FROM" in statement and "RETURNING" in statement
+
+    result.first.return_value = None
+    assert await claim_user_token(db, "access", "refresh") == (None, 0)
+    db.get.assert_not_called()
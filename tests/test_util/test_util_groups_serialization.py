@@ -3,8 +3,9 @@
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.friend import Friend
 from src.models.group import Group
-from src.util.util import get_successful_login_response
+from src.util.util import get_login_snapshot, get_successful_login_response
 from tests.conftest import add_token
 from fastapi.testclient import TestClient
 
@@ -64,3 +65,31 @@ async def test_get_successful_login_response_with_groups(
     group_ids = [group["group_id"] for group in groups]
     assert 1 in group_ids
     assert 2 in group_ids
+
+
+@pytest.mark.asyncio
+async def test_get_login_snapshot_skips_identity_map(
+    test_setup: TestClient, test_db: AsyncSession
+) -> None:
+    """Test that the snapshot returns both relations without loading ORM objects."""
+    user, _ = await add_token(1000, 1000, test_db)
+    assert user.id is not None
+    test_db.add_all(
+        [
+            Friend(user_id=user.id, friend_id=2, friend_version=4),
+            Friend(user_id=user.id, friend_id=3, friend_version=1),
+            Friend(user_id=2, friend_id=user.id, friend_version=7),
+            Group(user_id=user.id, group_id=1, unread_messages=0, group_version=2),
+        ]
+    )
+    await test_db.commit()
+    test_db.expunge_all()
+
+    friends, groups = await get_login_snapshot(test_db, user.id)
+
+    assert sorted(friends, key=lambda friend: friend["friend_id"]) == [
+        {"friend_id": 2, "friend_version": 4},
+        {"friend_id": 3, "friend_version": 1},
+    ]
+    assert groups == [{"group_id": 1, "group_version": 2}]
+    assert len(test_db.identity_map) == 0